@@ -0,0 +1,93 @@
+"""
+Общая БД и хелперы тестов API
+Импортируется раньше приложения: движки создаются при импорте app.core.database,
+поэтому DATABASE_PATH указывает на временную БД, а не на рабочую
+"""
+
+import os
+import tempfile
+
+_tmp_dir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_PATH"] = os.path.join(_tmp_dir.name, "api.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.database import SessionLocal, async_engine, engine
+from app.core.migrations import run_migrations
+from app.models.models import Company, Letter, Vacancy
+from app.services.response_cache import response_cache
+from app.services.similarity import refresh_minhash
+from app.services.skill_links import sync_skill_links
+
+
+def seed_database() -> None:
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        for i in range(1, 41):
+            company = Company(
+                name=f"Компания {i}",
+                url="",
+                industry="IT" if i % 2 else "Finance",
+                score=float(i),
+                vacancy_count=1,
+                main_skills=["Python", "SQL"] if i % 4 else ["Python"],
+                status="new" if i % 3 else "approved",
+            )
+            db.add(company)
+            db.flush()
+            db.add(Vacancy(company_id=company.id, position="Python разработчик", skills=["python"], url=f"v{i}"))
+            db.add(Letter(company_id=company.id, template="default", subject="Тема", body="Текст", status="draft"))
+        db.commit()
+        sync_skill_links(db, [company.id for company in db.query(Company)])
+        refresh_minhash(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+def capture_statements(client: TestClient, method: str, path: str, **kwargs) -> tuple:
+    """
+    Выполнить запрос к эндпоинту, записав SQL-запросы и COMMIT сессии API
+
+    Returns:
+        Кортеж (ответ, список (запрос, параметры), число COMMIT)
+    """
+    statements = []
+    commits = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, tuple(parameters or ())))
+
+    def _commit(conn):
+        commits.append(conn)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _capture)
+    event.listen(async_engine.sync_engine, "commit", _commit)
+    try:
+        response = client.request(method, path, **kwargs)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", _capture)
+        event.remove(async_engine.sync_engine, "commit", _commit)
+    return response, statements, len(commits)
+
+
+def capture_selects(client: TestClient, path: str) -> list[tuple[str, tuple]]:
+    """SELECT-запросы, выполненные при обработке запроса к эндпоинту"""
+    response, statements, _ = capture_statements(client, "GET", path)
+    assert response.status_code == 200, f"{path}: {response.status_code} {response.text}"
+    return [(statement, parameters) for statement, parameters in statements
+            if statement.lstrip().upper().startswith("SELECT")]
+
+
+def assert_statement_count(client: TestClient, path: str, expected: int,
+                           method: str = "GET", commits: int = 0, **kwargs):
+    """Эндпоинт выполняет ровно expected SQL-запросов и commits COMMIT"""
+    response_cache.clear()
+    response, statements, committed = capture_statements(client, method, path, **kwargs)
+    assert response.status_code < 400, f"{path}: {response.status_code} {response.text}"
+    executed = "\n  ".join(" ".join(statement.split()) for statement, _ in statements)
+    assert len(statements) == expected, f"{method} {path}: {len(statements)} запросов, ожидалось {expected}\n  {executed}"
+    assert committed == commits, f"{method} {path}: {committed} COMMIT, ожидалось {commits}"
+    return response
@@ -0,0 +1,166 @@
+"""
+Сжатие текстов в БД: zstd со словарём, обученным на собственном корпусе
+
+Тексты вакансий однотипны ("Требования", "Условия", "Обязанности"...), поэтому
+словарь, обученный на наших описаниях, сжимает их в разы лучше zstd без словаря.
+Словари хранятся в compression_dictionaries и не изменяются: ID словаря
+записывается в заголовок каждого zstd-кадра, поэтому после переобучения старые
+значения по-прежнему читаются своим словарём. Процесс держит словари в памяти
+(text_codec) и догружает новые по ID: явно (refresh) или при встрече кадра с
+незнакомым словарём - отдельным соединением к файлу БД.
+
+Для SQL (external content полнотекстового индекса и перенос в него очереди
+изменений) на каждом соединении приложения регистрируется функция
+zstd_text(blob) -> текст; схема не требует её для записи в таблицы.
+"""
+
+import os
+import sqlite3
+import threading
+from itertools import islice
+from typing import Iterable, Optional
+
+import zstandard
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+load_dotenv()
+
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "9"))
+ZSTD_DICTIONARY_SIZE = int(os.getenv("ZSTD_DICTIONARY_SIZE", str(64 * 1024)))
+# Меньше образцов - словарь не обучается, тексты сжимаются без словаря
+MIN_TRAINING_SAMPLES = int(os.getenv("ZSTD_MIN_TRAINING_SAMPLES", "200"))
+MAX_TRAINING_SAMPLES = 5000
+
+_LOAD_DICTIONARIES_SQL = "SELECT id, data FROM compression_dictionaries WHERE id > :after ORDER BY id"
+_LOAD_DICTIONARIES = text(_LOAD_DICTIONARIES_SQL)
+
+
+class TextCodec:
+    """Сжатие/распаковка строк zstd-кадрами со словарём из compression_dictionaries"""
+
+    def __init__(self):
+        self._dictionaries: dict[int, zstandard.ZstdCompressionDict] = {}
+        self._current_id = 0
+        # Компрессоры и декомпрессоры zstd нельзя использовать из нескольких потоков сразу
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Файлы БД, из которых догружаются незнакомые словари
+        self._databases: set[str] = set()
+
+    @property
+    def current_id(self) -> int:
+        """ID словаря для новых значений (0 - без словаря)"""
+        return self._current_id
+
+    def add_dictionary(self, dictionary_id: int, data: bytes) -> None:
+        """Зарегистрировать словарь; новые значения сжимаются словарём с наибольшим ID"""
+        with self._lock:
+            self._dictionaries[dictionary_id] = zstandard.ZstdCompressionDict(data)
+            self._current_id = max(self._current_id, dictionary_id)
+
+    def refresh(self, db: Session) -> int:
+        """Догрузить словари, появившиеся в БД (например, после импорта в другом процессе)"""
+        rows = db.execute(_LOAD_DICTIONARIES, {"after": max(self._dictionaries, default=0)}).all()
+        for dictionary_id, data in rows:
+            self.add_dictionary(dictionary_id, data)
+        return len(rows)
+
+    async def refresh_async(self, db: AsyncSession) -> int:
+        rows = (await db.execute(_LOAD_DICTIONARIES, {"after": max(self._dictionaries, default=0)})).all()
+        for dictionary_id, data in rows:
+            self.add_dictionary(dictionary_id, data)
+        return len(rows)
+
+    def attach_database(self, path: str) -> None:
+        """Разрешить догрузку незнакомых словарей из файла БД"""
+        if path and path != ":memory:":
+            self._databases.add(path)
+
+    def _load_from_databases(self) -> None:
+        for path in list(self._databases):
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                rows = conn.execute(_LOAD_DICTIONARIES_SQL, {"after": max(self._dictionaries, default=0)}).fetchall()
+            except sqlite3.OperationalError:
+                continue  # БД до миграции со словарями
+            finally:
+                conn.close()
+            for dictionary_id, data in rows:
+                self.add_dictionary(dictionary_id, data)
+
+    def _compressor(self) -> zstandard.ZstdCompressor:
+        compressors = self._local.__dict__.setdefault("compressors", {})
+        dictionary_id = self._current_id
+        if dictionary_id not in compressors:
+            compressors[dictionary_id] = zstandard.ZstdCompressor(
+                level=ZSTD_LEVEL, dict_data=self._dictionaries.get(dictionary_id)
+            )
+        return compressors[dictionary_id]
+
+    def _decompressor(self, dictionary_id: int) -> zstandard.ZstdDecompressor:
+        decompressors = self._local.__dict__.setdefault("decompressors", {})
+        if dictionary_id not in decompressors:
+            if dictionary_id and dictionary_id not in self._dictionaries:
+                self._load_from_databases()
+            if dictionary_id and dictionary_id not in self._dictionaries:
+                raise LookupError(f"Словарь сжатия {dictionary_id} не загружен")
+            decompressors[dictionary_id] = zstandard.ZstdDecompressor(
+                dict_data=self._dictionaries.get(dictionary_id)
+            )
+        return decompressors[dictionary_id]
+
+    def compress(self, value: Optional[str]) -> Optional[bytes]:
+        if value is None:
+            return None
+        return self._compressor().compress(value.encode("utf-8"))
+
+    def decompress(self, blob: Optional[bytes]) -> Optional[str]:
+        """
+        Распаковать значение
+
+        Raises:
+            LookupError: если словаря кадра нет ни в памяти, ни в БД
+        """
+        if blob is None:
+            return None
+        dictionary_id = zstandard.get_frame_parameters(blob).dict_id
+        return self._decompressor(dictionary_id).decompress(blob).decode("utf-8")
+
+
+# Кодек процесса
+text_codec = TextCodec()
+
+
+def train_dictionary(samples: Iterable[str], dictionary_id: int) -> Optional[bytes]:
+    """
+    Обучить словарь zstd на образцах текста
+
+    Args:
+        samples: тексты корпуса (берутся первые MAX_TRAINING_SAMPLES непустых)
+        dictionary_id: ID, который словарь запишет в заголовки кадров
+
+    Returns:
+        Содержимое словаря или None, если образцов меньше MIN_TRAINING_SAMPLES
+    """
+    encoded = [sample.encode("utf-8") for sample in islice(filter(None, samples), MAX_TRAINING_SAMPLES)]
+    if len(encoded) < MIN_TRAINING_SAMPLES:
+        return None
+    dictionary = zstandard.train_dictionary(
+        ZSTD_DICTIONARY_SIZE, encoded, dict_id=dictionary_id, level=ZSTD_LEVEL
+    )
+    return dictionary.as_bytes()
+
+
+def register_sqlite_functions(dbapi_connection, database: str) -> None:
+    """
+    SQL-функция zstd_text(blob): распаковка значения, сжатого text_codec
+
+    Args:
+        dbapi_connection: DBAPI-соединение SQLite
+        database: путь к файлу БД (из него догружаются словари)
+    """
+    text_codec.attach_database(database)
+    dbapi_connection.create_function("zstd_text", 1, text_codec.decompress, deterministic=True)
@@ -1,14 +1,72 @@
-from sqlalchemy import create_engine
+import os
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:////data/mvp_database.db"
+from app.core.compression import register_sqlite_functions
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+load_dotenv()
+
+DATABASE_PATH = os.getenv("DATABASE_PATH", "/data/mvp_database.db")
+
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
+
+# Профиль SQLite, применяется к каждому новому соединению.
+# WAL: импорт (контейнер init-db) пишет, а backend продолжает читать.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # < 0 - в KiB, т.е. 64 MiB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000")),  # мс
+}
+
+
+def apply_sqlite_pragmas(engine, pragmas: dict | None = None) -> None:
+    """
+    Повесить на движок установку PRAGMA и SQL-функций приложения при каждом подключении
+
+    Args:
+        engine: синхронный движок (для асинхронного - engine.sync_engine)
+        pragmas: PRAGMA -> значение (по умолчанию SQLITE_PRAGMAS)
+    """
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+        register_sqlite_functions(dbapi_connection, engine.url.database)
+
+
+def create_sqlite_engine(url: str = SQLALCHEMY_DATABASE_URL, pragmas: dict | None = None):
+    """Синхронный движок SQLite с профилем PRAGMA"""
+    sqlite_engine = create_engine(url, connect_args={"check_same_thread": False})
+    apply_sqlite_pragmas(sqlite_engine, pragmas)
+    return sqlite_engine
+
+
+# Синхронный движок: импорт данных и скрипты
+engine = create_sqlite_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Асинхронный движок (aiosqlite): обработчики API не блокируют event loop
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL)
+apply_sqlite_pragmas(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
 
@@ -18,3 +76,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
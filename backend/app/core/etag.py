@@ -0,0 +1,52 @@
+"""
+Условные GET-запросы (ETag / If-None-Match)
+
+ETag ответа - хэш версии данных (поколение cache_generation, для отдельной
+строки - ещё и её updated_at) и нормализованных параметров запроса. Если
+клиент прислал совпадающий If-None-Match, эндпоинт отвечает 304 сразу после
+поиска версии, не выполняя основной запрос и не собирая тело ответа.
+Сжатое тело получает слабый ETag (app/core/http_compression.py), а сравнение
+If-None-Match слабое - 304 не зависит от кодировки.
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Клиент обязан перепроверять ответ (If-None-Match) перед использованием
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Сильный ETag из частей версии и параметров запроса"""
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Для If-None-Match сравнение слабое: W/"x" совпадает с "x"
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Проставить ETag ответу и проверить If-None-Match
+
+    Args:
+        request: входящий запрос
+        response: ответ эндпоинта (получает ETag и Cache-Control)
+        etag: ETag текущей версии ресурса
+
+    Returns:
+        Ответ 304, если у клиента актуальная версия, иначе None
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,588 @@
+"""
+Миграции схемы БД
+
+Каждая миграция - (версия, название, функция от соединения). Применённые
+версии хранятся в schema_migrations. Миграции идемпотентны: backend и
+init-db могут запуститься одновременно.
+
+Миграции не импортируют модели и сервисы: DDL и преобразования данных
+записаны такими, какими были на момент миграции, иначе изменение сервиса
+молча меняло бы старую миграцию. Производные данные, которые считают сервисы
+(MinHash-подписи, словарь сжатия), миграции только сбрасывают - их
+досчитывают сервисы при старте приложения и импорте.
+"""
+
+from datetime import datetime
+import json
+import logging
+
+import zstandard
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+
+def _add_columns(conn: Connection, table: str, columns: dict[str, str]) -> None:
+    """Добавить в таблицу колонки (имя -> тип), которых в ней ещё нет"""
+    existing = {column["name"] for column in inspect(conn).get_columns(table)}
+    for name, column_type in columns.items():
+        if name in existing:
+            continue
+        conn.execute(text(f'ALTER TABLE {table} ADD COLUMN "{name}" {column_type}'))
+        logger.info(f"Добавлена колонка {table}.{name}")
+
+
+def _sqlite_version(conn: Connection) -> tuple[int, ...]:
+    return tuple(int(part) for part in conn.execute(text("SELECT sqlite_version()")).scalar().split("."))
+
+
+def _execute_all(conn: Connection, statements) -> None:
+    for statement in statements:
+        conn.execute(text(statement))
+
+
+# Схема версии 1 - заморожена: модели дальше меняются только новыми миграциями
+BASELINE_TABLES = [
+    "CREATE TABLE IF NOT EXISTS companies ("
+    "id INTEGER NOT NULL, name VARCHAR, url VARCHAR, industry VARCHAR, score FLOAT, "
+    "vacancy_count INTEGER, main_skills JSON, status VARCHAR, created_at DATETIME, updated_at DATETIME, "
+    "score_vacancy FLOAT, score_skills FLOAT, score_size FLOAT, score_growth FLOAT, score_curriculum FLOAT, "
+    "skills_weight FLOAT, growth_trend FLOAT, last_snapshot_count INTEGER, "
+    "PRIMARY KEY (id))",
+    "CREATE TABLE IF NOT EXISTS vacancies ("
+    "id INTEGER NOT NULL, company_id INTEGER, position VARCHAR, skills JSON, url VARCHAR, "
+    "PRIMARY KEY (id), FOREIGN KEY(company_id) REFERENCES companies (id))",
+    "CREATE TABLE IF NOT EXISTS letters ("
+    "id INTEGER NOT NULL, company_id INTEGER, template VARCHAR, subject VARCHAR, body TEXT, status VARCHAR, "
+    "created_at DATETIME, approved_at DATETIME, rejected_at DATETIME, rejection_reason TEXT, sent_at DATETIME, "
+    "PRIMARY KEY (id), FOREIGN KEY(company_id) REFERENCES companies (id))",
+    "CREATE TABLE IF NOT EXISTS approval_log ("
+    "id INTEGER NOT NULL, company_id INTEGER, action VARCHAR, details VARCHAR, created_at DATETIME, "
+    "PRIMARY KEY (id), FOREIGN KEY(company_id) REFERENCES companies (id))",
+    "CREATE TABLE IF NOT EXISTS scoring_stats ("
+    "id INTEGER NOT NULL, max_vacancy_count INTEGER, max_skills_possible INTEGER, companies_count INTEGER, "
+    "total_vacancies INTEGER, total_skills INTEGER, max_skill_weight FLOAT, skill_documents INTEGER, "
+    "curriculum_version VARCHAR, updated_at DATETIME, "
+    "PRIMARY KEY (id))",
+    "CREATE TABLE IF NOT EXISTS score_histogram ("
+    "component VARCHAR NOT NULL, value INTEGER NOT NULL, companies INTEGER, "
+    "PRIMARY KEY (component, value))",
+    "CREATE TABLE IF NOT EXISTS scoring_weights ("
+    "id INTEGER NOT NULL, w_vacancy FLOAT, w_skills FLOAT, w_size FLOAT, w_growth FLOAT, w_curriculum FLOAT, "
+    "comment VARCHAR, is_active BOOLEAN, created_at DATETIME, "
+    "PRIMARY KEY (id))",
+    "CREATE TABLE IF NOT EXISTS skill_weights ("
+    "skill VARCHAR NOT NULL, document_frequency INTEGER, idf FLOAT, "
+    "PRIMARY KEY (skill))",
+    "CREATE TABLE IF NOT EXISTS vacancy_snapshots ("
+    "id INTEGER NOT NULL, company_id INTEGER, vacancy_count INTEGER, taken_at DATETIME, "
+    "PRIMARY KEY (id), FOREIGN KEY(company_id) REFERENCES companies (id))",
+    "CREATE INDEX IF NOT EXISTS ix_companies_id ON companies (id)",
+    "CREATE INDEX IF NOT EXISTS ix_companies_name ON companies (name)",
+    "CREATE INDEX IF NOT EXISTS ix_vacancies_id ON vacancies (id)",
+    "CREATE INDEX IF NOT EXISTS ix_letters_id ON letters (id)",
+    "CREATE INDEX IF NOT EXISTS ix_approval_log_id ON approval_log (id)",
+    "CREATE INDEX IF NOT EXISTS ix_scoring_weights_id ON scoring_weights (id)",
+    "CREATE INDEX IF NOT EXISTS ix_vacancy_snapshots_id ON vacancy_snapshots (id)",
+    "CREATE INDEX IF NOT EXISTS ix_vacancy_snapshots_company_id ON vacancy_snapshots (company_id)",
+]
+
+# Колонки версии 1, которых нет в БД, созданных до миграций
+BASELINE_COLUMNS = {
+    "companies": {
+        "score_vacancy": "FLOAT",
+        "score_skills": "FLOAT",
+        "score_size": "FLOAT",
+        "score_growth": "FLOAT",
+        "score_curriculum": "FLOAT",
+        "skills_weight": "FLOAT",
+        "growth_trend": "FLOAT",
+        "last_snapshot_count": "INTEGER",
+    },
+    "scoring_stats": {
+        "max_skill_weight": "FLOAT",
+        "skill_documents": "INTEGER",
+        "curriculum_version": "VARCHAR",
+    },
+    "scoring_weights": {"w_curriculum": "FLOAT"},
+}
+
+
+def _baseline(conn: Connection) -> None:
+    """Создать недостающие таблицы и колонки (БД, созданные до миграций)"""
+    _execute_all(conn, BASELINE_TABLES)
+    for table, columns in BASELINE_COLUMNS.items():
+        _add_columns(conn, table, columns)
+
+
+def _hot_query_indexes(conn: Connection) -> None:
+    """Составные индексы под фильтры и сортировки API"""
+    statements = [
+        # /companies/top-20 и сортировка по умолчанию
+        "CREATE INDEX IF NOT EXISTS ix_companies_score ON companies (score)",
+        # /companies?status=... и ?industry=... с сортировкой по скору
+        "CREATE INDEX IF NOT EXISTS ix_companies_status_score ON companies (status, score)",
+        "CREATE INDEX IF NOT EXISTS ix_companies_industry_score ON companies (industry, score)",
+        "CREATE INDEX IF NOT EXISTS ix_companies_score_curriculum ON companies (score_curriculum)",
+        # Последнее письмо компании: /letters/{company_id}, отправка и статус email
+        "CREATE INDEX IF NOT EXISTS ix_letters_company_created ON letters (company_id, created_at)",
+        # /letters?status=... и список без фильтров
+        "CREATE INDEX IF NOT EXISTS ix_letters_status_created ON letters (status, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_letters_created_at ON letters (created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_vacancies_company_id ON vacancies (company_id)",
+        "CREATE INDEX IF NOT EXISTS ix_vacancies_url ON vacancies (url)",
+    ]
+    for statement in statements:
+        conn.execute(text(statement))
+
+
+# Таблица -> колонки, по значениям которых ведутся счётчики строк
+COUNTED_DIMENSIONS = {
+    "companies": ("status", "industry"),
+    "letters": ("status", "company_id"),
+}
+
+
+def _counter_value(row: str, column: str) -> str:
+    """Значение колонки как ключ счётчика (NULL -> '')"""
+    return f"COALESCE(CAST({row}.{column} AS TEXT), '')"
+
+
+def _counter_upsert(table: str, dimension: str, value: str, delta: int) -> str:
+    return (
+        f"INSERT INTO row_counters (entity, dimension, value, count) "
+        f"VALUES ('{table}', '{dimension}', {value}, {delta}) "
+        f"ON CONFLICT (entity, dimension, value) DO UPDATE SET count = count + ({delta});"
+    )
+
+
+def _row_counters(conn: Connection) -> None:
+    """Счётчики строк по статусу/индустрии/компании, обновляемые триггерами в той же транзакции"""
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS row_counters ("
+        "entity VARCHAR NOT NULL, dimension VARCHAR NOT NULL, value VARCHAR NOT NULL, count INTEGER NOT NULL, "
+        "PRIMARY KEY (entity, dimension, value))"
+    ))
+
+    for table, dimensions in COUNTED_DIMENSIONS.items():
+        on_insert = [_counter_upsert(table, "all", "''", 1)]
+        on_delete = [_counter_upsert(table, "all", "''", -1)]
+        for column in dimensions:
+            on_insert.append(_counter_upsert(table, column, _counter_value("NEW", column), 1))
+            on_delete.append(_counter_upsert(table, column, _counter_value("OLD", column), -1))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_count_{column}_update "
+                f"AFTER UPDATE OF {column} ON {table} WHEN OLD.{column} IS NOT NEW.{column} BEGIN "
+                + _counter_upsert(table, column, _counter_value("OLD", column), -1)
+                + _counter_upsert(table, column, _counter_value("NEW", column), 1)
+                + " END"
+            ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_count_insert AFTER INSERT ON {table} BEGIN "
+            + "".join(on_insert) + " END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_count_delete AFTER DELETE ON {table} BEGIN "
+            + "".join(on_delete) + " END"
+        ))
+
+        # Начальные значения по уже существующим строкам
+        conn.execute(text("DELETE FROM row_counters WHERE entity = :table"), {"table": table})
+        conn.execute(text(
+            f"INSERT INTO row_counters (entity, dimension, value, count) "
+            f"SELECT '{table}', 'all', '', COUNT(*) FROM {table}"
+        ))
+        for column in dimensions:
+            conn.execute(text(
+                f"INSERT INTO row_counters (entity, dimension, value, count) "
+                f"SELECT '{table}', '{column}', {_counter_value(table, column)}, COUNT(*) "
+                f"FROM {table} GROUP BY {_counter_value(table, column)}"
+            ))
+
+
+def _skill_names_v4(skills) -> list[str]:
+    """Нормализованные названия навыков из JSON-поля (правило на момент миграции 4)"""
+    if isinstance(skills, str):
+        skills = json.loads(skills)
+    if isinstance(skills, str):
+        skills = [skills]
+    names = (" ".join(str(skill).lower().split()) for skill in skills or [])
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def _skill_links(conn: Connection) -> None:
+    """Таблицы skills / company_skills / vacancy_skills и их заполнение из JSON-полей"""
+    _execute_all(conn, [
+        "CREATE TABLE IF NOT EXISTS skills ("
+        "id INTEGER NOT NULL, name VARCHAR NOT NULL, PRIMARY KEY (id), UNIQUE (name))",
+        "CREATE TABLE IF NOT EXISTS company_skills ("
+        "company_id INTEGER NOT NULL, skill_id INTEGER NOT NULL, PRIMARY KEY (company_id, skill_id), "
+        "FOREIGN KEY(company_id) REFERENCES companies (id), FOREIGN KEY(skill_id) REFERENCES skills (id))",
+        "CREATE INDEX IF NOT EXISTS ix_company_skills_skill ON company_skills (skill_id, company_id)",
+        "CREATE TABLE IF NOT EXISTS vacancy_skills ("
+        "vacancy_id INTEGER NOT NULL, skill_id INTEGER NOT NULL, PRIMARY KEY (vacancy_id, skill_id), "
+        "FOREIGN KEY(vacancy_id) REFERENCES vacancies (id), FOREIGN KEY(skill_id) REFERENCES skills (id))",
+        "CREATE INDEX IF NOT EXISTS ix_vacancy_skills_skill ON vacancy_skills (skill_id, vacancy_id)",
+        "DELETE FROM company_skills",
+        "DELETE FROM vacancy_skills",
+    ])
+
+    company_skills = {
+        company_id: _skill_names_v4(skills)
+        for company_id, skills in conn.execute(text("SELECT id, main_skills FROM companies"))
+    }
+    vacancy_skills = {
+        vacancy_id: _skill_names_v4(skills)
+        for vacancy_id, skills in conn.execute(text("SELECT id, skills FROM vacancies WHERE company_id IS NOT NULL"))
+    }
+    names = {name for names in company_skills.values() for name in names}
+    names |= {name for names in vacancy_skills.values() for name in names}
+    if not names:
+        return
+
+    conn.execute(text("INSERT OR IGNORE INTO skills (name) VALUES (:name)"), [{"name": name} for name in sorted(names)])
+    skill_ids = dict(conn.execute(text("SELECT name, id FROM skills")).all())
+    company_links = [
+        {"owner": company_id, "skill": skill_ids[name]}
+        for company_id, company_names in company_skills.items() for name in company_names
+    ]
+    vacancy_links = [
+        {"owner": vacancy_id, "skill": skill_ids[name]}
+        for vacancy_id, vacancy_names in vacancy_skills.items() for name in vacancy_names
+    ]
+    if company_links:
+        conn.execute(text("INSERT INTO company_skills (company_id, skill_id) VALUES (:owner, :skill)"), company_links)
+    if vacancy_links:
+        conn.execute(text("INSERT INTO vacancy_skills (vacancy_id, skill_id) VALUES (:owner, :skill)"), vacancy_links)
+
+
+def _companies_updated_at_index(conn: Connection) -> None:
+    """MAX(updated_at) по индексу: индекс навыков в памяти проверяет, есть ли новые записи"""
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_companies_updated_at ON companies (updated_at)"))
+
+
+def _minhash_lsh(conn: Connection) -> None:
+    """
+    Колонка companies.minhash и таблица company_lsh_bands; подписи и полосы
+    считает сервис similarity при старте (ensure_minhash)
+    """
+    _execute_all(conn, [
+        "CREATE TABLE IF NOT EXISTS company_lsh_bands ("
+        "company_id INTEGER NOT NULL, band INTEGER NOT NULL, bucket INTEGER NOT NULL, "
+        "PRIMARY KEY (company_id, band), FOREIGN KEY(company_id) REFERENCES companies (id))",
+        "CREATE INDEX IF NOT EXISTS ix_company_lsh_bands_bucket ON company_lsh_bands (band, bucket, company_id)",
+    ])
+    _add_columns(conn, "companies", {"minhash": "BLOB"})
+
+
+# FTS5-таблица -> (таблица-источник, индексируемые колонки)
+FTS_TABLES = {
+    "companies_fts": ("companies", ("name",)),
+    "vacancies_fts": ("vacancies", ("position", "description")),
+    "letters_fts": ("letters", ("subject", "body")),
+}
+
+
+def _create_fts(
+        conn: Connection,
+        fts_table: str,
+        table: str,
+        columns: dict[str, str],
+        watched: tuple[str, ...],
+        content: str | None = None,
+) -> None:
+    """
+    FTS5-таблица с внешним содержимым и триггеры, поддерживающие её в той же транзакции
+
+    Args:
+        conn: соединение
+        fts_table: имя FTS5-таблицы
+        table: таблица, изменения которой отслеживают триггеры
+        columns: индексируемая колонка -> SQL-выражение её текста над строкой {row} таблицы table
+        watched: колонки table, при изменении которых строка переиндексируется
+        content: таблица или представление с текстом колонок (по умолчанию table)
+    """
+    column_list = ", ".join(columns)
+    new_values = ", ".join(source.format(row="NEW") for source in columns.values())
+    old_values = ", ".join(source.format(row="OLD") for source in columns.values())
+
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+        f"{column_list}, content='{content or table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    ))
+
+    insert_row = f"INSERT INTO {fts_table} (rowid, {column_list}) VALUES (NEW.id, {new_values});"
+    delete_row = (
+        f"INSERT INTO {fts_table} ({fts_table}, rowid, {column_list}) "
+        f"VALUES ('delete', OLD.id, {old_values});"
+    )
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_insert AFTER INSERT ON {table} BEGIN "
+        f"{insert_row} END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_delete AFTER DELETE ON {table} BEGIN "
+        f"{delete_row} END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_update AFTER UPDATE OF {', '.join(watched)} ON {table} BEGIN "
+        f"{delete_row} {insert_row} END"
+    ))
+    conn.execute(text(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')"))
+
+
+def _drop_fts_triggers(conn: Connection, fts_table: str) -> None:
+    for trigger in ("insert", "delete", "update"):
+        conn.execute(text(f"DROP TRIGGER IF EXISTS trg_{fts_table}_{trigger}"))
+
+
+def _drop_fts(conn: Connection, fts_table: str) -> None:
+    _drop_fts_triggers(conn, fts_table)
+    conn.execute(text(f"DROP TABLE IF EXISTS {fts_table}"))
+
+
+def _full_text_search(conn: Connection) -> None:
+    """Полнотекстовые индексы FTS5 (текст хранится только в таблице-источнике)"""
+    # Описание вакансии в этой версии схемы - открытый текст (сжимается миграцией 8)
+    _add_columns(conn, "vacancies", {"description": "TEXT"})
+
+    for fts_table, (table, columns) in FTS_TABLES.items():
+        _create_fts(conn, fts_table, table, {column: f"{{row}}.{column}" for column in columns}, columns)
+
+
+def _compressed_descriptions(conn: Connection) -> None:
+    """
+    Описания вакансий в vacancies.description_zst (zstd) вместо открытого
+    текста; vacancies_fts читает текст через представление vacancy_texts.
+    Существующие описания сжимаются без словаря - словарь обучает сервис
+    descriptions при старте и импорте и пересжимает ими все описания
+    """
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS compression_dictionaries ("
+        "id INTEGER NOT NULL, data BLOB NOT NULL, samples INTEGER, created_at DATETIME, PRIMARY KEY (id))"
+    ))
+    _add_columns(conn, "vacancies", {"description_zst": "BLOB"})
+    _drop_fts(conn, "vacancies_fts")
+
+    existing = {column["name"] for column in inspect(conn).get_columns("vacancies")}
+    if "description" in existing:
+        rows = conn.execute(text("SELECT id, description FROM vacancies WHERE description IS NOT NULL")).all()
+        if rows:
+            compressor = zstandard.ZstdCompressor(level=9)
+            conn.execute(
+                text("UPDATE vacancies SET description_zst = :blob WHERE id = :id"),
+                [{"id": vacancy_id, "blob": compressor.compress(description.encode("utf-8"))}
+                 for vacancy_id, description in rows],
+            )
+        if _sqlite_version(conn) >= (3, 35, 0):
+            conn.execute(text("ALTER TABLE vacancies DROP COLUMN description"))
+        else:
+            # DROP COLUMN - с SQLite 3.35: колонка остаётся пустой
+            conn.execute(text("UPDATE vacancies SET description = NULL"))
+
+    # zstd_text регистрируется на каждом соединении (app/core/database.py)
+    conn.execute(text(
+        "CREATE VIEW IF NOT EXISTS vacancy_texts AS "
+        "SELECT id, position, zstd_text(description_zst) AS description FROM vacancies"
+    ))
+    _create_fts(
+        conn, "vacancies_fts", "vacancies",
+        {"position": "{row}.position", "description": "zstd_text({row}.description_zst)"},
+        ("position", "description_zst"),
+        content="vacancy_texts",
+    )
+
+
+def _cache_generation(conn: Connection) -> None:
+    """Счётчик поколений данных для кэша ответов API (см. app/services/response_cache.py)"""
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS cache_generation ("
+        "id INTEGER NOT NULL, generation INTEGER NOT NULL, PRIMARY KEY (id))"
+    ))
+    conn.execute(text("INSERT OR IGNORE INTO cache_generation (id, generation) VALUES (1, 0)"))
+
+
+# Таблица -> колонки, видимые в API: их изменение записывается в row_changes
+CHANGE_TRACKED_COLUMNS = {
+    "companies": ("name", "url", "industry", "score", "vacancy_count", "main_skills", "status", "score_curriculum"),
+    "letters": ("company_id", "subject", "body", "status", "sent_at"),
+}
+
+
+def _change_upsert(table: str, row: str, deleted: int) -> str:
+    return (
+        "UPDATE change_sequence SET seq = seq + 1 WHERE id = 1; "
+        f"INSERT INTO row_changes (entity, row_id, seq, deleted) "
+        f"VALUES ('{table}', {row}.id, (SELECT seq FROM change_sequence WHERE id = 1), {deleted}) "
+        f"ON CONFLICT (entity, row_id) DO UPDATE SET seq = excluded.seq, deleted = excluded.deleted;"
+    )
+
+
+def _change_log(conn: Connection) -> None:
+    """
+    Номер изменения для каждой записи в companies и letters (для /api/changes)
+
+    Запись в SQLite - по одной транзакции за раз, поэтому номера растут в порядке
+    фиксации и клиент, прочитавший изменения до seq, не пропустит более ранних.
+    """
+    _execute_all(conn, [
+        "CREATE TABLE IF NOT EXISTS change_sequence ("
+        "id INTEGER NOT NULL, seq INTEGER NOT NULL, PRIMARY KEY (id))",
+        "CREATE TABLE IF NOT EXISTS row_changes ("
+        "entity VARCHAR NOT NULL, row_id INTEGER NOT NULL, seq INTEGER NOT NULL, deleted BOOLEAN NOT NULL, "
+        "PRIMARY KEY (entity, row_id))",
+        "CREATE INDEX IF NOT EXISTS ix_row_changes_seq ON row_changes (seq)",
+    ])
+    conn.execute(text("INSERT OR IGNORE INTO change_sequence (id, seq) VALUES (1, 0)"))
+
+    for table, columns in CHANGE_TRACKED_COLUMNS.items():
+        changed = " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in columns)
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_change_insert AFTER INSERT ON {table} BEGIN "
+            + _change_upsert(table, "NEW", 0) + " END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_change_update "
+            f"AFTER UPDATE OF {', '.join(columns)} ON {table} WHEN {changed} BEGIN "
+            + _change_upsert(table, "NEW", 0) + " END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_change_delete AFTER DELETE ON {table} BEGIN "
+            + _change_upsert(table, "OLD", 1) + " END"
+        ))
+
+        # Существующие строки - изменения с номерами по порядку id
+        conn.execute(text(
+            f"INSERT OR REPLACE INTO row_changes (entity, row_id, seq, deleted) "
+            f"SELECT '{table}', id, (SELECT seq FROM change_sequence WHERE id = 1) + ROW_NUMBER() OVER (ORDER BY id), 0 "
+            f"FROM {table}"
+        ))
+        conn.execute(text(
+            "UPDATE change_sequence SET seq = (SELECT COALESCE(MAX(seq), 0) FROM row_changes) WHERE id = 1"
+        ))
+
+
+def _score_curriculum_not_null(conn: Connection) -> None:
+    """
+    companies.score_curriculum без NULL: колонка - ключ keyset-пагинации
+    (sort_by=curriculum_*), а строки с NULL выпадают из условия
+    (score_curriculum, id) < (key, id) и не попадают на следующие страницы.
+    SQLite не меняет ограничения колонки без пересоздания таблицы, поэтому
+    NULL заменяется на 0 триггерами - как NOT NULL DEFAULT 0
+    """
+    conn.execute(text("UPDATE companies SET score_curriculum = 0 WHERE score_curriculum IS NULL"))
+    for event in ("INSERT", "UPDATE OF score_curriculum"):
+        name = event.split()[0].lower()
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS trg_companies_curriculum_{name} AFTER {event} ON companies "
+            "WHEN NEW.score_curriculum IS NULL BEGIN "
+            "UPDATE companies SET score_curriculum = 0 WHERE id = NEW.id; END"
+        ))
+
+
+def _lsh_bands(conn: Connection) -> None:
+    """
+    Новое разбиение подписи на полосы (16 x 8 вместо 64 x 2): старые подписи
+    и полосы сбрасываются, сервис similarity пересчитывает их при старте
+    """
+    conn.execute(text("DELETE FROM company_lsh_bands"))
+    conn.execute(text("UPDATE companies SET minhash = NULL WHERE minhash IS NOT NULL"))
+
+
+def _growth_time_decay(conn: Connection) -> None:
+    """
+    companies.growth_updated_at: тренд роста затухает по времени с прошлого
+    обновления, а не на каждом импорте. До миграции тренды затухали на каждом
+    импорте, поэтому отсчёт - время последнего импорта со снимками
+    """
+    _add_columns(conn, "companies", {"growth_updated_at": "DATETIME"})
+    conn.execute(text(
+        "UPDATE companies SET growth_updated_at = (SELECT MAX(taken_at) FROM vacancy_snapshots) "
+        "WHERE last_snapshot_count IS NOT NULL"
+    ))
+
+
+def _vacancy_search_queue(conn: Connection) -> None:
+    """
+    vacancies_fts без триггеров на zstd_text: функцию регистрирует только
+    приложение, и любая другая запись в vacancies (sqlite3, скрипт резервного
+    копирования) падала бы с "no such function". Триггеры на простых колонках
+    ставят строку в очередь vacancies_fts_queue со старыми значениями, которые
+    сейчас в индексе (первое изменение после переноса); в индекс очередь
+    переносит приложение (search.index_pending_vacancies)
+    """
+    _drop_fts_triggers(conn, "vacancies_fts")
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS vacancies_fts_queue ("
+        "vacancy_id INTEGER NOT NULL, position VARCHAR, description_zst BLOB, indexed BOOLEAN NOT NULL, "
+        "PRIMARY KEY (vacancy_id))"
+    ))
+    enqueue_old = (
+        "INSERT OR IGNORE INTO vacancies_fts_queue (vacancy_id, position, description_zst, indexed) "
+        "VALUES (OLD.id, OLD.position, OLD.description_zst, 1);"
+    )
+    _execute_all(conn, [
+        "CREATE TRIGGER IF NOT EXISTS trg_vacancies_fts_queue_insert AFTER INSERT ON vacancies BEGIN "
+        "INSERT OR IGNORE INTO vacancies_fts_queue (vacancy_id, position, description_zst, indexed) "
+        "VALUES (NEW.id, NULL, NULL, 0); END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_vacancies_fts_queue_delete AFTER DELETE ON vacancies BEGIN {enqueue_old} END",
+        "CREATE TRIGGER IF NOT EXISTS trg_vacancies_fts_queue_update "
+        f"AFTER UPDATE OF position, description_zst ON vacancies BEGIN {enqueue_old} END",
+    ])
+
+
+MIGRATIONS = [
+    (1, "baseline", _baseline),
+    (2, "hot_query_indexes", _hot_query_indexes),
+    (3, "row_counters", _row_counters),
+    (4, "skill_links", _skill_links),
+    (5, "companies_updated_at_index", _companies_updated_at_index),
+    (6, "minhash_lsh", _minhash_lsh),
+    (7, "full_text_search", _full_text_search),
+    (8, "compressed_descriptions", _compressed_descriptions),
+    (9, "cache_generation", _cache_generation),
+    (10, "change_log", _change_log),
+    (11, "score_curriculum_not_null", _score_curriculum_not_null),
+    (12, "lsh_bands", _lsh_bands),
+    (13, "growth_time_decay", _growth_time_decay),
+    (14, "vacancy_search_queue", _vacancy_search_queue),
+]
+
+
+def get_schema_version(conn: Connection) -> int:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at DATETIME NOT NULL)"
+    ))
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")).scalar()
+
+
+def run_migrations(engine: Engine) -> list[int]:
+    """
+    Применить все ещё не применённые миграции по порядку
+
+    Args:
+        engine: синхронный движок
+
+    Returns:
+        Версии, применённые этим вызовом
+    """
+    applied = []
+    with engine.begin() as conn:
+        current = get_schema_version(conn)
+
+    for version, name, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(
+                text("INSERT OR IGNORE INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :at)"),
+                {"v": version, "n": name, "at": datetime.utcnow()},
+            )
+        logger.info(f"Применена миграция {version}: {name}")
+        applied.append(version)
+
+    return applied
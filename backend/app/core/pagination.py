@@ -0,0 +1,66 @@
+"""
+Keyset-пагинация (курсоры)
+
+Страница выбирается условием (ключ сортировки, id) < / > значений последней
+строки предыдущей страницы, а не OFFSET: каждая страница - один поиск по
+индексу независимо от глубины, строки не "переезжают" между страницами.
+Курсор - непрозрачная base64-строка с режимом сортировки и значениями ключа.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import tuple_
+
+
+def encode_cursor(sort: str, key: Any, row_id: int) -> str:
+    """Курсор на строку (key, row_id) в режиме сортировки sort"""
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    payload = json.dumps({"s": sort, "k": [key, row_id]}, ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, datetime_key: bool = False) -> tuple[Any, int]:
+    """
+    Разобрать курсор
+
+    Args:
+        cursor: значение next_cursor из предыдущего ответа
+        sort: текущий режим сортировки (должен совпадать с режимом курсора)
+        datetime_key: ключ сортировки - дата (хранится в ISO-формате)
+
+    Returns:
+        Кортеж (значение ключа, id)
+
+    Raises:
+        ValueError: если курсор повреждён или выдан для другой сортировки
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        key, row_id = payload["k"]
+        if payload["s"] != sort or not isinstance(row_id, int):
+            raise ValueError
+        if datetime_key:
+            key = datetime.fromisoformat(key)
+    except (ValueError, TypeError, KeyError, binascii.Error, UnicodeError):
+        raise ValueError("Недопустимый курсор")
+    return key, row_id
+
+
+def keyset_filter(key_column, id_column, descending: bool, key: Any, row_id: int):
+    """Условие "строго после (key, row_id)" для ORDER BY key, id в одном направлении"""
+    if descending:
+        return tuple_(key_column, id_column) < tuple_(key, row_id)
+    return tuple_(key_column, id_column) > tuple_(key, row_id)
+
+
+def keyset_order(key_column, id_column, descending: bool) -> tuple:
+    """ORDER BY для keyset-пагинации: id - разрешение равных значений ключа"""
+    if descending:
+        return key_column.desc(), id_column.desc()
+    return key_column.asc(), id_column.asc()
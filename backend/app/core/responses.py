@@ -0,0 +1,65 @@
+"""
+Быстрый путь ответов API (включается FAST_JSON_RESPONSES=1)
+
+Эндпоинты списков и деталей компаний выбирают из БД только нужные колонки и
+сериализуют строки в JSON через orjson напрямую (строка -> dict -> байты),
+без построения ORM-объектов и Pydantic-моделей на каждую запись. Форма JSON
+совпадает с response_model эндпоинта. Кэш ответов хранит готовые байты.
+
+Параметр fields= (sparse fieldsets) списков сужает и SELECT, и JSON до
+перечисленных полей: такие ответы всегда собираются этим путём.
+"""
+
+import os
+from typing import Iterable, Optional
+
+import orjson
+from dotenv import load_dotenv
+from fastapi import Response
+
+load_dotenv()
+
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "0") == "1"
+
+
+def dump_json(content) -> bytes:
+    """JSON-байты (datetime - ISO 8601, как у FastAPI)"""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_response(body: bytes, response: Response) -> Response:
+    """
+    Ответ с готовым JSON-телом
+
+    Args:
+        body: JSON-байты (dump_json)
+        response: Response эндпоинта - его заголовки (ETag) переносятся в ответ
+    """
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
+
+
+def parse_fields(fields: Optional[str], available: Iterable[str]) -> Optional[list[str]]:
+    """
+    Разобрать параметр fields= (поля через запятую)
+
+    Args:
+        fields: значение параметра или None
+        available: допустимые поля в порядке ответа
+
+    Returns:
+        Запрошенные поля в порядке available (id - всегда) или None - все поля
+
+    Raises:
+        ValueError: если запрошено неизвестное поле
+    """
+    if fields is None:
+        return None
+    available = list(available)
+    requested = {field.strip() for field in fields.split(",")} - {""}
+    unknown = requested - set(available)
+    if unknown:
+        raise ValueError(
+            f"Недопустимые поля: {', '.join(sorted(unknown))}. Разрешены: {', '.join(available)}"
+        )
+    requested.add("id")
+    return [field for field in available if field in requested]
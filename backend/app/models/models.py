@@ -1,11 +1,20 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, JSON, Boolean, Index, LargeBinary
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
+from app.core.compression import text_codec
 from app.core.database import Base
 
 
 class Company(Base):
     __tablename__ = "companies"
+    # Индексы под фильтры и сортировки API (см. app/core/migrations.py)
+    __table_args__ = (
+        Index("ix_companies_score", "score"),
+        Index("ix_companies_status_score", "status", "score"),
+        Index("ix_companies_industry_score", "industry", "score"),
+        Index("ix_companies_score_curriculum", "score_curriculum"),
+        Index("ix_companies_updated_at", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -18,24 +27,59 @@ class Company(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Нормированные компоненты скора 0..1 (score = взвешенная сумма * 100)
+    score_vacancy = Column(Float, default=0.0)
+    score_skills = Column(Float, default=0.0)
+    score_size = Column(Float, default=0.0)
+    score_growth = Column(Float, default=0.0)
+    # Косинусная близость стека компании к программе "ПроКомпетенции"
+    score_curriculum = Column(Float, default=0.0)
+    # Сумма IDF-весов навыков компании (редкие навыки весят больше)
+    skills_weight = Column(Float, default=0.0)
+    # Тренд роста числа вакансий (сумма относительных изменений, затухающая со временем)
+    growth_trend = Column(Float, default=0.0)
+    growth_updated_at = Column(DateTime, nullable=True)
+    last_snapshot_count = Column(Integer, nullable=True)
+    # MinHash-подпись набора навыков (uint32 x MINHASH_PERMUTATIONS, см. services/similarity.py);
+    # не загружается вместе с компанией - читается явно
+    minhash = deferred(Column(LargeBinary, nullable=True))
+
     vacancies = relationship("Vacancy", back_populates="company")
     letters = relationship("Letter", back_populates="company")
     logs = relationship("ApprovalLog", back_populates="company")
+    snapshots = relationship("VacancySnapshot", back_populates="company")
 
 class Vacancy(Base):
     __tablename__ = "vacancies"
 
     id = Column(Integer, primary_key=True, index=True)
-    company_id = Column(Integer, ForeignKey("companies.id"))
+    company_id = Column(Integer, ForeignKey("companies.id"), index=True)
     position = Column(String)
     skills = Column(JSON)
-    url = Column(String)
+    url = Column(String, index=True)
+    # Полный текст вакансии из парсера, сжатый zstd со словарём (см. app/core/compression.py);
+    # списки его не загружают
+    description_zst = deferred(Column(LargeBinary, nullable=True))
 
     company = relationship("Company", back_populates="vacancies")
 
+    @property
+    def description(self):
+        """Текст вакансии: распаковывается при обращении"""
+        return text_codec.decompress(self.description_zst)
+
+    @description.setter
+    def description(self, value):
+        self.description_zst = text_codec.compress(value)
+
 
 class Letter(Base):
     __tablename__ = "letters"
+    __table_args__ = (
+        Index("ix_letters_company_created", "company_id", "created_at"),
+        Index("ix_letters_status_created", "status", "created_at"),
+        Index("ix_letters_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"))
@@ -61,4 +105,154 @@ class ApprovalLog(Base):
     details = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    company = relationship("Company", back_populates="logs")
\ No newline at end of file
+    company = relationship("Company", back_populates="logs")
+
+
+class ScoringStats(Base):
+    """Сохранённые нормировки скоринга и агрегаты по компонентам (одна строка)"""
+    __tablename__ = "scoring_stats"
+
+    id = Column(Integer, primary_key=True)
+    max_vacancy_count = Column(Integer, default=1)
+    # Максимум числа навыков компании - статистика, в скоре не участвует
+    max_skills_possible = Column(Integer, default=1)
+    companies_count = Column(Integer, default=0)
+    total_vacancies = Column(Integer, default=0)
+    total_skills = Column(Integer, default=0)
+    # Нормировка компонента навыков: максимум IDF-взвешенной суммы навыков
+    max_skill_weight = Column(Float, default=1.0)
+    skill_documents = Column(Integer, default=0)
+    curriculum_version = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ScoreHistogram(Base):
+    """Гистограмма значений компонента скора: сколько компаний имеют value"""
+    __tablename__ = "score_histogram"
+
+    component = Column(String, primary_key=True)
+    value = Column(Integer, primary_key=True)
+    companies = Column(Integer, default=0)
+
+
+class ScoringWeights(Base):
+    """Версии весов компонентов скора (активна последняя версия)"""
+    __tablename__ = "scoring_weights"
+
+    id = Column(Integer, primary_key=True, index=True)
+    w_vacancy = Column(Float)
+    w_skills = Column(Float)
+    w_size = Column(Float)
+    w_growth = Column(Float)
+    w_curriculum = Column(Float, default=0.0)
+    comment = Column(String, nullable=True)
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SkillWeight(Base):
+    """Документная частота навыка по вакансиям и его IDF-вес"""
+    __tablename__ = "skill_weights"
+
+    skill = Column(String, primary_key=True)
+    document_frequency = Column(Integer, default=0)
+    idf = Column(Float, default=1.0)
+
+
+class VacancySnapshot(Base):
+    """Снимок числа вакансий компании (append-only, только при изменении)"""
+    __tablename__ = "vacancy_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), index=True)
+    vacancy_count = Column(Integer)
+    taken_at = Column(DateTime, default=datetime.utcnow)
+
+    company = relationship("Company", back_populates="snapshots")
+
+
+class CompressionDictionary(Base):
+    """Словарь zstd (неизменяем; ID совпадает с ID словаря в заголовках zstd-кадров)"""
+    __tablename__ = "compression_dictionaries"
+
+    id = Column(Integer, primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    samples = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class CacheGeneration(Base):
+    """Поколение данных для кэша ответов API (одна строка): растёт с каждой записью, меняющей ответы"""
+    __tablename__ = "cache_generation"
+
+    id = Column(Integer, primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+
+
+class ChangeSequence(Base):
+    """Номер последнего изменения компаний и писем (одна строка, растёт в триггерах)"""
+    __tablename__ = "change_sequence"
+
+    id = Column(Integer, primary_key=True)
+    seq = Column(Integer, nullable=False, default=0)
+
+
+class RowChange(Base):
+    """Последнее изменение строки: номер из change_sequence (поддерживается триггерами, см. app/core/migrations.py)"""
+    __tablename__ = "row_changes"
+    # Изменения после since: поиск по seq без обращения к таблице
+    __table_args__ = (Index("ix_row_changes_seq", "seq"),)
+
+    entity = Column(String, primary_key=True)
+    row_id = Column(Integer, primary_key=True)
+    seq = Column(Integer, nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False)
+
+
+class RowCounter(Base):
+    """Число строк таблицы по значению колонки (поддерживается триггерами, см. app/core/migrations.py)"""
+    __tablename__ = "row_counters"
+
+    entity = Column(String, primary_key=True)
+    # "all" (value = "") - всего строк; иначе имя колонки
+    dimension = Column(String, primary_key=True)
+    value = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class Skill(Base):
+    """Справочник навыков (нормализованное название)"""
+    __tablename__ = "skills"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+
+
+class CompanySkill(Base):
+    """Навык компании (из Company.main_skills)"""
+    __tablename__ = "company_skills"
+    # Поиск компаний по навыку: skill_id -> company_id без обращения к таблице
+    __table_args__ = (Index("ix_company_skills_skill", "skill_id", "company_id"),)
+
+    company_id = Column(Integer, ForeignKey("companies.id"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
+
+
+class VacancySkill(Base):
+    """Навык вакансии (из Vacancy.skills)"""
+    __tablename__ = "vacancy_skills"
+    __table_args__ = (Index("ix_vacancy_skills_skill", "skill_id", "vacancy_id"),)
+
+    vacancy_id = Column(Integer, ForeignKey("vacancies.id"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
+
+
+class CompanyLshBand(Base):
+    """LSH-корзина компании: хэш полосы MinHash-подписи"""
+    __tablename__ = "company_lsh_bands"
+    # Кандидаты в похожие: (полоса, корзина) -> company_id без обращения к таблице
+    __table_args__ = (Index("ix_company_lsh_bands_bucket", "band", "bucket", "company_id"),)
+
+    company_id = Column(Integer, ForeignKey("companies.id"), primary_key=True)
+    band = Column(Integer, primary_key=True)
+    bucket = Column(Integer, nullable=False)
@@ -2,6 +2,6 @@
 Routers package для API эндпоинтов
 """
 
-from . import companies, letters, emails
+from . import changes, companies, dashboard, letters, emails, scoring, skills, search, vacancies
 
-__all__ = ["companies", "letters", "emails"]
+__all__ = ["changes", "companies", "dashboard", "letters", "emails", "scoring", "skills", "search", "vacancies"]
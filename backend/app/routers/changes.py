@@ -0,0 +1,60 @@
+"""
+Changes Router - Изменения компаний и писем для инкрементальной синхронизации клиентов
+"""
+
+from fastapi import APIRouter, Query, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.schemas.schemas import ChangesResponse, CompanyResponse, LetterResponse
+from app.services.changes import changes_since
+
+router = APIRouter()
+
+
+@router.get("/changes", response_model=ChangesResponse)
+async def get_changes(
+    since: int = Query(0, ge=0, description="seq из предыдущего ответа (0 - все строки)"),
+    limit: int = Query(500, ge=1, le=1000, description="Максимум строк в ответе"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Получить компании и письма, изменённые после since, и ID удалённых
+    
+    Args:
+        since: номер изменения, до которого клиент уже синхронизирован
+        limit: максимум строк (при has_more - повторить запрос с since=seq)
+    """
+    changes = await changes_since(db, since, limit)
+    
+    return ChangesResponse(
+        seq=changes["seq"],
+        has_more=changes["has_more"],
+        reset=changes["reset"],
+        companies=[
+            CompanyResponse(
+                id=company.id,
+                name=company.name,
+                url=company.url,
+                industry=company.industry,
+                score=company.score,
+                vacancy_count=company.vacancy_count,
+                status=company.status,
+                main_skills=company.main_skills if company.main_skills else [],
+                curriculum_match=company.score_curriculum or 0.0
+            )
+            for company in changes["companies"]
+        ],
+        letters=[
+            LetterResponse(
+                id=letter.id,
+                subject=letter.subject,
+                body=letter.body,
+                status=letter.status,
+                company_name=letter.company.name if letter.company else None
+            )
+            for letter in changes["letters"]
+        ],
+        deleted_companies=changes["deleted_companies"],
+        deleted_letters=changes["deleted_letters"]
+    )
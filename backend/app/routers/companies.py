@@ -2,20 +2,34 @@
 Companies Router - Эндпоинты для работы с компаниями
 """
 
-from fastapi import APIRouter, Query, Depends, HTTPException, Body
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Query, Depends, HTTPException, Body, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import logging
 
-from app.core.database import get_db
-from app.models.models import Company
+from app.core.database import get_async_db
+from app.core.etag import conditional_response, make_etag
+from app.core.pagination import decode_cursor, encode_cursor, keyset_filter, keyset_order
+from app.core.responses import FAST_JSON_RESPONSES, dump_json, json_response, parse_fields
+from app.models.models import CacheGeneration, Company, Vacancy
 from app.schemas.schemas import (
     CompanyResponse,
+    CompanyDetailResponse,
     CompanyApproveRequest,
     CompanyRejectRequest,
     PaginatedCompaniesResponse,
+    PaginatedVacanciesResponse,
+    ResponseCacheStatsResponse,
+    SimilarCompaniesResponse,
+    SkillMatchItem,
     VacancyResponse
 )
+from app.services.counters import resolve_total
+from app.services.curriculum import normalize_skill
+from app.services.response_cache import bump_generation, cache_key, current_generation, response_cache
+from app.services.skill_links import companies_with_skills, vacancies_with_skills
+from app.services.similarity import LSH_BANDS, find_similar
 # from test_companies_api import company
 
 # Настройка логирования
@@ -24,14 +38,170 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+# sort_by -> (колонка, по убыванию); при равенстве порядок задаёт id
+COMPANY_SORTS = {
+    "score_desc": (Company.score, True),
+    "score_asc": (Company.score, False),
+    "name_asc": (Company.name, False),
+    "name_desc": (Company.name, True),
+    "curriculum_desc": (Company.score_curriculum, True),
+    "curriculum_asc": (Company.score_curriculum, False),
+}
+
+# Быстрый путь (FAST_JSON_RESPONSES) и fields=: поле CompanyResponse -> колонка
+COMPANY_FIELDS = {
+    "id": Company.id,
+    "name": Company.name,
+    "url": Company.url,
+    "industry": Company.industry,
+    "score": Company.score,
+    "vacancy_count": Company.vacancy_count,
+    "status": Company.status,
+    "main_skills": Company.main_skills,
+    "curriculum_match": Company.score_curriculum,
+}
+
+
+def _company_dict(row, fields: list[str] | None = None) -> dict:
+    """
+    Строка колонок -> JSON-форма CompanyResponse
+
+    Args:
+        row: строка с колонками COMPANY_FIELDS (или только fields - в том же порядке)
+        fields: поля sparse-ответа (parse_fields) или None - полный CompanyResponse
+    """
+    item = dict(zip(fields or COMPANY_FIELDS, row))
+    if "main_skills" in item:
+        item["main_skills"] = item["main_skills"] or []
+    if "curriculum_match" in item:
+        item["curriculum_match"] = item["curriculum_match"] or 0.0
+    if fields is None:
+        item["vacancies"] = []
+    return item
+
+
+# Вакансий в деталях компании; следующие страницы - /companies/{id}/vacancies
+DETAIL_VACANCIES_LIMIT = 20
+
+
+def _skills_key(skills: str | None) -> str | None:
+    """Навыки фильтра в нормализованном виде - для ключей кэша и ETag"""
+    if not skills:
+        return None
+    return ",".join(sorted({normalize_skill(skill) for skill in skills.split(",")} - {""}))
+
+
+async def _vacancy_page(
+    db: AsyncSession,
+    company_id: int,
+    limit: int,
+    cursor: str | None = None,
+    skills: str | None = None,
+    skills_mode: str = "and"
+) -> tuple[list[dict], str | None]:
+    """
+    Страница вакансий компании в порядке id - один запрос по индексу company_id
+
+    Args:
+        company_id: ID компании
+        limit: размер страницы
+        cursor: next_cursor предыдущей страницы (keyset: id > последнего)
+        skills: навыки через запятую (индекс vacancy_skills)
+        skills_mode: and, or
+
+    Returns:
+        Кортеж (вакансии в JSON-форме VacancyResponse, курсор следующей страницы или None)
+
+    Raises:
+        ValueError: если курсор или фильтр навыков недопустимы
+    """
+    query = (
+        select(Vacancy.id, Vacancy.position, Vacancy.url, Vacancy.skills)
+        .where(Vacancy.company_id == company_id)
+        .order_by(Vacancy.id)
+    )
+    if cursor:
+        _, last_id = decode_cursor(cursor, "vacancies")
+        query = query.where(Vacancy.id > last_id)
+    if skills:
+        query = query.where(vacancies_with_skills(skills.split(","), skills_mode))
+
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor("vacancies", rows[-1].id, rows[-1].id)
+    vacancies = [
+        {"id": vacancy_id, "position": position, "url": url, "skills": vacancy_skills or []}
+        for vacancy_id, position, url, vacancy_skills in rows
+    ]
+    return vacancies, next_cursor
+
+
+async def _company_version(db: AsyncSession, id: int):
+    """
+    Версия компании (и её вакансий) - одним запросом по первичным ключам
+
+    Raises:
+        HTTPException: 404, если компании нет
+    """
+    version = (await db.execute(
+        select(
+            Company.updated_at,
+            select(CacheGeneration.generation).where(CacheGeneration.id == 1).scalar_subquery()
+        ).where(Company.id == id)
+    )).first()
+    if version is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Компания с ID {id} не найдена"
+        )
+    return tuple(version)
+
+
+def _parse_company_fields(fields: str | None) -> list[str] | None:
+    try:
+        return parse_fields(fields, COMPANY_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/companies/top-20", response_model=List[CompanyResponse])
-async def get_top_companies(db: Session = Depends(get_db)):
+async def get_top_companies(
+    request: Request,
+    response: Response,
+    fields: str | None = Query(None, description="Поля ответа через запятую, например: name,score,status"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Получить Top-20 компаний по скору
+    
+    Args:
+        fields: вернуть только эти поля CompanyResponse (id - всегда)
     """
-    companies = db.query(Company).order_by(Company.score.desc()).limit(20).all()
+    selected = _parse_company_fields(fields)
+    generation = await current_generation(db)
+    key = cache_key("companies/top-20", fields=",".join(selected) if selected else None)
+    not_modified = conditional_response(request, response, make_etag(key, generation))
+    if not_modified:
+        return not_modified
+    cached = response_cache.get(key, generation)
+    if isinstance(cached, bytes):
+        return json_response(cached, response)
+    if cached is not None:
+        return cached
+    
+    if FAST_JSON_RESPONSES or selected:
+        columns = [COMPANY_FIELDS[field] for field in selected or COMPANY_FIELDS]
+        rows = await db.execute(select(*columns).order_by(Company.score.desc()).limit(20))
+        body = dump_json([_company_dict(row, selected) for row in rows])
+        response_cache.put(key, generation, body)
+        return json_response(body, response)
     
-    return [
+    result = await db.execute(select(Company).order_by(Company.score.desc()).limit(20))
+    companies = result.scalars().all()
+    
+    top = [
         CompanyResponse(
             id=company.id,
             name=company.name,
@@ -40,29 +210,51 @@ async def get_top_companies(db: Session = Depends(get_db)):
             score=company.score,
             vacancy_count=company.vacancy_count,
             status=company.status,
-            main_skills=company.main_skills if company.main_skills else []
+            main_skills=company.main_skills if company.main_skills else [],
+            curriculum_match=company.score_curriculum or 0.0
         )
         for company in companies
     ]
+    response_cache.put(key, generation, top)
+    return top
+
+
+@router.get("/companies/cache/stats", response_model=ResponseCacheStatsResponse)
+async def get_cache_stats():
+    """
+    Статистика кэша ответов списков компаний (попадания, промахи, вытеснения)
+    """
+    return ResponseCacheStatsResponse(**response_cache.stats())
 
 
-@router.get("/companies/{id}", response_model=CompanyResponse)
-async def get_company_details(id: int, db: Session = Depends(get_db)):
+@router.get("/companies/{id}", response_model=CompanyDetailResponse)
+async def get_company_details(
+    id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    Получить детали конкретной компании
+    Получить детали конкретной компании с первыми DETAIL_VACANCIES_LIMIT вакансиями
     
     Args:
         id: ID компании
     """
-    company = db.query(Company).options(joinedload(Company.vacancies)).filter(Company.id == id).first()
+    version = await _company_version(db, id)
+    not_modified = conditional_response(request, response, make_etag("companies", id, *version))
+    if not_modified:
+        return not_modified
     
-    if not company:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Компания с ID {id} не найдена"
-        )
+    if FAST_JSON_RESPONSES:
+        row = (await db.execute(select(*COMPANY_FIELDS.values()).where(Company.id == id))).first()
+        company = _company_dict(row)
+        company["vacancies"], company["vacancies_next_cursor"] = await _vacancy_page(db, id, DETAIL_VACANCIES_LIMIT)
+        return json_response(dump_json(company), response)
     
-    return CompanyResponse(
+    company = await db.get(Company, id)
+    vacancies, next_cursor = await _vacancy_page(db, id, DETAIL_VACANCIES_LIMIT)
+    
+    return CompanyDetailResponse(
         id=company.id,
         name=company.name,
         url=company.url,
@@ -71,13 +263,95 @@ async def get_company_details(id: int, db: Session = Depends(get_db)):
         vacancy_count=company.vacancy_count,
         status=company.status,
         main_skills=company.main_skills if company.main_skills else [],
-        vacancies=[
-            VacancyResponse(
-                id=v.id,
-                position=v.position,
-                url=v.url,
-                skills=v.skills if v.skills else []
-            ) for v in company.vacancies
+        curriculum_match=company.score_curriculum or 0.0,
+        vacancies=[VacancyResponse(**vacancy) for vacancy in vacancies],
+        vacancies_next_cursor=next_cursor
+    )
+
+
+@router.get("/companies/{id}/vacancies", response_model=PaginatedVacanciesResponse)
+async def get_company_vacancies(
+    id: int,
+    request: Request,
+    response: Response,
+    skills: str | None = Query(None, description="Навыки через запятую, например: python,kafka"),
+    skills_mode: str = Query("and", description="and - все навыки, or - хотя бы один"),
+    limit: int = Query(20, ge=1, le=100, description="Количество записей"),
+    cursor: str | None = Query(None, description="Курсор следующей страницы (next_cursor)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Получить вакансии компании страницами (keyset-пагинация по id)
+    
+    Args:
+        id: ID компании
+        skills: навыки через запятую (ищутся по индексу vacancy_skills)
+        skills_mode: and, or
+        limit: количество записей
+        cursor: next_cursor из предыдущего ответа (или vacancies_next_cursor деталей компании)
+    """
+    version = await _company_version(db, id)
+    etag = make_etag(
+        "companies/vacancies", id, _skills_key(skills), skills_mode if skills else None, limit, cursor, *version
+    )
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    try:
+        vacancies, next_cursor = await _vacancy_page(db, id, limit, cursor, skills, skills_mode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if FAST_JSON_RESPONSES:
+        return json_response(dump_json({"data": vacancies, "limit": limit, "next_cursor": next_cursor}), response)
+    
+    return PaginatedVacanciesResponse(
+        data=[VacancyResponse(**vacancy) for vacancy in vacancies],
+        limit=limit,
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/companies/{id}/similar", response_model=SimilarCompaniesResponse)
+async def get_similar_companies(
+    id: int,
+    k: int = Query(10, ge=1, le=100, description="Сколько похожих компаний вернуть"),
+    min_band_hits: int = Query(1, ge=1, le=LSH_BANDS, description="Минимум совпавших LSH-полос (выше - точнее)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Получить компании с похожим стеком (MinHash + LSH)
+    
+    Args:
+        id: ID компании
+        k: размер top-k
+        min_band_hits: сколько LSH-полос должно совпасть у кандидата
+    """
+    try:
+        similar, candidates = await find_similar(db, id, k, min_band_hits)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return SimilarCompaniesResponse(
+        company_id=id,
+        candidates=candidates,
+        data=[
+            SkillMatchItem(
+                company=CompanyResponse(
+                    id=company.id,
+                    name=company.name,
+                    url=company.url,
+                    industry=company.industry,
+                    score=company.score,
+                    vacancy_count=company.vacancy_count,
+                    status=company.status,
+                    main_skills=company.main_skills if company.main_skills else [],
+                    curriculum_match=company.score_curriculum or 0.0
+                ),
+                similarity=similarity
+            )
+            for company, similarity in similar
         ]
     )
 
@@ -86,7 +360,7 @@ async def get_company_details(id: int, db: Session = Depends(get_db)):
 async def approve_company(
     id: int,
     request: CompanyApproveRequest = Body(default=CompanyApproveRequest()),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Одобрить компанию (статус -> approved)
@@ -95,7 +369,7 @@ async def approve_company(
         id: ID компании
         request: комментарий к одобрению (опционально)
     """
-    company = db.query(Company).filter(Company.id == id).first()
+    company = await db.get(Company, id)
     
     if not company:
         raise HTTPException(
@@ -105,8 +379,8 @@ async def approve_company(
     
     # Обновляем статус
     company.status = "approved"
-    db.commit()
-    db.refresh(company)
+    await bump_generation(db)
+    await db.commit()
     
     # Логирование действия (вместо ApprovalLog)
     logger.info(f"Company {id} ({company.name}) approved. Comment: {request.comment}")
@@ -115,10 +389,13 @@ async def approve_company(
     return CompanyResponse(
         id=company.id,
         name=company.name,
+        url=company.url,
+        industry=company.industry,
         score=company.score,
         vacancy_count=company.vacancy_count,
         status=company.status,
-        main_skills=company.main_skills if company.main_skills else []
+        main_skills=company.main_skills if company.main_skills else [],
+        curriculum_match=company.score_curriculum or 0.0
     )
 
 
@@ -126,7 +403,7 @@ async def approve_company(
 async def reject_company(
     id: int,
     request: CompanyRejectRequest = Body(default=CompanyRejectRequest()),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Отклонить компанию (статус -> rejected)
@@ -135,7 +412,7 @@ async def reject_company(
         id: ID компании
         request: причина отклонения (опционально)
     """
-    company = db.query(Company).filter(Company.id == id).first()
+    company = await db.get(Company, id)
     
     if not company:
         raise HTTPException(
@@ -145,8 +422,8 @@ async def reject_company(
     
     # Обновляем статус
     company.status = "rejected"
-    db.commit()
-    db.refresh(company)
+    await bump_generation(db)
+    await db.commit()
     
     # Логирование действия (вместо ApprovalLog)
     logger.info(f"Company {id} ({company.name}) rejected. Reason: {request.reason}")
@@ -155,22 +432,32 @@ async def reject_company(
     return CompanyResponse(
         id=company.id,
         name=company.name,
+        url=company.url,
+        industry=company.industry,
         score=company.score,
         vacancy_count=company.vacancy_count,
         status=company.status,
-        main_skills=company.main_skills if company.main_skills else []
+        main_skills=company.main_skills if company.main_skills else [],
+        curriculum_match=company.score_curriculum or 0.0
     )
 
 
 @router.get("/companies", response_model=PaginatedCompaniesResponse)
 async def get_companies(
+    request: Request,
+    response: Response,
     status: str | None = Query(None, description="Фильтр по статусу"),
     industry: str | None = Query(None, description="Фильтр по индустрии"),
     min_score: float | None = Query(None, ge=0, le=100, description="Минимальный скор"),
+    skills: str | None = Query(None, description="Навыки через запятую, например: python,kafka"),
+    skills_mode: str = Query("and", description="and - все навыки, or - хотя бы один"),
     sort_by: str | None = Query(None, description="Сортировка"),
     page: int = Query(1, ge=1, description="Номер страницы"),
     limit: int = Query(20, ge=1, le=100, description="Количество записей"),
-    db: Session = Depends(get_db)
+    cursor: str | None = Query(None, description="Курсор следующей страницы (next_cursor)"),
+    total: str = Query("exact", description="Подсчёт total: exact, estimate, none"),
+    fields: str | None = Query(None, description="Поля ответа через запятую, например: name,score,status"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Получить все компании с фильтрацией и пагинацией
@@ -179,9 +466,16 @@ async def get_companies(
         status: new, approved, rejected, sent, responded
         industry: IT, Finance, etc.
         min_score: 0-100
-        sort_by: score_desc, score_asc, name_asc, name_desc
-        page: номер страницы
+        skills: навыки через запятую (ищутся по индексу company_skills)
+        skills_mode: and, or
+        sort_by: score_desc, score_asc, name_asc, name_desc, curriculum_desc, curriculum_asc
+        page: номер страницы (игнорируется, если передан cursor)
         limit: количество записей
+        cursor: next_cursor из предыдущего ответа - keyset-пагинация без OFFSET
+        total: exact - точное количество, estimate - допускается оценка по счётчикам,
+            none - не считать
+        fields: вернуть только эти поля CompanyResponse (id - всегда); в SELECT
+            попадают только их колонки
     """
     # Валидация status
     if status and status not in ["new", "approved", "rejected", "sent", "responded"]:
@@ -189,37 +483,102 @@ async def get_companies(
             status_code=400,
             detail=f"Недопустимый статус: {status}. Разрешены: new, approved, rejected, sent, responded"
         )
+    selected = _parse_company_fields(fields)
     
     # Базовый запрос
-    query = db.query(Company)
+    query = select(Company)
     
     # Применяем фильтры
     if status:
-        query = query.filter(Company.status == status)
+        query = query.where(Company.status == status)
     if industry:
-        query = query.filter(Company.industry == industry)
+        query = query.where(Company.industry == industry)
     if min_score is not None:
-        query = query.filter(Company.score >= min_score)
-    
-    # Применяем сортировку
-    if sort_by == "score_desc":
-        query = query.order_by(Company.score.desc())
-    elif sort_by == "score_asc":
-        query = query.order_by(Company.score.asc())
-    elif sort_by == "name_asc":
-        query = query.order_by(Company.name.asc())
-    elif sort_by == "name_desc":
-        query = query.order_by(Company.name.desc())
+        query = query.where(Company.score >= min_score)
+    if skills:
+        try:
+            query = query.where(companies_with_skills(skills.split(","), skills_mode))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    # Повторный запрос с теми же параметрами - из кэша, пока данные не менялись
+    if sort_by not in COMPANY_SORTS:
+        sort_by = "score_desc"
+    generation = await current_generation(db)
+    key = cache_key(
+        "companies",
+        status=status,
+        industry=industry,
+        min_score=min_score,
+        skills=_skills_key(skills),
+        skills_mode=skills_mode if skills else None,
+        sort_by=sort_by,
+        page=page,
+        limit=limit,
+        cursor=cursor,
+        total=total,
+        fields=",".join(selected) if selected else None,
+    )
+    not_modified = conditional_response(request, response, make_etag(key, generation))
+    if not_modified:
+        return not_modified
+    cached = response_cache.get(key, generation)
+    if isinstance(cached, bytes):
+        return json_response(cached, response)
+    if cached is not None:
+        return cached
+    
+    # Общее количество: по счётчикам, где это возможно
+    try:
+        total_count, total_estimated = await resolve_total(
+            db, "companies", {"status": status, "industry": industry, "min_score": min_score, "skills": skills}, query, total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Применяем сортировку (по умолчанию: по score desc)
+    sort_column, descending = COMPANY_SORTS[sort_by]
+    query = query.order_by(*keyset_order(sort_column, Company.id, descending))
+    
+    # Применяем пагинацию: по курсору или по номеру страницы
+    if cursor:
+        try:
+            sort_key, last_id = decode_cursor(cursor, sort_by)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(keyset_filter(sort_column, Company.id, descending, sort_key, last_id))
     else:
-        # Сортировка по умолчанию: по score desc
-        query = query.order_by(Company.score.desc())
+        query = query.offset((page - 1) * limit)
+    
+    # Быстрый путь и fields=: только колонки ответа, без ORM-объектов
+    # (ключ сортировки - последней колонкой, если он нужен только курсору)
+    projected = FAST_JSON_RESPONSES or selected is not None
+    if projected:
+        columns = [COMPANY_FIELDS[field] for field in selected or COMPANY_FIELDS]
+        if not any(column is sort_column for column in columns):
+            columns.append(sort_column)
+        query = query.with_only_columns(*columns)
     
-    # Получаем общее количество
-    total = query.count()
+    # Лишняя строка показывает, есть ли следующая страница
+    result = await db.execute(query.limit(limit + 1))
+    companies = result.all() if projected else result.scalars().all()
+    next_cursor = None
+    if len(companies) > limit:
+        companies = companies[:limit]
+        last = companies[-1]
+        next_cursor = encode_cursor(sort_by, getattr(last, sort_column.key), last.id)
     
-    # Применяем пагинацию
-    offset = (page - 1) * limit
-    companies = query.offset(offset).limit(limit).all()
+    if projected:
+        body = dump_json({
+            "data": [_company_dict(row, selected) for row in companies],
+            "total": total_count,
+            "total_estimated": total_estimated,
+            "page": page,
+            "limit": limit,
+            "next_cursor": next_cursor,
+        })
+        response_cache.put(key, generation, body)
+        return json_response(body, response)
     
     # Формируем ответ
     company_responses = [
@@ -231,14 +590,19 @@ async def get_companies(
             score=company.score,
             vacancy_count=company.vacancy_count,
             status=company.status,
-            main_skills=company.main_skills if company.main_skills else []
+            main_skills=company.main_skills if company.main_skills else [],
+            curriculum_match=company.score_curriculum or 0.0
         )
         for company in companies
     ]
     
-    return PaginatedCompaniesResponse(
+    paginated = PaginatedCompaniesResponse(
         data=company_responses,
-        total=total,
+        total=total_count,
+        total_estimated=total_estimated,
         page=page,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
     )
+    response_cache.put(key, generation, paginated)
+    return paginated
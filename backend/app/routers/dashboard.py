@@ -0,0 +1,73 @@
+"""
+Dashboard Router - Данные главного экрана одним запросом
+"""
+
+from fastapi import APIRouter, Query, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.core.etag import conditional_response, make_etag
+from app.schemas.schemas import DashboardCompany, DashboardLetterState, DashboardResponse
+from app.services.dashboard import COMPANY_STATUSES, status_counts, top_companies_with_letters
+from app.services.response_cache import cache_key, current_generation, response_cache
+
+router = APIRouter()
+
+
+@router.get("/dashboard", response_model=DashboardResponse)
+async def get_dashboard(
+    request: Request,
+    response: Response,
+    status: str | None = Query(None, description="Фильтр по статусу"),
+    industry: str | None = Query(None, description="Фильтр по индустрии"),
+    limit: int = Query(20, ge=1, le=100, description="Сколько компаний вернуть (top-N по скору)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Получить счётчики по статусам, top-N компаний и состояние их писем и email
+
+    Args:
+        status: new, approved, rejected, sent, responded
+        industry: IT, Finance, etc.
+        limit: N
+    """
+    if status and status not in COMPANY_STATUSES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Недопустимый статус: {status}. Разрешены: {', '.join(COMPANY_STATUSES)}"
+        )
+
+    # Ответ меняется только вместе с поколением данных
+    generation = await current_generation(db)
+    key = cache_key("dashboard", status=status, industry=industry, limit=limit)
+    not_modified = conditional_response(request, response, make_etag(key, generation))
+    if not_modified:
+        return not_modified
+    cached = response_cache.get(key, generation)
+    if cached is not None:
+        return cached
+
+    counts = await status_counts(db)
+    companies = await top_companies_with_letters(db, status, industry, limit)
+
+    dashboard = DashboardResponse(
+        company_counts=counts["companies"],
+        letter_counts=counts["letters"],
+        companies=[
+            DashboardCompany(
+                id=company.id,
+                name=company.name,
+                url=company.url,
+                industry=company.industry,
+                score=company.score,
+                vacancy_count=company.vacancy_count,
+                status=company.status,
+                main_skills=company.main_skills if company.main_skills else [],
+                curriculum_match=company.score_curriculum or 0.0,
+                letter=DashboardLetterState(**letter) if letter else None
+            )
+            for company, letter in companies
+        ]
+    )
+    response_cache.put(key, generation, dashboard)
+    return dashboard
@@ -3,9 +3,9 @@ Emails Router - Эндпоинты для отправки писем по email
 """
 
 from fastapi import APIRouter, Query, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.schemas.schemas import EmailSendRequest, EmailStatusResponse
 from app.services import email_service
 
@@ -17,7 +17,7 @@ async def send_email_to_company(
     company_id: int,
     request: EmailSendRequest,
     dry_run: bool = Query(False, description="Если true, только проверка без отправки"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Отправить письмо компании по email (требуется письмо в статусе approved)
@@ -36,7 +36,7 @@ async def send_email_to_company(
         400: если письмо не в статусе approved
     """
     try:
-        result = email_service.send_email(
+        result = await email_service.send_email(
             db=db,
             company_id=company_id,
             email=request.email,
@@ -55,7 +55,7 @@ async def send_email_to_company(
 @router.get("/emails/status/{company_id}", response_model=EmailStatusResponse)
 async def get_email_status(
     company_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Получить статус отправки письма
@@ -71,7 +71,7 @@ async def get_email_status(
         404: если компания или письмо не найдены
     """
     try:
-        result = email_service.get_email_status(db=db, company_id=company_id)
+        result = await email_service.get_email_status(db=db, company_id=company_id)
         return result
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -2,10 +2,14 @@
 Letters Router - Эндпоинты для работы с письмами
 """
 
-from fastapi import APIRouter, Query, Depends, HTTPException, Body
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Query, Depends, HTTPException, Body, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.etag import conditional_response, make_etag
+from app.core.responses import dump_json, json_response, parse_fields
+from app.models.models import CacheGeneration, Letter
 from app.schemas.schemas import (
     LetterResponse, 
     LetterApproveRequest, 
@@ -14,14 +18,41 @@ from app.schemas.schemas import (
     PaginatedLettersResponse
 )
 from app.services import letter_service
+from app.services.response_cache import cache_key, current_generation
 
 router = APIRouter()
 
 
+async def _company_letter_version(db: AsyncSession, company_id: int):
+    """
+    Версия письма компании (ID последнего письма и поколение данных) - одним запросом
+
+    Raises:
+        HTTPException: 404, если у компании нет писем
+    """
+    version = (await db.execute(
+        select(
+            Letter.id,
+            select(CacheGeneration.generation).where(CacheGeneration.id == 1).scalar_subquery()
+        )
+        .where(Letter.company_id == company_id)
+        .order_by(Letter.created_at.desc())
+        .limit(1)
+    )).first()
+    if version is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Письмо для компании {company_id} не найдено"
+        )
+    return tuple(version)
+
+
 @router.get("/letters/{company_id}", response_model=LetterResponse)
 async def get_letter_for_company(
     company_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Получить письмо для компании
@@ -29,7 +60,14 @@ async def get_letter_for_company(
     Args:
         company_id: ID компании
     """
-    letter = letter_service.get_letter_by_company_id(db, company_id)
+    # Любое изменение писем увеличивает поколение данных (см. services/response_cache.py);
+    # без письма - 404 до проверки If-None-Match
+    version = await _company_letter_version(db, company_id)
+    not_modified = conditional_response(request, response, make_etag("letters/company", company_id, *version))
+    if not_modified:
+        return not_modified
+    
+    letter = await letter_service.get_letter_by_company_id(db, company_id)
     
     if not letter:
         raise HTTPException(
@@ -50,7 +88,7 @@ async def get_letter_for_company(
 async def generate_letter(
     company_id: int,
     template: str = Query("formal", description="Тип шаблона: formal или informal"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Сгенерировать письмо для компании по шаблону
@@ -67,7 +105,7 @@ async def generate_letter(
         )
     
     try:
-        letter = letter_service.create_or_replace_draft(db, company_id, template)
+        letter = await letter_service.create_or_replace_draft(db, company_id, template)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     
@@ -84,7 +122,7 @@ async def generate_letter(
 async def approve_letter(
     letter_id: int,
     request: LetterApproveRequest = Body(default=LetterApproveRequest()),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Одобрить письмо (статус -> approved)
@@ -94,7 +132,7 @@ async def approve_letter(
         request: опциональный body для замены текста
     """
     try:
-        letter = letter_service.approve_letter(db, letter_id, request.body)
+        letter = await letter_service.approve_letter(db, letter_id, request.body)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     
@@ -111,7 +149,7 @@ async def approve_letter(
 async def reject_letter(
     letter_id: int,
     request: LetterRejectRequest = Body(default=LetterRejectRequest()),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Отклонить письмо (статус -> rejected)
@@ -121,7 +159,7 @@ async def reject_letter(
         request: опциональная причина отклонения
     """
     try:
-        letter = letter_service.reject_letter(db, letter_id, request.reason)
+        letter = await letter_service.reject_letter(db, letter_id, request.reason)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     
@@ -138,7 +176,7 @@ async def reject_letter(
 async def update_letter(
     letter_id: int,
     request: LetterUpdateRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Обновить текст письма (перегенерировать)
@@ -148,7 +186,7 @@ async def update_letter(
         request: новый текст письма (required)
     """
     try:
-        letter = letter_service.update_letter(db, letter_id, request.body)
+        letter = await letter_service.update_letter(db, letter_id, request.body)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     
@@ -163,11 +201,16 @@ async def update_letter(
 
 @router.get("/letters", response_model=PaginatedLettersResponse)
 async def get_letters(
+    request: Request,
+    response: Response,
     status: str | None = Query(None, description="Фильтр по статусу"),
     company_id: int | None = Query(None, description="Фильтр по ID компании"),
     page: int = Query(1, ge=1, description="Номер страницы"),
     limit: int = Query(20, ge=1, le=100, description="Количество записей"),
-    db: Session = Depends(get_db)
+    cursor: str | None = Query(None, description="Курсор следующей страницы (next_cursor)"),
+    total: str = Query("exact", description="Подсчёт total: exact, estimate, none"),
+    fields: str | None = Query(None, description="Поля ответа через запятую, например: subject,status,company_name"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Получить все письма с фильтрацией
@@ -175,8 +218,13 @@ async def get_letters(
     Args:
         status: draft, approved, rejected, sent
         company_id: ID компании
-        page: номер страницы
+        page: номер страницы (игнорируется, если передан cursor)
         limit: количество записей
+        cursor: next_cursor из предыдущего ответа - keyset-пагинация без OFFSET
+        total: exact - точное количество, estimate - допускается оценка по счётчикам,
+            none - не считать
+        fields: вернуть только эти поля LetterResponse (id - всегда), например
+            без body для списка
     """
     # Валидация status если указан
     if status and status not in ["draft", "approved", "rejected", "sent"]:
@@ -184,8 +232,36 @@ async def get_letters(
             status_code=400,
             detail=f"Недопустимый статус: {status}. Разрешены: draft, approved, rejected, sent"
         )
+    try:
+        selected = parse_fields(fields, letter_service.LETTER_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    generation = await current_generation(db)
+    key = cache_key(
+        "letters", status=status, company_id=company_id, page=page, limit=limit, cursor=cursor, total=total,
+        fields=",".join(selected) if selected else None
+    )
+    not_modified = conditional_response(request, response, make_etag(key, generation))
+    if not_modified:
+        return not_modified
+    
+    try:
+        items, total_count, total_estimated, next_cursor = await letter_service.list_letters(
+            db, status, company_id, page, limit, cursor, total, selected
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    items, total = letter_service.list_letters(db, status, company_id, page, limit)
+    if selected:
+        return json_response(dump_json({
+            "data": [dict(zip(selected, row)) for row in items],
+            "total": total_count,
+            "total_estimated": total_estimated,
+            "page": page,
+            "limit": limit,
+            "next_cursor": next_cursor,
+        }), response)
     
     # Преобразуем в LetterResponse с company_name
     letter_responses = [
@@ -201,7 +277,9 @@ async def get_letters(
     
     return PaginatedLettersResponse(
         data=letter_responses,
-        total=total,
+        total=total_count,
+        total_estimated=total_estimated,
         page=page,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
     )
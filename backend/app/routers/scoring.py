@@ -0,0 +1,92 @@
+"""
+Scoring Router - Эндпоинты для управления весами скоринга
+"""
+
+from fastapi import APIRouter, Query, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.models.models import Company
+from app.schemas.schemas import (
+    CompanyResponse,
+    ScoringWeightsRequest,
+    ScoringWeightsResponse,
+    ReweightResponse
+)
+from app.services import scoring
+
+router = APIRouter()
+
+
+def _weights_response(version) -> ScoringWeightsResponse:
+    weights = scoring.weights_as_dict(version)
+    return ScoringWeightsResponse(
+        version=version.id if version else 0,
+        comment=version.comment if version else None,
+        created_at=version.created_at if version else None,
+        **weights
+    )
+
+
+def _company_response(company: Company, score: float) -> CompanyResponse:
+    return CompanyResponse(
+        id=company.id,
+        name=company.name,
+        url=company.url,
+        industry=company.industry,
+        score=score,
+        vacancy_count=company.vacancy_count,
+        status=company.status,
+        main_skills=company.main_skills if company.main_skills else [],
+        curriculum_match=company.score_curriculum or 0.0
+    )
+
+
+@router.get("/scoring/weights", response_model=ScoringWeightsResponse)
+async def get_weights(db: AsyncSession = Depends(get_async_db)):
+    """
+    Получить текущую версию весов компонентов скора
+    """
+    return _weights_response(await db.run_sync(scoring.get_active_weights))
+
+
+@router.post("/scoring/reweight", response_model=ReweightResponse)
+async def reweight(
+    request: ScoringWeightsRequest,
+    preview: bool = Query(False, description="Если true, только показать новый Top-N без записи"),
+    top_n: int = Query(20, ge=1, le=100, description="Размер Top-N в ответе"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Пересчитать скор всех компаний под новыми весами
+
+    Args:
+        request: веса компонентов vacancy, skills, size, growth (в сумме 1)
+        preview: если True, веса не сохраняются и скор не обновляется
+        top_n: сколько компаний вернуть в Top-N
+    """
+    weights = request.model_dump(exclude={"comment"})
+
+    try:
+        if preview:
+            top = await db.run_sync(scoring.preview_top_companies, weights, top_n)
+            return ReweightResponse(
+                weights=ScoringWeightsResponse(version=0, comment=request.comment, **weights),
+                preview=True,
+                updated=0,
+                top=[_company_response(company, score) for company, score in top]
+            )
+
+        version, updated = await db.run_sync(scoring.reweight_companies, weights, request.comment)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = await db.execute(select(Company).order_by(Company.score.desc()).limit(top_n))
+    companies = result.scalars().all()
+    return ReweightResponse(
+        weights=_weights_response(version),
+        preview=False,
+        updated=updated,
+        top=[_company_response(company, company.score) for company in companies]
+    )
@@ -0,0 +1,39 @@
+"""
+Search Router - Полнотекстовый поиск (SQLite FTS5)
+"""
+
+from fastapi import APIRouter, Query, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.schemas.schemas import SearchHit, SearchResponse
+from app.services.search import search
+
+router = APIRouter()
+
+
+@router.get("/search", response_model=SearchResponse)
+async def search_all(
+    q: str = Query(..., min_length=1, max_length=200, description="Строка поиска"),
+    types: str | None = Query(None, description="Где искать через запятую: companies, vacancies, letters"),
+    limit: int = Query(10, ge=1, le=50, description="Результатов каждого типа"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Найти компании по названию, вакансии по должности и описанию, письма по теме и тексту
+
+    Args:
+        q: слова запроса (все должны встретиться; ищутся по префиксу)
+        types: companies, vacancies, letters (по умолчанию все)
+        limit: сколько результатов каждого типа вернуть
+    """
+    type_list = [name.strip() for name in (types or "").split(",") if name.strip()]
+    try:
+        results = await search(db, q, type_list, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return SearchResponse(
+        query=q,
+        **{name: [SearchHit(**hit) for hit in hits] for name, hits in results.items()}
+    )
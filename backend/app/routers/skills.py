@@ -0,0 +1,87 @@
+"""
+Skills Router - Поиск компаний по стеку через инвертированный индекс навыков
+"""
+
+from fastapi import APIRouter, Query, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.models.models import Company
+from app.schemas.schemas import (
+    CompanyResponse,
+    SkillMatchItem,
+    SkillMatchResponse,
+    SkillIndexStatsResponse
+)
+from app.services.skill_bitmap import skill_index
+
+router = APIRouter()
+
+
+def _split(skills: str | None) -> list[str]:
+    return [skill for skill in (skills or "").split(",") if skill.strip()]
+
+
+@router.get("/skills/match", response_model=SkillMatchResponse)
+async def match_companies(
+    all_skills: str | None = Query(None, alias="all", description="Все эти навыки (через запятую)"),
+    any_skills: str | None = Query(None, alias="any", description="Хотя бы один из навыков"),
+    not_skills: str | None = Query(None, alias="not", description="Ни одного из навыков"),
+    k: int = Query(20, ge=1, le=100, description="Сколько компаний вернуть"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Найти компании по стеку: фильтр all/any/not и ранжирование по Жаккару
+
+    Args:
+        all: навыки, которые должны быть все (AND)
+        any: навыки, из которых нужен хотя бы один (OR)
+        not: навыки, которых быть не должно (NOT)
+        k: размер top-k
+
+    Стек для ранжирования - all + any.
+    """
+    all_of, any_of, none_of = _split(all_skills), _split(any_skills), _split(not_skills)
+    if not all_of and not any_of:
+        raise HTTPException(status_code=400, detail="Укажите навыки в all или any")
+
+    await skill_index.refresh(db)
+    matched = skill_index.match(all_of, any_of, none_of)
+    ranked = skill_index.top_similar(all_of + any_of, matched, k)
+
+    companies = {}
+    if ranked:
+        result = await db.execute(select(Company).where(Company.id.in_([company_id for company_id, _ in ranked])))
+        companies = {company.id: company for company in result.scalars()}
+
+    items = []
+    for company_id, similarity in ranked:
+        company = companies.get(company_id)
+        if company is None:
+            continue
+        items.append(SkillMatchItem(
+            company=CompanyResponse(
+                id=company.id,
+                name=company.name,
+                url=company.url,
+                industry=company.industry,
+                score=company.score,
+                vacancy_count=company.vacancy_count,
+                status=company.status,
+                main_skills=company.main_skills if company.main_skills else [],
+                curriculum_match=company.score_curriculum or 0.0
+            ),
+            similarity=similarity
+        ))
+
+    return SkillMatchResponse(total=len(matched), data=items)
+
+
+@router.get("/skills/index/stats", response_model=SkillIndexStatsResponse)
+async def get_index_stats(db: AsyncSession = Depends(get_async_db)):
+    """
+    Размер инвертированного индекса навыков и оценка памяти на 100 тыс. компаний
+    """
+    await skill_index.refresh(db)
+    return SkillIndexStatsResponse(**skill_index.memory_report())
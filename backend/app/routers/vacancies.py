@@ -0,0 +1,43 @@
+"""
+Vacancies Router - Эндпоинты для работы с вакансиями
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+
+from app.core.database import get_async_db
+from app.models.models import Vacancy
+from app.schemas.schemas import VacancyDetailResponse
+
+router = APIRouter()
+
+
+@router.get("/vacancies/{id}", response_model=VacancyDetailResponse)
+async def get_vacancy(id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Получить вакансию с полным текстом
+
+    Args:
+        id: ID вакансии
+    """
+    result = await db.execute(
+        select(Vacancy).options(undefer(Vacancy.description_zst)).where(Vacancy.id == id)
+    )
+    vacancy = result.scalars().first()
+
+    if not vacancy:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Вакансия с ID {id} не найдена"
+        )
+
+    return VacancyDetailResponse(
+        id=vacancy.id,
+        company_id=vacancy.company_id,
+        position=vacancy.position,
+        url=vacancy.url,
+        skills=vacancy.skills if vacancy.skills else [],
+        description=vacancy.description
+    )
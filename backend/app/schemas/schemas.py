@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -12,6 +12,12 @@ class VacancyResponse(BaseModel):
         from_attributes = True
 
 
+class VacancyDetailResponse(VacancyResponse):
+    """Вакансия с полным текстом"""
+    company_id: int
+    description: Optional[str] = Field(None, description="Текст вакансии из парсера")
+
+
 class CompanyResponse(BaseModel):
     id: int
     name: str
@@ -21,12 +27,27 @@ class CompanyResponse(BaseModel):
     vacancy_count: int
     status: str
     main_skills: List[str] = []
+    curriculum_match: float = Field(0.0, description="Соответствие стека программе ПроКомпетенции (0..1)")
     vacancies: List[VacancyResponse] = []
 
     class Config:
         from_attributes = True
 
 
+class CompanyDetailResponse(CompanyResponse):
+    """Компания с первой страницей вакансий (остальные - /companies/{id}/vacancies)"""
+    vacancies_next_cursor: Optional[str] = Field(
+        None, description="Курсор следующей страницы вакансий (null - вакансий больше нет)"
+    )
+
+
+class PaginatedVacanciesResponse(BaseModel):
+    """Страница вакансий компании"""
+    data: List[VacancyResponse] = Field(..., description="Список вакансий")
+    limit: int = Field(..., description="Количество записей на странице")
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы (null - страниц больше нет)")
+
+
 class CompanyApproveRequest(BaseModel):
     """Запрос на одобрение компании"""
     comment: Optional[str] = Field(None, description="Комментарий к одобрению")
@@ -40,9 +61,11 @@ class CompanyRejectRequest(BaseModel):
 class PaginatedCompaniesResponse(BaseModel):
     """Пагинированный список компаний"""
     data: List[CompanyResponse] = Field(..., description="Список компаний")
-    total: int = Field(..., description="Общее количество компаний")
+    total: Optional[int] = Field(None, description="Общее количество компаний (null при total=none)")
+    total_estimated: bool = Field(False, description="total - оценка по счётчикам, а не точное значение")
     page: int = Field(..., description="Текущая страница")
     limit: int = Field(..., description="Количество записей на странице")
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы (null - страниц больше нет)")
 
 
 class LetterResponse(BaseModel):
@@ -80,9 +103,11 @@ class LetterUpdateRequest(BaseModel):
 class PaginatedLettersResponse(BaseModel):
     """Пагинированный список писем"""
     data: List[LetterResponse] = Field(..., description="Список писем")
-    total: int = Field(..., description="Общее количество писем")
+    total: Optional[int] = Field(None, description="Общее количество писем (null при total=none)")
+    total_estimated: bool = Field(False, description="total - оценка по счётчикам, а не точное значение")
     page: int = Field(..., description="Текущая страница")
     limit: int = Field(..., description="Количество записей на странице")
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы (null - страниц больше нет)")
 
 
 class EmailSendRequest(BaseModel):
@@ -103,3 +128,124 @@ class EmailStatusResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ScoringWeightsRequest(BaseModel):
+    """Новые веса компонентов скора (в сумме 1)"""
+    vacancy: float = Field(..., ge=0, le=1, description="Вес количества вакансий")
+    skills: float = Field(..., ge=0, le=1, description="Вес навыков")
+    size: float = Field(..., ge=0, le=1, description="Вес размера компании")
+    growth: float = Field(..., ge=0, le=1, description="Вес роста компании")
+    curriculum: float = Field(0.0, ge=0, le=1, description="Вес соответствия программе ПроКомпетенции")
+    comment: Optional[str] = Field(None, description="Комментарий к версии весов")
+
+
+class ScoringWeightsResponse(BaseModel):
+    """Версия весов компонентов скора"""
+    version: int = Field(..., description="Номер версии (0 - веса по умолчанию)")
+    vacancy: float
+    skills: float
+    size: float
+    growth: float
+    curriculum: float = 0.0
+    comment: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class ReweightResponse(BaseModel):
+    """Результат перевзвешивания скора"""
+    weights: ScoringWeightsResponse = Field(..., description="Применённые (или проверяемые) веса")
+    preview: bool = Field(..., description="True - изменения не записаны в БД")
+    updated: int = Field(..., description="Количество обновлённых компаний")
+    top: List[CompanyResponse] = Field(..., description="Top-N компаний под новыми весами")
+
+
+class ResponseCacheStatsResponse(BaseModel):
+    """Статистика кэша ответов"""
+    hits: int = Field(..., description="Ответов из кэша")
+    misses: int = Field(..., description="Ответов, посчитанных заново")
+    hit_ratio: float = Field(..., description="Доля ответов из кэша")
+    size: int = Field(..., description="Записей в кэше")
+    max_entries: int = Field(..., description="Предел записей (LRU)")
+    ttl_seconds: float = Field(..., description="Время жизни записи, секунд")
+    evictions: int = Field(..., description="Вытеснено по LRU")
+    expirations: int = Field(..., description="Истекло по TTL")
+    invalidations: int = Field(..., description="Сброшено при смене поколения данных")
+    generation: int = Field(..., description="Поколение данных, для которого хранятся записи")
+
+
+class SkillMatchItem(BaseModel):
+    """Компания и её близость к искомому стеку"""
+    company: CompanyResponse = Field(..., description="Компания")
+    similarity: float = Field(..., description="Коэффициент Жаккара между навыками компании и запросом (0..1)")
+
+
+class SkillMatchResponse(BaseModel):
+    """Результат поиска компаний по стеку"""
+    total: int = Field(..., description="Сколько компаний удовлетворяют условиям all/any/not")
+    data: List[SkillMatchItem] = Field(..., description="Top-k по коэффициенту Жаккара")
+
+
+class SkillIndexStatsResponse(BaseModel):
+    """Память инвертированного индекса навыков"""
+    companies: int = Field(..., description="Компаний в индексе")
+    skills: int = Field(..., description="Различных навыков")
+    bitmap_bytes: int = Field(..., description="Размер битовых карт, байт")
+    company_sets_bytes: int = Field(..., description="Размер наборов навыков компаний, байт")
+    bytes_per_100k_companies: int = Field(..., description="Оценка памяти на 100 тыс. компаний, байт")
+
+
+class SimilarCompaniesResponse(BaseModel):
+    """Похожие по стеку компании (MinHash + LSH)"""
+    company_id: int = Field(..., description="ID исходной компании")
+    candidates: int = Field(..., description="Сколько кандидатов нашёл LSH-индекс")
+    data: List[SkillMatchItem] = Field(..., description="Top-k по оценке коэффициента Жаккара")
+
+
+class SearchHit(BaseModel):
+    """Результат полнотекстового поиска"""
+    type: str = Field(..., description="companies, vacancies или letters")
+    id: int = Field(..., description="ID записи")
+    company_id: Optional[int] = Field(None, description="ID компании")
+    title: Optional[str] = Field(None, description="Название компании, должность или тема письма")
+    snippet: str = Field(..., description="Фрагмент текста, совпадения выделены <b>...</b>")
+    rank: float = Field(..., description="Релевантность (bm25, больше - лучше)")
+
+
+class SearchResponse(BaseModel):
+    """Результаты поиска по типам"""
+    query: str = Field(..., description="Строка поиска")
+    companies: List[SearchHit] = Field(default_factory=list)
+    vacancies: List[SearchHit] = Field(default_factory=list)
+    letters: List[SearchHit] = Field(default_factory=list)
+
+
+class DashboardLetterState(BaseModel):
+    """Последнее письмо компании и состояние его отправки"""
+    id: int
+    status: str = Field(..., description="Статус письма: draft, approved, rejected, sent")
+    delivery_status: str = Field(..., description="Статус доставки: pending, delivered")
+    sent_at: Optional[datetime] = Field(None, description="Время отправки")
+
+
+class DashboardCompany(CompanyResponse):
+    """Компания главного экрана"""
+    letter: Optional[DashboardLetterState] = Field(None, description="Последнее письмо (null - писем нет)")
+
+
+class DashboardResponse(BaseModel):
+    """Данные главного экрана одним ответом"""
+    company_counts: Dict[str, int] = Field(..., description="Количество компаний по статусам (all - всего)")
+    letter_counts: Dict[str, int] = Field(..., description="Количество писем по статусам (all - всего)")
+    companies: List[DashboardCompany] = Field(..., description="Top-N компаний по скору с учётом фильтров")
+
+
+class ChangesResponse(BaseModel):
+    """Компании и письма, изменённые после since"""
+    seq: int = Field(..., description="Номер последнего изменения в ответе - since следующего запроса")
+    has_more: bool = Field(False, description="Есть ещё изменения: повторить запрос с since=seq")
+    reset: bool = Field(False, description="since больше текущего номера (БД пересоздана) - синхронизироваться заново с since=0")
+    companies: List[CompanyResponse] = Field(..., description="Изменённые и новые компании")
+    letters: List[LetterResponse] = Field(..., description="Изменённые и новые письма")
+    deleted_companies: List[int] = Field(..., description="ID удалённых компаний")
+    deleted_letters: List[int] = Field(..., description="ID удалённых писем")
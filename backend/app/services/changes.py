@@ -0,0 +1,100 @@
+"""
+Changes Service - Инкрементальная синхронизация компаний и писем
+
+Каждая вставка, изменение видимых в API колонок и удаление строки companies
+или letters получает следующий номер из change_sequence (триггеры миграции
+change_log); row_changes хранит для строки только последний номер. Клиент
+передаёт since - номер из предыдущего ответа - и получает строки, изменённые
+после него, и ID удалённых. Каждая строка попадает в ответ один раз, сколько
+бы раз она ни менялась.
+
+Текущий номер и страница журнала читаются одним запросом, то есть из одного
+снимка БД: любое изменение либо есть в странице, либо идёт после
+возвращённого номера. Сами строки читаются следующими запросами и могут быть
+новее номера - такое изменение придёт ещё раз в следующем ответе с тем же
+итоговым состоянием.
+"""
+
+from sqlalchemy import select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
+
+from app.models.models import ChangeSequence, Company, Letter, RowChange
+
+
+async def changes_since(db: AsyncSession, since: int, limit: int) -> dict:
+    """
+    Изменения компаний и писем после номера since (в порядке номеров)
+
+    Args:
+        db: асинхронная SQLAlchemy сессия
+        since: seq из предыдущего ответа (0 - полная синхронизация)
+        limit: максимум строк в ответе
+
+    Returns:
+        Словарь:
+        - seq: since следующего запроса
+        - has_more: в ответ вошли не все изменения
+        - reset: since больше текущего номера (БД пересоздана) - нужно начать с 0
+        - companies, letters: изменённые строки (Company, Letter с компанией)
+        - deleted_companies, deleted_letters: ID удалённых строк
+    """
+    page = (
+        select(RowChange.entity, RowChange.row_id, RowChange.seq, RowChange.deleted)
+        .where(RowChange.seq > since)
+        .order_by(RowChange.seq)
+        .limit(limit + 1)
+        .subquery()
+    )
+    # Номер и страница - одним запросом (LEFT JOIN: номер есть и без изменений)
+    result = (await db.execute(
+        select(ChangeSequence.seq, page.c.entity, page.c.row_id, page.c.seq, page.c.deleted)
+        .select_from(ChangeSequence)
+        .outerjoin(page, true())
+        .where(ChangeSequence.id == 1)
+    )).all()
+    current = result[0][0] if result else 0
+    rows = sorted(
+        ((entity, row_id, seq, deleted) for _, entity, row_id, seq, deleted in result if row_id is not None),
+        key=lambda row: row[2],
+    )
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    changed = {"companies": [], "letters": []}
+    deleted = {"companies": [], "letters": []}
+    for entity, row_id, _, is_deleted in rows:
+        (deleted if is_deleted else changed)[entity].append(row_id)
+
+    companies: list[Company] = []
+    if changed["companies"]:
+        found = (await db.execute(
+            select(Company).where(Company.id.in_(changed["companies"]))
+        )).scalars().all()
+        companies = _in_order(found, changed["companies"])
+
+    letters: list[Letter] = []
+    if changed["letters"]:
+        found = (await db.execute(
+            select(Letter)
+            .outerjoin(Letter.company)
+            .options(contains_eager(Letter.company))
+            .where(Letter.id.in_(changed["letters"]))
+        )).scalars().all()
+        letters = _in_order(found, changed["letters"])
+
+    return {
+        "seq": rows[-1][2] if has_more else current,
+        "has_more": has_more,
+        "reset": since > current,
+        "companies": companies,
+        "letters": letters,
+        "deleted_companies": deleted["companies"],
+        "deleted_letters": deleted["letters"],
+    }
+
+
+def _in_order(items: list, ids: list[int]) -> list:
+    """Строки в порядке номеров изменений"""
+    by_id = {item.id: item for item in items}
+    return [by_id[row_id] for row_id in ids if row_id in by_id]
@@ -0,0 +1,118 @@
+"""
+Counters Service - Общее количество строк для пагинированных списков
+
+Счётчики row_counters (всего строк и по значениям status/industry/company_id)
+поддерживаются триггерами в той же транзакции, что и запись, поэтому точны.
+Если фильтр покрывается одним счётчиком, total читается по первичному ключу
+без COUNT по таблице.
+"""
+
+from typing import Any, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.migrations import COUNTED_DIMENSIONS
+from app.models.models import RowCounter
+
+TOTAL_MODES = ("exact", "estimate", "none")
+
+
+async def _counter(db: AsyncSession, entity: str, dimension: str, value: Any) -> int:
+    count = await db.scalar(
+        select(RowCounter.count).where(
+            RowCounter.entity == entity,
+            RowCounter.dimension == dimension,
+            RowCounter.value == ("" if value is None else str(value)),
+        )
+    )
+    return count or 0
+
+
+async def counted_total(db: AsyncSession, entity: str, filters: dict[str, Any]) -> Optional[int]:
+    """
+    Точное количество строк по счётчикам
+
+    Args:
+        db: асинхронная SQLAlchemy сессия
+        entity: таблица (companies, letters)
+        filters: колонка -> значение фильтра (None - фильтр не задан)
+
+    Returns:
+        Количество строк или None, если фильтр не покрывается одним счётчиком
+    """
+    active = {column: value for column, value in filters.items() if value is not None}
+    if not active:
+        return await _counter(db, entity, "all", "")
+    if len(active) == 1:
+        (column, value), = active.items()
+        if column in COUNTED_DIMENSIONS.get(entity, ()):
+            return await _counter(db, entity, column, value)
+    return None
+
+
+async def estimated_total(db: AsyncSession, entity: str, filters: dict[str, Any]) -> Optional[int]:
+    """
+    Оценка по счётчикам в предположении независимости фильтров:
+    всего * П(доля строк по каждому фильтру)
+
+    Returns:
+        Оценка или None, если какой-то фильтр не покрыт счётчиками
+    """
+    active = {column: value for column, value in filters.items() if value is not None}
+    if any(column not in COUNTED_DIMENSIONS.get(entity, ()) for column in active):
+        return None
+
+    total = await _counter(db, entity, "all", "")
+    estimate = float(total)
+    for column, value in active.items():
+        if total == 0:
+            break
+        estimate *= await _counter(db, entity, column, value) / total
+    return round(estimate)
+
+
+async def resolve_total(
+        db: AsyncSession,
+        entity: str,
+        filters: dict[str, Any],
+        query,
+        mode: str = "exact",
+) -> tuple[Optional[int], bool]:
+    """
+    Общее количество строк списка в режиме mode
+
+    exact - счётчик, если фильтр им покрыт, иначе COUNT по запросу;
+    estimate - счётчик или оценка по счётчикам, COUNT только если оценить нельзя;
+    none - не считать вовсе.
+
+    Args:
+        db: асинхронная SQLAlchemy сессия
+        entity: таблица (companies, letters)
+        filters: колонка -> значение фильтра; фильтры по другим колонкам
+            (например, min_score) передаются тоже, чтобы счётчики не использовались
+        query: отфильтрованный SELECT для точного подсчёта
+        mode: exact, estimate или none
+
+    Returns:
+        Кортеж (количество или None, является ли оно оценкой)
+
+    Raises:
+        ValueError: если режим неизвестен
+    """
+    if mode not in TOTAL_MODES:
+        raise ValueError(f"Недопустимый режим total: {mode}. Разрешены: {', '.join(TOTAL_MODES)}")
+    if mode == "none":
+        return None, False
+
+    total = await counted_total(db, entity, filters)
+    if total is not None:
+        return total, False
+
+    if mode == "estimate":
+        estimate = await estimated_total(db, entity, filters)
+        if estimate is not None:
+            return estimate, True
+
+    total = (await db.execute(select(func.count()).select_from(query.subquery()))).scalar_one()
+    return total, False
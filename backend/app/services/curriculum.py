@@ -0,0 +1,155 @@
+"""
+Curriculum Service - Соответствие стека компании программе "ПроКомпетенции"
+
+Программа задаётся вектором навык -> вес (по умолчанию DEFAULT_PROGRAM_SKILLS,
+либо JSON-файл из переменной окружения CURRICULUM_SKILLS_FILE). Для каждой
+компании считается косинусная близость её бинарного вектора навыков к вектору
+программы - одним умножением разреженной матрицы на вектор.
+"""
+
+import hashlib
+import json
+import os
+from typing import Iterable, Optional
+
+import numpy as np
+from scipy import sparse
+from dotenv import load_dotenv
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.models import Company
+
+load_dotenv()
+
+CURRICULUM_SKILLS_FILE = os.getenv("CURRICULUM_SKILLS_FILE")
+
+# Чему учит программа и насколько это для неё важно (0..1)
+DEFAULT_PROGRAM_SKILLS = {
+    "python": 1.0,
+    "sql": 1.0,
+    "git": 0.8,
+    "linux": 0.8,
+    "postgresql": 0.8,
+    "docker": 0.7,
+    "javascript": 0.8,
+    "typescript": 0.6,
+    "html": 0.5,
+    "java": 0.7,
+    "c++": 0.6,
+    "php": 0.5,
+    "rest api": 0.6,
+    "анализ данных": 0.8,
+    "системный анализ": 0.7,
+    "бизнес-анализ": 0.6,
+    "разработка технических заданий": 0.6,
+    "работа с базами данных": 0.7,
+    "информационная безопасность": 0.6,
+    "devops": 0.5,
+    "1с программирование": 0.6,
+    "figma": 0.4,
+}
+
+
+def normalize_skill(skill: str) -> str:
+    return " ".join(str(skill).lower().split())
+
+
+def load_program_skills(path: Optional[str] = CURRICULUM_SKILLS_FILE) -> dict[str, float]:
+    """
+    Загрузить вектор навыков программы
+
+    Args:
+        path: JSON-файл вида {"навык": вес}; если не задан - DEFAULT_PROGRAM_SKILLS
+
+    Raises:
+        ValueError: если файл не содержит словарь навык -> вес
+    """
+    program = DEFAULT_PROGRAM_SKILLS
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            program = json.load(f)
+        if not isinstance(program, dict):
+            raise ValueError(f"Файл {path} должен содержать объект навык -> вес")
+
+    return {normalize_skill(skill): float(weight) for skill, weight in program.items() if float(weight) > 0}
+
+
+def program_version(program: dict[str, float]) -> str:
+    """Отпечаток вектора программы: меняется при любой правке навыков или весов"""
+    payload = json.dumps(sorted(program.items()), ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def curriculum_match_scores(skill_lists: list, program: dict[str, float]) -> np.ndarray:
+    """
+    Косинусная близость навыков компаний к программе
+
+    Столбцы матрицы - только навыки программы: остальные навыки компании
+    влияют лишь на норму её вектора.
+
+    Args:
+        skill_lists: навыки каждой компании
+        program: нормализованный навык -> вес
+
+    Returns:
+        Массив 0..1, по одному значению на компанию
+    """
+    vocabulary = {skill: i for i, skill in enumerate(program)}
+    program_vector = np.fromiter(program.values(), dtype=np.float64, count=len(program))
+    program_norm = np.linalg.norm(program_vector)
+
+    indptr = [0]
+    indices: list[int] = []
+    row_norms = np.zeros(len(skill_lists), dtype=np.float64)
+    for row, skills in enumerate(skill_lists):
+        if isinstance(skills, str):
+            skills = [skills]
+        unique = {normalize_skill(skill) for skill in skills or []}
+        row_norms[row] = np.sqrt(len(unique))
+        indices.extend(vocabulary[skill] for skill in unique if skill in vocabulary)
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float64), indices, indptr),
+        shape=(len(skill_lists), len(program)),
+    )
+    dot = matrix @ program_vector
+
+    if program_norm == 0:
+        return np.zeros(len(skill_lists), dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(row_norms > 0, dot / (row_norms * program_norm), 0.0)
+
+
+def refresh_curriculum_scores(
+    db: Session,
+    company_ids: Optional[Iterable[int]] = None,
+    program: Optional[dict[str, float]] = None,
+) -> int:
+    """
+    Пересчитать Company.score_curriculum одним батчем (без commit)
+
+    Args:
+        db: SQLAlchemy сессия
+        company_ids: ID компаний (по умолчанию все)
+        program: вектор программы (по умолчанию load_program_skills())
+
+    Returns:
+        Количество обновлённых компаний
+    """
+    query = db.query(Company.id, Company.main_skills)
+    if company_ids is not None:
+        query = query.filter(Company.id.in_(list(company_ids)))
+    rows = query.all()
+    if not rows:
+        return 0
+
+    scores = curriculum_match_scores([skills for _, skills in rows], program or load_program_skills())
+
+    db.execute(
+        update(Company),
+        [{"id": company_id, "score_curriculum": score} for (company_id, _), score in zip(rows, scores.tolist())],
+    )
+    db.flush()
+    return len(rows)
@@ -0,0 +1,96 @@
+"""
+Dashboard Service - Данные главного экрана одним ответом
+
+Счётчики компаний и писем по статусам, top-N компаний (с фильтрами
+статуса/индустрии) и состояние последнего письма и email каждой из них.
+Ответ собирается двумя запросами независимо от N:
+- счётчики - из row_counters по первичному ключу (без COUNT по таблицам);
+- компании вместе с последним письмом - LEFT JOIN по коррелированному
+  подзапросу, который идёт по индексу ix_letters_company_created.
+"""
+
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import keyset_order
+from app.models.models import Company, Letter, RowCounter
+from app.services.email_service import delivery_status
+
+COMPANY_STATUSES = ("new", "approved", "rejected", "sent", "responded")
+LETTER_STATUSES = ("draft", "approved", "rejected", "sent")
+
+
+async def status_counts(db: AsyncSession) -> dict[str, dict[str, int]]:
+    """
+    Количество компаний и писем по статусам (all - всего)
+
+    Returns:
+        Словарь {"companies": {статус: количество}, "letters": {...}}
+    """
+    counts = {
+        "companies": dict.fromkeys(("all", *COMPANY_STATUSES), 0),
+        "letters": dict.fromkeys(("all", *LETTER_STATUSES), 0),
+    }
+    rows = await db.execute(
+        select(RowCounter.entity, RowCounter.dimension, RowCounter.value, RowCounter.count).where(
+            RowCounter.entity.in_(tuple(counts)),
+            RowCounter.dimension.in_(("all", "status")),
+        )
+    )
+    for entity, dimension, value, count in rows:
+        counts[entity]["all" if dimension == "all" else value] = count
+    return counts
+
+
+async def top_companies_with_letters(
+    db: AsyncSession,
+    status: Optional[str] = None,
+    industry: Optional[str] = None,
+    limit: int = 20
+) -> list[tuple[Company, Optional[dict]]]:
+    """
+    Top-N компаний по скору с последним письмом каждой - одним запросом
+
+    Args:
+        db: асинхронная SQLAlchemy сессия
+        status: фильтр по статусу компании
+        industry: фильтр по индустрии
+        limit: N
+
+    Returns:
+        Список пар (компания, состояние письма или None, если писем нет).
+        Состояние письма - словарь id, status, delivery_status, sent_at
+    """
+    latest_letter = (
+        select(Letter.id)
+        .where(Letter.company_id == Company.id)
+        .order_by(Letter.created_at.desc(), Letter.id.desc())
+        .limit(1)
+        .correlate(Company)
+        .scalar_subquery()
+    )
+    query = (
+        select(Company, Letter.id, Letter.status, Letter.sent_at)
+        .outerjoin(Letter, Letter.id == latest_letter)
+        .order_by(*keyset_order(Company.score, Company.id, True))
+        .limit(limit)
+    )
+    if status:
+        query = query.where(Company.status == status)
+    if industry:
+        query = query.where(Company.industry == industry)
+
+    result = []
+    for company, letter_id, letter_status, sent_at in await db.execute(query):
+        letter = None
+        if letter_id is not None:
+            letter = {
+                "id": letter_id,
+                "status": letter_status,
+                "delivery_status": delivery_status(letter_status),
+                "sent_at": sent_at,
+            }
+        result.append((company, letter))
+    return result
@@ -0,0 +1,253 @@
+"""
+Dedup Service - Поиск почти-дубликатов вакансий между источниками (SimHash)
+
+Одна и та же вакансия часто приходит с hh и SuperJob под разными URL.
+Каждая вакансия получает 64-битный SimHash по (компания, должность, описание),
+а кандидаты в дубликаты ищутся через индекс по полосам (banded index):
+отпечаток режется на BANDS полос, и при расстоянии Хэмминга
+<= MAX_HAMMING_DISTANCE хотя бы одна полоса обязательно совпадёт.
+
+Вакансии с одинаковыми компанией и должностью (после нормализации)
+схлопываются по точному ключу, без отпечатков. Без описания отпечаток
+определяют только компания и должность, и признак компании перевешивает
+должность: у всех таких вакансий одной компании отпечатки совпадают. Поэтому
+в индекс попадают только вакансии с описанием - по одной на ключ, - и
+кандидат подтверждается, только если у вакансий пересекаются и должности,
+и тексты описаний (общий "шаблонный" текст с другой должностью - не дубликат).
+"""
+
+import hashlib
+import re
+from collections import defaultdict
+from typing import Callable, Iterable, Iterator, Optional
+
+SIMHASH_BITS = 64
+BANDS = 4  # 4 полосы по 16 бит
+MAX_HAMMING_DISTANCE = 3
+SHINGLE_SIZE = 3
+# Минимальный коэффициент Жаккара должностей (по словам) и описаний (по шинглам)
+MIN_POSITION_OVERLAP = 0.5
+MIN_DESCRIPTION_OVERLAP = 0.5
+
+# Веса признаков: компания и должность важнее отдельной фразы описания,
+# иначе вакансии одной компании с общим "шаблонным" текстом склеятся
+COMPANY_WEIGHT = 8
+POSITION_WEIGHT = 4
+DESCRIPTION_WEIGHT = 1
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_LEGAL_FORMS = {"ооо", "оао", "зао", "пао", "ао", "ип", "гк", "нко", "llc", "inc", "ltd", "gmbh"}
+
+
+def normalize_company_name(name: Optional[str]) -> str:
+    """
+    Нормализовать название компании для сравнения между источниками
+
+    "ООО «Контур»" и "Контур" дают одинаковый результат.
+    """
+    tokens = _TOKEN_RE.findall((name or "").lower())
+    return " ".join(t for t in tokens if t not in _LEGAL_FORMS)
+
+
+def _tokens(text: Optional[str]) -> list[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def _hash64(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+# Счётчики всех 64 бит складываются "в столбик" в одном большом int:
+# бит i отпечатка разворачивается в отдельную дорожку шириной _LANE_BITS,
+# так что на признак приходится 8 табличных подстановок вместо 64 итераций
+_LANE_BITS = 40
+_LANE_MASK = (1 << _LANE_BITS) - 1
+_BYTE_LANES = [
+    sum(1 << (bit * _LANE_BITS) for bit in range(8) if byte >> bit & 1)
+    for byte in range(256)
+]
+
+
+def _spread(h: int) -> int:
+    lanes = 0
+    for i in range(SIMHASH_BITS // 8):
+        lanes |= _BYTE_LANES[h >> (i * 8) & 0xFF] << (i * 8 * _LANE_BITS)
+    return lanes
+
+
+def simhash(features: Iterable[tuple[str, int]]) -> int:
+    """
+    Посчитать SimHash по взвешенным признакам
+
+    Args:
+        features: пары (признак, вес)
+
+    Returns:
+        64-битный отпечаток
+    """
+    set_weights = 0  # сумма весов признаков с единицей в бите i, по дорожкам
+    total_weight = 0
+    for feature, weight in features:
+        set_weights += _spread(_hash64(feature)) * weight
+        total_weight += weight
+
+    fingerprint = 0
+    for bit in range(SIMHASH_BITS):
+        # бит равен 1, если "за" весит больше, чем "против"
+        if 2 * (set_weights >> (bit * _LANE_BITS) & _LANE_MASK) > total_weight:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def vacancy_fingerprint(item: dict) -> int:
+    """
+    SimHash вакансии по (компания, должность, описание)
+
+    Args:
+        item: вакансия в формате парсеров (company_name, position, description)
+    """
+    features: list[tuple[str, int]] = []
+
+    company = normalize_company_name(item.get("company_name"))
+    if company:
+        features.append((f"c:{company}", COMPANY_WEIGHT))
+
+    for token in _tokens(item.get("position")):
+        features.append((f"p:{token}", POSITION_WEIGHT))
+
+    for shingle in _shingles(item.get("description")):
+        features.append((shingle, DESCRIPTION_WEIGHT))
+
+    return simhash(features)
+
+
+def _shingles(text: Optional[str]) -> list[str]:
+    words = _tokens(text)
+    return [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(max(len(words) - SHINGLE_SIZE + 1, 0))]
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def normalize_position(position: Optional[str]) -> str:
+    return " ".join(_tokens(position))
+
+
+def is_same_vacancy(a: dict, b: dict) -> bool:
+    """
+    Подтвердить кандидата в дубликаты, найденного по SimHash
+
+    Returns:
+        True, если должности совпадают после нормализации или у обеих
+        вакансий есть описание, а должности и описания пересекаются
+        не меньше чем на MIN_POSITION_OVERLAP / MIN_DESCRIPTION_OVERLAP
+    """
+    if normalize_position(a.get("position")) == normalize_position(b.get("position")):
+        return True
+    a_shingles, b_shingles = set(_shingles(a.get("description"))), set(_shingles(b.get("description")))
+    if not a_shingles or not b_shingles:
+        return False
+    return (
+        _jaccard(set(_tokens(a.get("position"))), set(_tokens(b.get("position")))) >= MIN_POSITION_OVERLAP
+        and _jaccard(a_shingles, b_shingles) >= MIN_DESCRIPTION_OVERLAP
+    )
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class SimHashIndex:
+    """
+    Индекс отпечатков по полосам: поиск почти-дубликата за O(1) в среднем
+    """
+
+    def __init__(self, bands: int = BANDS, max_distance: int = MAX_HAMMING_DISTANCE):
+        if max_distance >= bands:
+            raise ValueError("max_distance должен быть меньше числа полос")
+        self.bands = bands
+        self.max_distance = max_distance
+        self._band_bits = SIMHASH_BITS // bands
+        self._band_mask = (1 << self._band_bits) - 1
+        self._buckets: list[dict[int, list[tuple[int, int]]]] = [defaultdict(list) for _ in range(bands)]
+
+    def _band_keys(self, fingerprint: int) -> list[int]:
+        return [fingerprint >> (i * self._band_bits) & self._band_mask for i in range(self.bands)]
+
+    def candidates(self, fingerprint: int) -> Iterator[int]:
+        """Ключи ранее добавленных элементов на расстоянии <= max_distance (без повторов)"""
+        seen = set()
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            for other, item_key in self._buckets[band].get(key, ()):
+                if item_key not in seen and hamming_distance(fingerprint, other) <= self.max_distance:
+                    seen.add(item_key)
+                    yield item_key
+
+    def find(self, fingerprint: int, accept: Optional[Callable[[int], bool]] = None) -> Optional[int]:
+        """
+        Найти ключ ранее добавленного почти-дубликата
+
+        Args:
+            fingerprint: отпечаток
+            accept: дополнительная проверка кандидата по ключу
+
+        Returns:
+            Ключ найденного элемента или None
+        """
+        for item_key in self.candidates(fingerprint):
+            if accept is None or accept(item_key):
+                return item_key
+        return None
+
+    def add(self, fingerprint: int, item_key: int) -> None:
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            self._buckets[band][key].append((fingerprint, item_key))
+
+
+def deduplicate_vacancies(items: list[dict]) -> tuple[list[dict], int]:
+    """
+    Схлопнуть почти-дубликаты вакансий (в т.ч. из разных источников)
+
+    Оставляется первое вхождение, навыки дубликатов добавляются к нему.
+
+    Args:
+        items: вакансии в формате парсеров
+
+    Returns:
+        Кортеж (уникальные вакансии, количество схлопнутых дубликатов)
+    """
+    exact: dict[tuple[str, str], int] = {}
+    index = SimHashIndex()
+    unique: list[dict] = []
+    duplicates = 0
+
+    for item in items:
+        key = (normalize_company_name(item.get("company_name")), normalize_position(item.get("position")))
+        found = exact.get(key)
+
+        # Без описания дубликат возможен только с тем же ключом
+        fingerprint = None
+        if found is None and _shingles(item.get("description")):
+            fingerprint = vacancy_fingerprint(item)
+            found = index.find(fingerprint, lambda other: is_same_vacancy(unique[other], item))
+
+        if found is None:
+            exact[key] = len(unique)
+            if fingerprint is not None:
+                index.add(fingerprint, len(unique))
+            unique.append(dict(item))
+            continue
+
+        exact.setdefault(key, found)
+        duplicates += 1
+        kept = unique[found]
+        skills = item.get("main_skills") or []
+        if isinstance(skills, str):
+            skills = [skills]
+        kept_skills = kept.get("main_skills") or []
+        if isinstance(kept_skills, str):
+            kept_skills = [kept_skills]
+        kept["main_skills"] = list(dict.fromkeys([*kept_skills, *skills]))
+
+    return unique, duplicates
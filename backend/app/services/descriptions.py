@@ -0,0 +1,82 @@
+"""
+Descriptions Service - Обучение словаря сжатия описаний вакансий
+
+Описания хранятся в Vacancy.description_zst (zstd). Пока словаря нет, они
+сжимаются без него; когда описаний набирается MIN_TRAINING_SAMPLES, обучается
+словарь, и все описания пересжимаются им.
+"""
+
+import logging
+from typing import Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.core.compression import MAX_TRAINING_SAMPLES, text_codec, train_dictionary
+from app.models.models import CompressionDictionary, Vacancy
+from app.services.search import index_pending_vacancies
+
+logger = logging.getLogger(__name__)
+
+# Вакансий в одном батче при пересжатии
+RECOMPRESS_CHUNK = 2000
+
+
+def recompress_descriptions(db: Session) -> int:
+    """
+    Пересжать все описания текущим словарём (без commit)
+
+    Returns:
+        Количество пересжатых описаний
+    """
+    ids = [vacancy_id for (vacancy_id,) in
+           db.query(Vacancy.id).filter(Vacancy.description_zst.isnot(None)).order_by(Vacancy.id)]
+    for start in range(0, len(ids), RECOMPRESS_CHUNK):
+        rows = db.query(Vacancy.id, Vacancy.description_zst).filter(
+            Vacancy.id.in_(ids[start:start + RECOMPRESS_CHUNK])
+        ).all()
+        db.execute(
+            update(Vacancy),
+            [
+                {"id": vacancy_id, "description_zst": text_codec.compress(text_codec.decompress(blob))}
+                for vacancy_id, blob in rows
+            ],
+        )
+    db.flush()
+    return len(ids)
+
+
+def train_description_dictionary(db: Session, force: bool = False) -> Optional[int]:
+    """
+    Обучить словарь на описаниях вакансий и пересжать ими все описания (без commit)
+
+    Args:
+        db: SQLAlchemy сессия
+        force: обучить новый словарь, даже если словарь уже есть
+
+    Returns:
+        ID нового словаря или None (словарь уже есть либо мало описаний)
+    """
+    text_codec.refresh(db)
+    if text_codec.current_id and not force:
+        return None
+
+    samples = [
+        text_codec.decompress(blob)
+        for (blob,) in db.query(Vacancy.description_zst)
+        .filter(Vacancy.description_zst.isnot(None))
+        .order_by(func.random())
+        .limit(MAX_TRAINING_SAMPLES)
+    ]
+    dictionary_id = (db.query(func.max(CompressionDictionary.id)).scalar() or 0) + 1
+    data = train_dictionary(samples, dictionary_id)
+    if data is None:
+        return None
+
+    db.add(CompressionDictionary(id=dictionary_id, data=data, samples=len(samples)))
+    db.flush()
+    text_codec.add_dictionary(dictionary_id, data)
+    recompressed = recompress_descriptions(db)
+    index_pending_vacancies(db)
+    logger.info(f"Обучен словарь сжатия описаний #{dictionary_id}, пересжато описаний: {recompressed}")
+    return dictionary_id
@@ -3,18 +3,41 @@ Email Service - Отправка писем компаниям (с заглуш
 """
 
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
 from app.models.models import Letter, Company
 from app.schemas.schemas import EmailStatusResponse
+from app.services.response_cache import bump_generation
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
 
 
-def send_email(
-    db: Session,
+def delivery_status(letter_status: str) -> str:
+    """Статус доставки по статусу письма (заглушка: отправленное считается доставленным)"""
+    return "delivered" if letter_status == "sent" else "pending"
+
+
+def _latest_letter_query(company_id: int, *columns):
+    """
+    Компания и её последнее письмо - один запрос (LEFT JOIN по индексу
+    ix_letters_company_created): строка есть, если есть компания, колонки
+    письма - None, если писем нет
+    """
+    return (
+        select(*columns)
+        .select_from(Company)
+        .outerjoin(Letter, Letter.company_id == Company.id)
+        .where(Company.id == company_id)
+        .order_by(Letter.created_at.desc())
+        .limit(1)
+    )
+
+
+async def send_email(
+    db: AsyncSession,
     company_id: int,
     email: str,
     dry_run: bool = False
@@ -23,7 +46,7 @@ def send_email(
     Отправить письмо компании по email (с заглушкой отправки)
     
     Args:
-        db: SQLAlchemy сессия
+        db: асинхронная SQLAlchemy сессия
         company_id: ID компании
         email: Email адрес получателя
         dry_run: если True, только проверка без реальной отправки
@@ -34,15 +57,11 @@ def send_email(
     Raises:
         ValueError: если компания не найдена, письмо не найдено или не approved
     """
-    # Проверяем существование компании
-    company = db.query(Company).filter(Company.id == company_id).first()
-    if not company:
+    # Компания и её последнее письмо
+    row = (await db.execute(_latest_letter_query(company_id, Company, Letter))).first()
+    if row is None:
         raise ValueError(f"Компания с ID {company_id} не найдена")
-    
-    # Получаем последнее письмо компании
-    letter = db.query(Letter).filter(
-        Letter.company_id == company_id
-    ).order_by(Letter.created_at.desc()).first()
+    company, letter = row
     
     if not letter:
         raise ValueError(f"Письмо для компании {company_id} не найдено")
@@ -96,15 +115,12 @@ def send_email(
         print(f"Статус: ✅ Отправлено (заглушка)")
         print(f"{'='*80}\n")
         
-        # Обновляем статус письма
+        # Статусы письма и компании - одной транзакцией
         letter.status = "sent"
         letter.sent_at = datetime.utcnow()
-        db.commit()
-        db.refresh(letter)
-        
-        # Обновляем статус компании
         company.status = "sent"
-        db.commit()
+        await bump_generation(db)
+        await db.commit()
         
         return EmailStatusResponse(
             company_id=company_id,
@@ -118,12 +134,12 @@ def send_email(
         )
 
 
-def get_email_status(db: Session, company_id: int) -> EmailStatusResponse:
+async def get_email_status(db: AsyncSession, company_id: int) -> EmailStatusResponse:
     """
     Получить статус отправки письма компании
     
     Args:
-        db: SQLAlchemy сессия
+        db: асинхронная SQLAlchemy сессия
         company_id: ID компании
         
     Returns:
@@ -132,34 +148,24 @@ def get_email_status(db: Session, company_id: int) -> EmailStatusResponse:
     Raises:
         ValueError: если компания не найдена или письмо не найдено
     """
-    # Проверяем существование компании
-    company = db.query(Company).filter(Company.id == company_id).first()
-    if not company:
+    # Нужны только id и статус последнего письма - без ORM-объектов
+    row = (await db.execute(
+        _latest_letter_query(company_id, Letter.id, Letter.status, Letter.sent_at)
+    )).first()
+    if row is None:
         raise ValueError(f"Компания с ID {company_id} не найдена")
+    letter_id, letter_status, sent_at = row
     
-    # Получаем последнее письмо компании
-    letter = db.query(Letter).filter(
-        Letter.company_id == company_id
-    ).order_by(Letter.created_at.desc()).first()
-    
-    if not letter:
+    if letter_id is None:
         raise ValueError(f"Письмо для компании {company_id} не найдено")
     
-    # Определяем delivery_status на основе статуса письма
-    if letter.status == "sent":
-        delivery_status = "delivered"
-    elif letter.status == "approved":
-        delivery_status = "pending"
-    else:  # draft, rejected
-        delivery_status = "pending"
-    
     # В реальной системе здесь был бы запрос к email-провайдеру (SendGrid, AWS SES и т.д.)
     # Для заглушки возвращаем базовую информацию
     return EmailStatusResponse(
         company_id=company_id,
         email="unknown@example.com",  # В реальной системе брали бы из БД или tracking
-        sent_at=letter.sent_at,
-        delivery_status=delivery_status,
+        sent_at=sent_at,
+        delivery_status=delivery_status(letter_status),
         opened_at=None,  # Заглушка: нет tracking
         clicked_at=None,  # Заглушка: нет tracking
         bounced=False,
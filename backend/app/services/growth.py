@@ -0,0 +1,93 @@
+"""
+Growth Service - Сигнал роста компании по снимкам числа вакансий
+
+На каждом импорте для компаний, у которых изменилось число вакансий,
+в vacancy_snapshots дописывается снимок (append-only, неизменившиеся
+компании не пишутся). Тренд хранится в Company.growth_trend как сумма
+относительных изменений, затухающая со временем (полупериод GROWTH_HALF_LIFE),
+и обновляется инкрементально, без агрегации истории. Затухание считается по
+времени с прошлого обновления тренда, а не по числу импортов: тренд не
+зависит от того, как часто запускается импорт.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+
+from app.models.models import Company, VacancySnapshot
+
+# За это время вклад изменения в тренд уменьшается вдвое
+GROWTH_HALF_LIFE = timedelta(days=30)
+# Тренд меньше этого по модулю считается нулевым
+GROWTH_EPSILON = 1e-3
+
+
+def growth_component(trend) -> np.ndarray:
+    """Тренд -> компонент скора 0..1 (0.5 - нет изменений)"""
+    return 0.5 + 0.5 * np.tanh(np.asarray(trend, dtype=np.float64))
+
+
+def growth_decay(updated_at: Optional[datetime], taken_at: datetime) -> float:
+    """Множитель затухания тренда за время с прошлого обновления (1 - время неизвестно)"""
+    if updated_at is None:
+        return 1.0
+    elapsed = max((taken_at - updated_at).total_seconds(), 0.0)
+    return 0.5 ** (elapsed / GROWTH_HALF_LIFE.total_seconds())
+
+
+def record_snapshots(db: Session, taken_at: Optional[datetime] = None) -> set[int]:
+    """
+    Записать снимки изменившихся компаний и обновить тренд роста (без commit)
+
+    Ненулевые тренды затухают пропорционально времени с прошлого обновления,
+    изменившиеся компании добавляют наблюдение (new - old) / max(old, 1).
+    Для новой компании первый снимок - точка отсчёта, тренд не меняется.
+
+    Args:
+        db: SQLAlchemy сессия
+        taken_at: время снимка (по умолчанию текущее)
+
+    Returns:
+        ID компаний, у которых изменился тренд
+    """
+    taken_at = taken_at or datetime.utcnow()
+    current_count = func.coalesce(Company.vacancy_count, 0)
+
+    rows = db.query(
+        Company.id, current_count, Company.last_snapshot_count, Company.growth_trend, Company.growth_updated_at
+    ).filter(
+        (Company.last_snapshot_count.is_(None))
+        | (Company.last_snapshot_count != current_count)
+        | (Company.growth_trend != 0)
+    ).all()
+    if not rows:
+        return set()
+
+    snapshots = []
+    updates = []
+    trend_changed = set()
+    for company_id, count, previous, trend, updated_at in rows:
+        trend = (trend or 0.0) * growth_decay(updated_at, taken_at)
+        if previous != count:
+            snapshots.append({"company_id": company_id, "vacancy_count": count, "taken_at": taken_at})
+            if previous is not None:
+                trend += (count - previous) / max(previous, 1)
+        if abs(trend) < GROWTH_EPSILON:
+            trend = 0.0
+        if previous is not None:
+            trend_changed.add(company_id)
+        updates.append({
+            "id": company_id,
+            "growth_trend": trend,
+            "growth_updated_at": taken_at,
+            "last_snapshot_count": count,
+        })
+
+    if snapshots:
+        db.execute(insert(VacancySnapshot), snapshots)
+    db.execute(update(Company), updates)
+    db.flush()
+    return trend_changed
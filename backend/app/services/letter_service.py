@@ -2,15 +2,30 @@
 Letter Service - Генерация писем по шаблонам и CRUD операции
 """
 
+import asyncio
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
 from jinja2 import Environment, FileSystemLoader
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, joinedload
 
+from app.core.pagination import decode_cursor, encode_cursor, keyset_filter, keyset_order
 from app.models.models import Letter, Company
+from app.services.counters import resolve_total
+from app.services.response_cache import bump_generation
 from app.services.ai_letter_generation import generate_letter_with_gigachat
 
+# fields= списка писем: поле LetterResponse -> колонка (company_name - через JOIN)
+LETTER_FIELDS = {
+    "id": Letter.id,
+    "subject": Letter.subject,
+    "body": Letter.body,
+    "status": Letter.status,
+    "company_name": Company.name,
+}
+
 # Путь к директории с шаблонами
 TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
 
@@ -149,12 +164,12 @@ def generate_letter_content(
 #     }
 
 
-def create_or_replace_draft(db: Session, company_id: int, template: str = "formal") -> Letter:
+async def create_or_replace_draft(db: AsyncSession, company_id: int, template: str = "formal") -> Letter:
     """
     Создать новое письмо-черновик или заменить существующий черновик для компании
     
     Args:
-        db: SQLAlchemy сессия
+        db: асинхронная SQLAlchemy сессия
         company_id: ID компании
         template: тип шаблона ("formal" или "informal")
         
@@ -165,25 +180,28 @@ def create_or_replace_draft(db: Session, company_id: int, template: str = "forma
         ValueError: если компания не найдена или template невалиден
     """
     # Проверяем существование компании
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
     if not company:
         raise ValueError(f"Компания с ID {company_id} не найдена")
 
     # Получаем навыки из компании (main_skills - это JSON/list)
     skills = company.main_skills if company.main_skills else []
 
-    # Генерируем содержимое письма через существующую pure-функцию
-    letter_content = generate_letter_content(
+    # Генерация через GigaChat - блокирующий сетевой вызов, уводим его из event loop
+    letter_content = await asyncio.to_thread(
+        generate_letter_content,
         company_name=company.name,
         skills=skills,
         template=template
     )
 
     # Ищем существующий черновик для этой компании
-    existing_draft = db.query(Letter).filter(
-        Letter.company_id == company_id,
-        Letter.status == "draft"
-    ).first()
+    existing_draft = (await db.execute(
+        select(Letter).where(
+            Letter.company_id == company_id,
+            Letter.status == "draft"
+        )
+    )).scalars().first()
 
     if existing_draft:
         # Обновляем существующий черновик
@@ -191,46 +209,60 @@ def create_or_replace_draft(db: Session, company_id: int, template: str = "forma
         existing_draft.subject = letter_content["subject"]
         existing_draft.body = letter_content["body"]
         existing_draft.created_at = datetime.utcnow()  # Обновляем время
-        db.commit()
-        db.refresh(existing_draft)
+        existing_draft.company = company
+        await bump_generation(db)
+        await db.commit()
         return existing_draft
     else:
         # Создаём новое письмо
         new_letter = Letter(
-            company_id=company_id,
+            company=company,
             template=template,
             subject=letter_content["subject"],
             body=letter_content["body"],
             status="draft"
         )
         db.add(new_letter)
-        db.commit()
-        db.refresh(new_letter)
+        await bump_generation(db)
+        await db.commit()
         return new_letter
 
 
-def get_letter_by_company_id(db: Session, company_id: int) -> Optional[Letter]:
+async def get_letter_by_company_id(db: AsyncSession, company_id: int) -> Optional[Letter]:
     """
     Получить письмо для компании (любое, приоритет - последнее созданное)
     
     Args:
-        db: SQLAlchemy сессия
+        db: асинхронная SQLAlchemy сессия
         company_id: ID компании
         
     Returns:
         Письмо или None если не найдено
     """
-    return db.query(Letter).filter(
-        Letter.company_id == company_id
-    ).order_by(Letter.created_at.desc()).first()
+    result = await db.execute(
+        select(Letter)
+        .options(joinedload(Letter.company))
+        .where(Letter.company_id == company_id)
+        .order_by(Letter.created_at.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+async def _get_letter(db: AsyncSession, letter_id: int) -> Optional[Letter]:
+    """Письмо вместе с компанией - одним запросом (JOIN)"""
+    result = await db.execute(
+        select(Letter).options(joinedload(Letter.company)).where(Letter.id == letter_id)
+    )
+    return result.scalars().first()
 
 
-def approve_letter(db: Session, letter_id: int, body: Optional[str] = None) -> Letter:
+async def approve_letter(db: AsyncSession, letter_id: int, body: Optional[str] = None) -> Letter:
     """
     Одобрить письмо (статус -> approved)
     
     Args:
-        db: SQLAlchemy сессия
+        db: асинхронная SQLAlchemy сессия
         letter_id: ID письма
         body: опциональный новый текст письма
         
@@ -240,7 +272,7 @@ def approve_letter(db: Session, letter_id: int, body: Optional[str] = None) -> L
     Raises:
         ValueError: если письмо не найдено
     """
-    letter = db.query(Letter).filter(Letter.id == letter_id).first()
+    letter = await _get_letter(db, letter_id)
     if not letter:
         raise ValueError(f"Письмо с ID {letter_id} не найдено")
 
@@ -252,17 +284,17 @@ def approve_letter(db: Session, letter_id: int, body: Optional[str] = None) -> L
     letter.status = "approved"
     letter.approved_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(letter)
+    await bump_generation(db)
+    await db.commit()
     return letter
 
 
-def reject_letter(db: Session, letter_id: int, reason: Optional[str] = None) -> Letter:
+async def reject_letter(db: AsyncSession, letter_id: int, reason: Optional[str] = None) -> Letter:
     """
     Отклонить письмо (статус -> rejected)
     
     Args:
-        db: SQLAlchemy сессия
+        db: асинхронная SQLAlchemy сессия
         letter_id: ID письма
         reason: причина отклонения
         
@@ -272,7 +304,7 @@ def reject_letter(db: Session, letter_id: int, reason: Optional[str] = None) ->
     Raises:
         ValueError: если письмо не найдено
     """
-    letter = db.query(Letter).filter(Letter.id == letter_id).first()
+    letter = await _get_letter(db, letter_id)
     if not letter:
         raise ValueError(f"Письмо с ID {letter_id} не найдено")
 
@@ -281,17 +313,17 @@ def reject_letter(db: Session, letter_id: int, reason: Optional[str] = None) ->
     letter.rejected_at = datetime.utcnow()
     letter.rejection_reason = reason
 
-    db.commit()
-    db.refresh(letter)
+    await bump_generation(db)
+    await db.commit()
     return letter
 
 
-def update_letter(db: Session, letter_id: int, body: str) -> Letter:
+async def update_letter(db: AsyncSession, letter_id: int, body: str) -> Letter:
     """
     Обновить текст письма (статус сбрасывается в draft)
     
     Args:
-        db: SQLAlchemy сессия
+        db: асинхронная SQLAlchemy сессия
         letter_id: ID письма
         body: новый текст письма
         
@@ -301,7 +333,7 @@ def update_letter(db: Session, letter_id: int, body: str) -> Letter:
     Raises:
         ValueError: если письмо не найдено
     """
-    letter = db.query(Letter).filter(Letter.id == letter_id).first()
+    letter = await _get_letter(db, letter_id)
     if not letter:
         raise ValueError(f"Письмо с ID {letter_id} не найдено")
 
@@ -312,45 +344,80 @@ def update_letter(db: Session, letter_id: int, body: str) -> Letter:
     letter.rejected_at = None
     letter.rejection_reason = None
 
-    db.commit()
-    db.refresh(letter)
+    await bump_generation(db)
+    await db.commit()
     return letter
 
 
-def list_letters(
-        db: Session,
+async def list_letters(
+        db: AsyncSession,
         status: Optional[str] = None,
         company_id: Optional[int] = None,
         page: int = 1,
-        limit: int = 20
-) -> tuple[list[Letter], int]:
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        total_mode: str = "exact",
+        fields: Optional[list[str]] = None
+) -> tuple[list, Optional[int], bool, Optional[str]]:
     """
-    Получить список писем с фильтрацией и пагинацией
+    Получить список писем с фильтрацией и пагинацией (новые первыми)
     
     Args:
-        db: SQLAlchemy сессия
+        db: асинхронная SQLAlchemy сессия
         status: фильтр по статусу (draft, approved, rejected, sent)
         company_id: фильтр по ID компании
-        page: номер страницы (начиная с 1)
+        page: номер страницы (начиная с 1; игнорируется, если передан cursor)
         limit: количество записей на странице
+        cursor: курсор следующей страницы из предыдущего ответа
+        total_mode: exact, estimate или none (см. counters.resolve_total)
+        fields: поля LETTER_FIELDS (parse_fields) - выбираются только их колонки
         
     Returns:
-        Кортеж (список писем, общее количество)
+        Кортеж (список писем, общее количество, является ли оно оценкой,
+        курсор следующей страницы или None). При fields - строки с колонками
+        полей в порядке fields, а не объекты Letter
+        
+    Raises:
+        ValueError: если курсор или режим total недопустимы
     """
     # Базовый запрос
-    query = db.query(Letter)
+    query = select(Letter)
 
     # Применяем фильтры
     if status:
-        query = query.filter(Letter.status == status)
+        query = query.where(Letter.status == status)
     if company_id:
-        query = query.filter(Letter.company_id == company_id)
+        query = query.where(Letter.company_id == company_id)
 
-    # Получаем общее количество
-    total = query.count()
+    # Общее количество: по счётчикам, где это возможно
+    total, total_estimated = await resolve_total(
+        db, "letters", {"status": status, "company_id": company_id or None}, query, total_mode
+    )
 
-    # Применяем пагинацию
-    offset = (page - 1) * limit
-    items = query.order_by(Letter.created_at.desc()).offset(offset).limit(limit).all()
+    # Применяем пагинацию: по курсору (created_at, id) или по номеру страницы
+    query = query.order_by(*keyset_order(Letter.created_at, Letter.id, True))
+    if cursor:
+        created_at, last_id = decode_cursor(cursor, "created_desc", datetime_key=True)
+        query = query.where(keyset_filter(Letter.created_at, Letter.id, True, created_at, last_id))
+    else:
+        query = query.offset((page - 1) * limit)
 
-    return items, total
+    if fields is None:
+        # Компании писем - в том же запросе: число запросов не зависит от limit
+        result = await db.execute(
+            query.outerjoin(Letter.company).options(contains_eager(Letter.company)).limit(limit + 1)
+        )
+        items = list(result.scalars().all())
+    else:
+        # created_at - для курсора, после колонок полей
+        query = query.with_only_columns(*(LETTER_FIELDS[field] for field in fields), Letter.created_at)
+        if "company_name" in fields:
+            query = query.outerjoin(Company, Company.id == Letter.company_id)
+        items = list((await db.execute(query.limit(limit + 1))).all())
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor("created_desc", items[-1].created_at, items[-1].id)
+
+    return items, total, total_estimated, next_cursor
@@ -0,0 +1,121 @@
+"""
+Response Cache Service - Кэш готовых ответов API в памяти процесса
+
+Ответ кэшируется по нормализованным параметрам запроса вместе с поколением
+данных (cache_generation.generation). Каждая запись, меняющая ответы
+(одобрение/отклонение компании, импорт и пересчёт скора, смена статуса письма,
+отправка email), увеличивает поколение в той же транзакции, поэтому кэш
+видит изменения и из других процессов (импорт в контейнере init-db).
+Проверка поколения - один запрос по первичному ключу вместо исходного запроса.
+
+Размер ограничен LRU (RESPONSE_CACHE_SIZE записей) и временем жизни
+(RESPONSE_CACHE_TTL секунд).
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+load_dotenv()
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+
+_CURRENT_GENERATION = text("SELECT generation FROM cache_generation WHERE id = 1")
+_BUMP_GENERATION = text("UPDATE cache_generation SET generation = generation + 1 WHERE id = 1")
+
+
+class ResponseCache:
+    """LRU + TTL кэш ответов, привязанных к поколению данных"""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # ключ -> (поколение, момент истечения, ответ); порядок - от давно использованных
+        self._entries: OrderedDict[Hashable, tuple[int, float, Any]] = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _sync_generation(self, generation: int) -> None:
+        """Поколение выросло: все записи устарели"""
+        if generation > self._generation:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._generation = generation
+
+    def get(self, key: Hashable, generation: int) -> Optional[Any]:
+        """Ответ по ключу или None (нет, истёк или посчитан для старого поколения)"""
+        self._sync_generation(generation)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != generation:
+            self.misses += 1
+            return None
+        if entry[1] <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def put(self, key: Hashable, generation: int, value: Any) -> None:
+        self._sync_generation(generation)
+        if generation < self._generation:
+            return  # ответ посчитан до записи, завершившейся во время запроса
+        self._entries[key] = (generation, time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / requests, 4) if requests else 0.0,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "generation": self._generation,
+        }
+
+
+# Кэш процесса API
+response_cache = ResponseCache()
+
+
+def cache_key(endpoint: str, **params) -> tuple:
+    """Ключ кэша: эндпоинт и параметры без None, в порядке имён"""
+    return (endpoint, tuple(sorted((name, value) for name, value in params.items() if value is not None)))
+
+
+async def current_generation(db: AsyncSession) -> int:
+    return await db.scalar(_CURRENT_GENERATION) or 0
+
+
+async def bump_generation(db: AsyncSession) -> None:
+    """Отметить изменение данных (без commit: в транзакции самой записи)"""
+    await db.execute(_BUMP_GENERATION)
+
+
+def bump_generation_sync(db: Session) -> None:
+    """То же для синхронной сессии (импорт, пересчёт скора)"""
+    db.execute(_BUMP_GENERATION)
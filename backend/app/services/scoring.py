@@ -1,26 +1,278 @@
+import numpy as np
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.models.models import Company, ScoringWeights
+from app.services.growth import growth_component
+from app.services.response_cache import bump_generation_sync
+
+# Веса по умолчанию (пока не сохранено ни одной версии в scoring_weights)
+W_VACANCY = 0.25
+W_SKILLS = 0.45
+W_SIZE   = 0.15
+W_GROWTH = 0.15
+
+W_CURRICULUM = 0.0
+
+COMPONENTS = ("vacancy", "skills", "size", "growth", "curriculum")
+DEFAULT_WEIGHTS = {
+    "vacancy": W_VACANCY,
+    "skills": W_SKILLS,
+    "size": W_SIZE,
+    "growth": W_GROWTH,
+    "curriculum": W_CURRICULUM,
+}
+
+# Пока нет реальных данных о размере компании
+DEFAULT_COMPANY_SIZE_SCORE = 0.5
+
+
 def calculate_score(
     vacancy_count: int,
-    skills_found: int,
+    skills_weight: float,
     *,
     max_vacancy_count: int,
-    max_skills_possible: int,
+    max_skill_weight: float,
     company_size_score: float,
     growth_score: float,
+    curriculum_score: float = 0.0,
+    weights: dict[str, float] | None = None,
 ) -> float:
+    """
+    Скор одной компании; weights - веса компонентов, как у combine_components
+    (для активной версии - weights_as_dict(get_active_weights(db)))
+    """
+    weights = weights or DEFAULT_WEIGHTS
 
     vacancy_score = min(vacancy_count / max_vacancy_count, 1.0)
-    skills_score = min(skills_found / max_skills_possible, 1.0)
-
-    W_VACANCY = 0.25
-    W_SKILLS = 0.45
-    W_SIZE   = 0.15
-    W_GROWTH = 0.15
+    skills_score = min(skills_weight / max_skill_weight, 1.0)
 
     total = (
-        vacancy_score * W_VACANCY +
-        skills_score * W_SKILLS +
-        company_size_score * W_SIZE +
-        growth_score * W_GROWTH
+        vacancy_score * weights["vacancy"] +
+        skills_score * weights["skills"] +
+        company_size_score * weights["size"] +
+        growth_score * weights["growth"] +
+        curriculum_score * weights["curriculum"]
     )
 
     return round(total * 100, 2)  # скор 0..100
+
+
+def calculate_components(
+    vacancy_counts,
+    skills_weights,
+    *,
+    max_vacancy_count: int,
+    max_skill_weight: float,
+    company_size_scores,
+    growth_scores,
+    curriculum_scores=0.0,
+) -> dict[str, np.ndarray]:
+    """
+    Нормированные компоненты скора 0..1 для массива компаний
+
+    Returns:
+        Словарь компонент -> массив значений (ключи как в DEFAULT_WEIGHTS)
+    """
+    n = len(vacancy_counts)
+    return {
+        "vacancy": np.minimum(np.asarray(vacancy_counts, dtype=np.float64) / max_vacancy_count, 1.0),
+        "skills": np.minimum(np.asarray(skills_weights, dtype=np.float64) / max_skill_weight, 1.0),
+        "size": np.broadcast_to(np.asarray(company_size_scores, dtype=np.float64), (n,)),
+        "growth": np.broadcast_to(np.asarray(growth_scores, dtype=np.float64), (n,)),
+        "curriculum": np.broadcast_to(np.asarray(curriculum_scores, dtype=np.float64), (n,)),
+    }
+
+
+def combine_components(components: dict[str, np.ndarray], weights: dict[str, float] | None = None) -> np.ndarray:
+    """Взвешенная сумма компонент -> скор 0..100, округлённый до 2 знаков"""
+    weights = weights or DEFAULT_WEIGHTS
+    total = sum(components[name] * weights[name] for name in COMPONENTS)
+    return np.round(total * 100, 2)
+
+
+def validate_weights(weights: dict[str, float]) -> dict[str, float]:
+    """
+    Проверить веса: все компоненты заданы, неотрицательны и в сумме дают 1
+
+    Raises:
+        ValueError: если веса невалидны
+    """
+    missing = [name for name in COMPONENTS if name not in weights]
+    if missing:
+        raise ValueError(f"Не заданы веса компонентов: {', '.join(missing)}")
+    if any(weights[name] < 0 for name in COMPONENTS):
+        raise ValueError("Веса компонентов должны быть неотрицательными")
+    total = sum(weights[name] for name in COMPONENTS)
+    if abs(total - 1.0) > 1e-6:
+        raise ValueError(f"Сумма весов должна быть равна 1, получено {total:.4f}")
+    return {name: float(weights[name]) for name in COMPONENTS}
+
+
+def get_active_weights(db: Session) -> ScoringWeights | None:
+    """Текущая версия весов (None - используются DEFAULT_WEIGHTS)"""
+    return db.query(ScoringWeights).filter(
+        ScoringWeights.is_active.is_(True)
+    ).order_by(ScoringWeights.id.desc()).first()
+
+
+def weights_as_dict(version: ScoringWeights | None) -> dict[str, float]:
+    if version is None:
+        return dict(DEFAULT_WEIGHTS)
+    return {
+        "vacancy": version.w_vacancy,
+        "skills": version.w_skills,
+        "size": version.w_size,
+        "growth": version.w_growth,
+        "curriculum": version.w_curriculum or 0.0,
+    }
+
+
+def score_expression(weights: dict[str, float]):
+    """SQL-выражение скора по сохранённым компонентам"""
+    return func.round(
+        (
+            func.coalesce(Company.score_vacancy, 0) * weights["vacancy"] +
+            func.coalesce(Company.score_skills, 0) * weights["skills"] +
+            func.coalesce(Company.score_size, 0) * weights["size"] +
+            func.coalesce(Company.score_growth, 0) * weights["growth"] +
+            func.coalesce(Company.score_curriculum, 0) * weights["curriculum"]
+        ) * 100,
+        2,
+    )
+
+
+def reweight_companies(db: Session, weights: dict[str, float], comment: str | None = None) -> tuple[ScoringWeights, int]:
+    """
+    Сохранить новую версию весов и пересчитать Company.score одним UPDATE
+
+    Args:
+        db: SQLAlchemy сессия
+        weights: веса компонентов (vacancy, skills, size, growth)
+        comment: комментарий к версии
+
+    Returns:
+        Кортеж (новая версия весов, количество обновлённых компаний)
+
+    Raises:
+        ValueError: если веса невалидны
+    """
+    weights = validate_weights(weights)
+
+    db.query(ScoringWeights).filter(ScoringWeights.is_active.is_(True)).update(
+        {ScoringWeights.is_active: False}, synchronize_session=False
+    )
+    version = ScoringWeights(
+        w_vacancy=weights["vacancy"],
+        w_skills=weights["skills"],
+        w_size=weights["size"],
+        w_growth=weights["growth"],
+        w_curriculum=weights["curriculum"],
+        comment=comment,
+        is_active=True,
+    )
+    db.add(version)
+
+    result = db.execute(
+        update(Company).values(score=score_expression(weights)).execution_options(synchronize_session=False)
+    )
+    bump_generation_sync(db)
+    db.commit()
+    db.refresh(version)
+
+    return version, result.rowcount
+
+
+def preview_top_companies(db: Session, weights: dict[str, float], limit: int = 20) -> list[tuple[Company, float]]:
+    """
+    Top-N компаний под заданными весами без записи в БД
+
+    Returns:
+        Список пар (компания, скор под новыми весами)
+
+    Raises:
+        ValueError: если веса невалидны
+    """
+    weights = validate_weights(weights)
+    new_score = score_expression(weights).label("new_score")
+    return [
+        (company, score)
+        for company, score in db.query(Company, new_score).order_by(new_score.desc(), Company.id).limit(limit)
+    ]
+
+
+def rescore_companies(
+    db: Session,
+    company_ids=None,
+    *,
+    max_vacancy_count: int | None = None,
+    max_skill_weight: float | None = None,
+) -> int:
+    """
+    Пересчитать компоненты и скор компаний: одна выборка столбцов, один проход
+    NumPy и UPDATE по первичному ключу для каждой компании (одним executemany)
+
+    Компонент навыков - IDF-взвешенная сумма навыков (Company.skills_weight),
+    нормированная на максимальную сумму; компонент роста - из Company.growth_trend.
+
+    Args:
+        db: SQLAlchemy сессия
+        company_ids: ID компаний для пересчёта (по умолчанию все)
+        max_vacancy_count: нормировка для вакансий (по умолчанию максимум по выборке)
+        max_skill_weight: нормировка для навыков (по умолчанию максимум по выборке)
+
+    Returns:
+        Количество пересчитанных компаний
+    """
+    query = db.query(
+        Company.id,
+        func.coalesce(Company.vacancy_count, 0),
+        func.coalesce(Company.skills_weight, 0.0),
+        func.coalesce(Company.score_curriculum, 0.0),
+        func.coalesce(Company.growth_trend, 0.0),
+    )
+    if company_ids is not None:
+        query = query.filter(Company.id.in_(list(company_ids)))
+    rows = query.all()
+
+    if not rows:
+        return 0
+
+    ids, vacancy_counts, skills_weights, curriculum_scores, growth_trends = (np.array(col) for col in zip(*rows))
+
+    components = calculate_components(
+        vacancy_counts,
+        skills_weights,
+        max_vacancy_count=max_vacancy_count or max(int(vacancy_counts.max()), 1),
+        max_skill_weight=max_skill_weight or max(float(skills_weights.max()), 1.0),
+        company_size_scores=DEFAULT_COMPANY_SIZE_SCORE,
+        growth_scores=growth_component(growth_trends),
+        curriculum_scores=curriculum_scores,
+    )
+    scores = combine_components(components, weights_as_dict(get_active_weights(db)))
+
+    db.execute(
+        update(Company),
+        [
+            {
+                "id": company_id,
+                "score": score,
+                "score_vacancy": vacancy,
+                "score_skills": skills,
+                "score_size": size,
+                "score_growth": growth,
+            }
+            for company_id, score, vacancy, skills, size, growth in zip(
+                ids.tolist(),
+                scores.tolist(),
+                components["vacancy"].tolist(),
+                components["skills"].tolist(),
+                components["size"].tolist(),
+                components["growth"].tolist(),
+            )
+        ],
+    )
+    bump_generation_sync(db)
+    db.commit()
+
+    return len(ids)
@@ -0,0 +1,338 @@
+"""
+Scoring Stats Service - Сохранённые нормировки скоринга и инкрементальный пересчёт
+
+Нормировки (max_vacancy_count, max_skill_weight) хранятся в scoring_stats,
+а гистограмма score_histogram позволяет поддерживать максимум при удалении
+вакансий без полного прохода по таблице. Если после изменения нормировка
+сдвинулась, скор пересчитывается батчем для всех компаний, иначе - только
+для затронутых. rescore_all - полный пересчёт всего скоринга с нуля.
+"""
+
+from collections import defaultdict
+from typing import Iterable
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.models import Company, Vacancy, ScoringStats, ScoreHistogram
+from app.services.scoring import rescore_companies
+from app.services.response_cache import bump_generation_sync
+from app.services.search import index_pending_vacancies
+from app.services.skill_weights import rebuild_skill_weights, update_skill_weights
+from app.services.curriculum import load_program_skills, program_version, refresh_curriculum_scores
+from app.services.skill_links import delete_vacancy_links, sync_skill_links
+from app.services.similarity import refresh_minhash
+
+logger = logging.getLogger(__name__)
+
+VACANCY_COMPONENT = "vacancy_count"
+SKILLS_COMPONENT = "skills_count"
+
+
+def _skills_count(main_skills) -> int:
+    return len(main_skills) if main_skills else 0
+
+
+def _max_skill_weight(db: Session) -> float:
+    value = db.query(func.max(Company.skills_weight)).scalar()
+    return max(value or 0.0, 1.0)
+
+
+def _max_value(db: Session, component: str) -> int:
+    value = db.query(func.max(ScoreHistogram.value)).filter(
+        ScoreHistogram.component == component,
+        ScoreHistogram.companies > 0
+    ).scalar()
+    return max(value or 0, 1)
+
+
+def _bump_histogram(db: Session, deltas: dict[tuple[str, int], int]) -> None:
+    for (component, value), delta in deltas.items():
+        if delta == 0:
+            continue
+        row = db.get(ScoreHistogram, (component, value))
+        if row is None:
+            row = ScoreHistogram(component=component, value=value, companies=0)
+            db.add(row)
+        row.companies += delta
+        if row.companies <= 0:
+            db.delete(row)
+
+
+def rebuild_stats(db: Session) -> ScoringStats:
+    """
+    Пересобрать статистику с нуля по таблице companies (первичное заполнение)
+
+    Args:
+        db: SQLAlchemy сессия
+
+    Returns:
+        Строка статистики
+    """
+    db.query(ScoreHistogram).delete()
+
+    deltas: dict[tuple[str, int], int] = defaultdict(int)
+    companies_count = total_vacancies = total_skills = 0
+    for vacancy_count, main_skills in db.query(Company.vacancy_count, Company.main_skills):
+        skills_count = _skills_count(main_skills)
+        deltas[(VACANCY_COMPONENT, vacancy_count or 0)] += 1
+        deltas[(SKILLS_COMPONENT, skills_count)] += 1
+        companies_count += 1
+        total_vacancies += vacancy_count or 0
+        total_skills += skills_count
+
+    db.flush()
+    _bump_histogram(db, deltas)
+    db.flush()
+
+    stats = db.get(ScoringStats, 1) or ScoringStats(id=1)
+    stats.companies_count = companies_count
+    stats.total_vacancies = total_vacancies
+    stats.total_skills = total_skills
+    stats.max_vacancy_count = _max_value(db, VACANCY_COMPONENT)
+    stats.max_skills_possible = _max_value(db, SKILLS_COMPONENT)
+    db.add(stats)
+    db.commit()
+    return stats
+
+
+def get_stats(db: Session) -> ScoringStats:
+    """Получить статистику скоринга (при отсутствии - собрать)"""
+    return db.get(ScoringStats, 1) or rebuild_stats(db)
+
+
+def sync_companies(db: Session, company_ids: Iterable[int]) -> None:
+    """
+    Пересчитать vacancy_count и main_skills затронутых компаний по их вакансиям
+    и применить разницу к гистограмме и агрегатам (без commit)
+
+    Args:
+        db: SQLAlchemy сессия
+        company_ids: ID компаний, у которых добавились или удалились вакансии
+    """
+    company_ids = set(company_ids)
+    if not company_ids:
+        return
+
+    stats = get_stats(db)
+
+    vacancies_by_company: dict[int, list] = defaultdict(list)
+    for company_id, skills in db.query(Vacancy.company_id, Vacancy.skills).filter(
+        Vacancy.company_id.in_(company_ids)
+    ):
+        if isinstance(skills, str):
+            skills = [skills]
+        vacancies_by_company[company_id].append(skills or [])
+
+    deltas: dict[tuple[str, int], int] = defaultdict(int)
+    for company in db.query(Company).filter(Company.id.in_(company_ids)):
+        old_vacancy_count = company.vacancy_count or 0
+        old_skills_count = _skills_count(company.main_skills)
+
+        vacancy_skills = vacancies_by_company.get(company.id, [])
+        unique_skills = list(dict.fromkeys(skill for skills in vacancy_skills for skill in skills))
+
+        company.vacancy_count = len(vacancy_skills)
+        company.main_skills = unique_skills
+
+        deltas[(VACANCY_COMPONENT, old_vacancy_count)] -= 1
+        deltas[(VACANCY_COMPONENT, company.vacancy_count)] += 1
+        deltas[(SKILLS_COMPONENT, old_skills_count)] -= 1
+        deltas[(SKILLS_COMPONENT, len(unique_skills))] += 1
+
+        stats.total_vacancies += company.vacancy_count - old_vacancy_count
+        stats.total_skills += len(unique_skills) - old_skills_count
+
+    db.flush()
+    _bump_histogram(db, deltas)
+    sync_skill_links(db, company_ids)
+    refresh_minhash(db, company_ids)
+    refresh_curriculum_scores(db, company_ids)
+    db.flush()
+
+
+def apply_vacancy_changes(
+    db: Session,
+    company_ids: Iterable[int],
+    added: Iterable = (),
+    removed: Iterable = (),
+) -> None:
+    """
+    Учесть добавленные и удалённые вакансии (без commit): агрегаты компаний
+    и гистограмма, затем IDF навыков и взвешенные суммы затронутых компаний
+    по уже обновлённому IDF, полнотекстовый индекс вакансий. Скор
+    пересчитывает refresh_scores
+
+    Args:
+        db: SQLAlchemy сессия
+        company_ids: ID компаний, у которых добавились или удалились вакансии
+        added: списки навыков добавленных вакансий
+        removed: списки навыков удалённых вакансий
+    """
+    company_ids = set(company_ids)
+    sync_companies(db, company_ids)
+    update_skill_weights(db, added=added, removed=removed, company_ids=company_ids)
+    index_pending_vacancies(db)
+
+
+def register_new_companies(db: Session, companies: list[Company]) -> None:
+    """
+    Учесть в статистике только что созданные компании (без commit)
+    """
+    if not companies:
+        return
+
+    stats = db.get(ScoringStats, 1)
+    if stats is None:
+        # Компании уже в сессии и попадут в пересборку
+        rebuild_stats(db)
+        return
+
+    deltas: dict[tuple[str, int], int] = defaultdict(int)
+    for company in companies:
+        deltas[(VACANCY_COMPONENT, company.vacancy_count or 0)] += 1
+        deltas[(SKILLS_COMPONENT, _skills_count(company.main_skills))] += 1
+        stats.total_vacancies += company.vacancy_count or 0
+        stats.total_skills += _skills_count(company.main_skills)
+    stats.companies_count += len(companies)
+
+    db.flush()
+    _bump_histogram(db, deltas)
+    db.flush()
+
+
+def refresh_scores(db: Session, company_ids: Iterable[int]) -> int:
+    """
+    Пересчитать скор после изменений
+
+    Если нормировки сдвинулись или изменилась программа "ПроКомпетенции" -
+    пересчёт всех компаний одним батчем, иначе - только затронутых компаний.
+
+    Args:
+        db: SQLAlchemy сессия
+        company_ids: ID затронутых компаний
+
+    Returns:
+        Количество пересчитанных компаний
+    """
+    stats = get_stats(db)
+    max_vacancy_count = _max_value(db, VACANCY_COMPONENT)
+    max_skills_possible = _max_value(db, SKILLS_COMPONENT)
+    max_skill_weight = _max_skill_weight(db)
+
+    normalizers_shifted = (
+        max_vacancy_count != stats.max_vacancy_count
+        or abs(max_skill_weight - (stats.max_skill_weight or 0.0)) > 1e-9
+    )
+    if normalizers_shifted:
+        logger.info(
+            f"Нормировки сдвинулись: vacancies {stats.max_vacancy_count} -> {max_vacancy_count}, "
+            f"skill weight {stats.max_skill_weight} -> {max_skill_weight}. Полный пересчёт"
+        )
+        stats.max_vacancy_count = max_vacancy_count
+        stats.max_skill_weight = max_skill_weight
+    stats.max_skills_possible = max_skills_possible
+
+    program = load_program_skills()
+    version = program_version(program)
+    if version != stats.curriculum_version:
+        logger.info("Изменилась программа ПроКомпетенции. Пересчёт соответствия всех компаний")
+        refresh_curriculum_scores(db, program=program)
+        stats.curriculum_version = version
+        normalizers_shifted = True
+
+    rescored = rescore_companies(
+        db,
+        None if normalizers_shifted else set(company_ids),
+        max_vacancy_count=max_vacancy_count,
+        max_skill_weight=max_skill_weight,
+    )
+    bump_generation_sync(db)
+    db.commit()
+    return rescored
+
+
+def rescore_all(db: Session) -> int:
+    """
+    Полный пересчёт скоринга: статистика, IDF и взвешенные суммы навыков,
+    соответствие программе и скор всех компаний
+
+    Args:
+        db: SQLAlchemy сессия
+
+    Returns:
+        Количество пересчитанных компаний
+    """
+    stats = rebuild_stats(db)
+    rebuild_skill_weights(db)
+
+    program = load_program_skills()
+    refresh_curriculum_scores(db, program=program)
+    stats.curriculum_version = program_version(program)
+    stats.max_skill_weight = _max_skill_weight(db)
+
+    return rescore_companies(
+        db,
+        max_vacancy_count=stats.max_vacancy_count,
+        max_skill_weight=stats.max_skill_weight,
+    )
+
+
+def add_vacancies(db: Session, company_id: int, items: list[dict]) -> list[Vacancy]:
+    """
+    Добавить вакансии компании с инкрементальным обновлением статистики и скора
+
+    Args:
+        db: SQLAlchemy сессия
+        company_id: ID компании
+        items: вакансии в формате парсеров (position, main_skills, vacancy_url, description)
+
+    Returns:
+        Созданные вакансии
+
+    Raises:
+        ValueError: если компания не найдена
+    """
+    if not db.get(Company, company_id):
+        raise ValueError(f"Компания с ID {company_id} не найдена")
+
+    vacancies = [
+        Vacancy(
+            company_id=company_id,
+            position=item.get("position", "Не указана"),
+            skills=item.get("main_skills", []),
+            url=item.get("vacancy_url") or "",
+            description=item.get("description"),
+        )
+        for item in items
+    ]
+    db.add_all(vacancies)
+    db.flush()
+
+    apply_vacancy_changes(db, [company_id], added=[vacancy.skills for vacancy in vacancies])
+    refresh_scores(db, [company_id])
+    return vacancies
+
+
+def remove_vacancies(db: Session, vacancy_ids: Iterable[int]) -> int:
+    """
+    Удалить вакансии с инкрементальным обновлением статистики и скора
+
+    Args:
+        db: SQLAlchemy сессия
+        vacancy_ids: ID вакансий
+
+    Returns:
+        Количество удалённых вакансий
+    """
+    vacancy_ids = list(vacancy_ids)
+    removed_rows = db.query(Vacancy.company_id, Vacancy.skills).filter(Vacancy.id.in_(vacancy_ids)).all()
+    company_ids = {company_id for company_id, _ in removed_rows}
+    delete_vacancy_links(db, vacancy_ids)
+    removed = db.query(Vacancy).filter(Vacancy.id.in_(vacancy_ids)).delete(synchronize_session="fetch")
+    db.flush()
+
+    apply_vacancy_changes(db, company_ids, removed=[skills for _, skills in removed_rows])
+    refresh_scores(db, company_ids)
+    return removed
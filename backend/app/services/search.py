@@ -0,0 +1,153 @@
+"""
+Search Service - Полнотекстовый поиск по компаниям, вакансиям и письмам
+
+Индексы FTS5 (companies_fts, vacancies_fts, letters_fts) создаются миграцией
+full_text_search. companies_fts и letters_fts поддерживаются триггерами.
+Описания вакансий хранятся сжатыми, а распаковывает их функция zstd_text,
+которая есть только у соединений приложения. Поэтому триггеры на vacancies
+лишь ставят строку в очередь vacancies_fts_queue, а в индекс её переносит
+index_pending_vacancies в пути записи приложения. Запрос пользователя не
+передаётся в MATCH как есть: слова выделяются и экранируются, чтобы
+операторы FTS5 (AND, NEAR, кавычки, "-") в тексте не ломали запрос.
+
+Ранжирование - встроенный rank (bm25) с ORDER BY rank LIMIT k; сниппеты
+строятся вторым запросом только для попавших в top-k строк.
+"""
+
+import re
+from typing import Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+# Слова короче - без поиска по префиксу (префиксные индексы FTS5 - на 2 и 3 символа)
+PREFIX_MIN_LENGTH = 2
+MAX_QUERY_TERMS = 8
+SNIPPET_TOKENS = 12
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+# Тип -> (FTS5-таблица, таблица-источник, колонка заголовка, колонка ID компании)
+SEARCH_SOURCES = {
+    "companies": ("companies_fts", "companies", "name", "id"),
+    "vacancies": ("vacancies_fts", "vacancies", "position", "company_id"),
+    "letters": ("letters_fts", "letters", "subject", "company_id"),
+}
+
+
+def index_pending_vacancies(db: Session) -> int:
+    """
+    Перенести изменения вакансий из vacancies_fts_queue в vacancies_fts (без commit)
+
+    Старые значения из очереди удаляются из индекса, текущие строки
+    вакансий добавляются. Вызывается после записи вакансий (в той же
+    транзакции) и при старте - для записей в обход приложения.
+
+    Args:
+        db: SQLAlchemy сессия
+
+    Returns:
+        Количество перенесённых вакансий
+    """
+    if db.execute(text("SELECT 1 FROM vacancies_fts_queue LIMIT 1")).first() is None:
+        return 0
+    db.execute(text(
+        "INSERT INTO vacancies_fts (vacancies_fts, rowid, position, description) "
+        "SELECT 'delete', vacancy_id, position, zstd_text(description_zst) FROM vacancies_fts_queue WHERE indexed"
+    ))
+    db.execute(text(
+        "INSERT INTO vacancies_fts (rowid, position, description) "
+        "SELECT v.id, v.position, zstd_text(v.description_zst) "
+        "FROM vacancies_fts_queue q JOIN vacancies v ON v.id = q.vacancy_id"
+    ))
+    return db.execute(text("DELETE FROM vacancies_fts_queue")).rowcount
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Выражение MATCH из пользовательской строки: все слова (AND), слова от
+    PREFIX_MIN_LENGTH символов - по префиксу
+
+    Returns:
+        Выражение FTS5 или None, если в строке нет слов
+    """
+    terms = _TERM.findall(query.lower())[:MAX_QUERY_TERMS]
+    return " ".join(
+        f'"{term}"*' if len(term) >= PREFIX_MIN_LENGTH else f'"{term}"'
+        for term in terms
+    ) or None
+
+
+async def _search_source(db: AsyncSession, source: tuple, match: str, limit: int) -> list[tuple]:
+    """Top-limit строк источника: [((id, заголовок, ID компании, сниппет), rank)]"""
+    fts_table, table, title_column, company_column = source
+    top = (await db.execute(
+        text(f"SELECT rowid, rank FROM {fts_table} WHERE {fts_table} MATCH :match "
+             f"ORDER BY rank LIMIT :limit"),
+        {"match": match, "limit": limit},
+    )).all()
+    if not top:
+        return []
+
+    details = (await db.execute(
+        text(
+            f"SELECT f.rowid, t.{title_column}, t.{company_column}, "
+            f"snippet({fts_table}, -1, '<b>', '</b>', '…', {SNIPPET_TOKENS}) "
+            f"FROM {fts_table} f JOIN {table} t ON t.id = f.rowid "
+            f"WHERE {fts_table} MATCH :match AND f.rowid IN :ids"
+        ).bindparams(bindparam("ids", expanding=True)),
+        {"match": match, "ids": [row_id for row_id, _ in top]},
+    )).all()
+    by_id = {row[0]: row for row in details}
+    return [(by_id[row_id], rank) for row_id, rank in top if row_id in by_id]
+
+
+async def search(
+        db: AsyncSession,
+        query: str,
+        types: Optional[list[str]] = None,
+        limit: int = 20,
+) -> dict[str, list[dict]]:
+    """
+    Полнотекстовый поиск
+
+    Args:
+        db: асинхронная SQLAlchemy сессия
+        query: строка поиска
+        types: где искать (companies, vacancies, letters), по умолчанию везде
+        limit: сколько результатов каждого типа вернуть
+
+    Returns:
+        Тип -> результаты (type, id, company_id, title, snippet, rank) по убыванию релевантности
+
+    Raises:
+        ValueError: если тип неизвестен или в запросе нет слов
+    """
+    types = types or list(SEARCH_SOURCES)
+    unknown = [name for name in types if name not in SEARCH_SOURCES]
+    if unknown:
+        raise ValueError(
+            f"Недопустимый тип поиска: {', '.join(unknown)}. Разрешены: {', '.join(SEARCH_SOURCES)}"
+        )
+    match = build_match_query(query)
+    if match is None:
+        raise ValueError("Пустой поисковый запрос")
+
+    results = {}
+    for name in dict.fromkeys(types):
+        rows = await _search_source(db, SEARCH_SOURCES[name], match, limit)
+        results[name] = [
+            {
+                "type": name,
+                "id": row_id,
+                "company_id": company_id,
+                "title": title,
+                "snippet": snippet or "",
+                # bm25 в FTS5 отрицательный: меньше - релевантнее
+                "rank": -rank,
+            }
+            for (row_id, title, company_id, snippet), rank in rows
+        ]
+    return results
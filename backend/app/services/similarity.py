@@ -0,0 +1,259 @@
+"""
+Similarity Service - Похожие компании по стеку (MinHash + LSH)
+
+Для каждой компании хранится MinHash-подпись набора навыков (Company.minhash)
+и хэши её полос (company_lsh_bands). Кандидаты в похожие - компании, у которых
+совпала хотя бы одна полоса: поиск по индексу (band, bucket), без попарного
+сравнения всей таблицы. Кандидаты ранжируются по оценке Жаккара - доле
+совпавших позиций подписи.
+
+Точность/полнота настраиваются:
+- LSH_BANDS x LSH_ROWS = MINHASH_PERMUTATIONS: порог похожести, с которого
+  пара почти наверняка станет кандидатом, примерно (1 / LSH_BANDS) ** (1 / LSH_ROWS);
+  больше полос - выше полнота, больше строк в полосе - выше точность.
+  По умолчанию 16 x 8: порог ~0.71, пара с Жаккаром 0.3 становится кандидатом
+  с вероятностью ~0.1% (при 64 x 2 - почти всегда, и кандидатами оказывается
+  заметная часть таблицы);
+- min_band_hits в запросе: сколько полос должно совпасть (выше - точнее).
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+from typing import Iterable, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.models import Company, CompanyLshBand
+from app.services.curriculum import normalize_skill
+
+load_dotenv()
+
+MINHASH_PERMUTATIONS = int(os.getenv("MINHASH_PERMUTATIONS", "128"))
+LSH_BANDS = int(os.getenv("LSH_BANDS", "16"))
+if LSH_BANDS <= 0 or MINHASH_PERMUTATIONS % LSH_BANDS:
+    raise ValueError("MINHASH_PERMUTATIONS должно делиться на LSH_BANDS")
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+
+# Сколько кандидатов (с наибольшим числом совпавших полос) сравнивать по подписи
+LSH_MAX_CANDIDATES = int(os.getenv("LSH_MAX_CANDIDATES", "1000"))
+
+# Компаний в одном батче при расчёте подписей
+SIGNATURE_CHUNK = 2000
+
+EMPTY_SLOT = np.uint32(0xFFFFFFFF)
+
+# Хэш-функции h_i(x) = старшие 32 бита (a_i * x + b_i) mod 2^64, a_i нечётные
+_rng = np.random.default_rng(20240117)
+_A = _rng.integers(1, 2 ** 63, MINHASH_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2 ** 63, MINHASH_PERMUTATIONS, dtype=np.uint64)
+# Множители для свёртки LSH_ROWS значений полосы в один 64-битный хэш
+_BAND_MIX = _rng.integers(1, 2 ** 63, LSH_ROWS, dtype=np.uint64) | np.uint64(1)
+
+
+@lru_cache(maxsize=65536)
+def skill_hash(skill: str) -> int:
+    """Стабильный 64-битный хэш нормализованного навыка"""
+    return int.from_bytes(hashlib.blake2b(skill.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _skill_hashes(skills) -> list[int]:
+    if isinstance(skills, str):
+        skills = [skills]
+    names = {normalize_skill(skill) for skill in skills or []}
+    return [skill_hash(name) for name in names if name]
+
+
+def minhash_signatures(skill_lists: list) -> np.ndarray:
+    """
+    MinHash-подписи наборов навыков
+
+    Args:
+        skill_lists: навыки каждой компании
+
+    Returns:
+        Массив (компании x MINHASH_PERMUTATIONS) uint32; у пустого набора все позиции EMPTY_SLOT
+    """
+    signatures = np.full((len(skill_lists), MINHASH_PERMUTATIONS), EMPTY_SLOT, dtype=np.uint32)
+
+    for start in range(0, len(skill_lists), SIGNATURE_CHUNK):
+        rows: list[int] = []
+        hashes: list[int] = []
+        for row, skills in enumerate(skill_lists[start:start + SIGNATURE_CHUNK]):
+            for value in _skill_hashes(skills):
+                rows.append(row)
+                hashes.append(value)
+        if not hashes:
+            continue
+
+        values = np.array(hashes, dtype=np.uint64)[:, None]
+        slots = ((_A[None, :] * values + _B[None, :]) >> np.uint64(32)).astype(np.uint32)
+
+        rows_array = np.array(rows)
+        starts = np.flatnonzero(np.r_[True, rows_array[1:] != rows_array[:-1]])
+        signatures[start + rows_array[starts]] = np.minimum.reduceat(slots, starts, axis=0)
+
+    return signatures
+
+
+def band_buckets(signatures: np.ndarray) -> np.ndarray:
+    """Хэши полос подписей: массив (компании x LSH_BANDS) int64"""
+    bands = signatures.reshape(len(signatures), LSH_BANDS, LSH_ROWS).astype(np.uint64)
+    return (bands * _BAND_MIX[None, None, :]).sum(axis=2, dtype=np.uint64).view(np.int64)
+
+
+def estimate_similarity(signature: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """Оценка коэффициента Жаккара: доля совпавших позиций подписи"""
+    return (candidates == signature[None, :]).mean(axis=1)
+
+
+def _decode(signature: Optional[bytes]) -> Optional[np.ndarray]:
+    if not signature or len(signature) != MINHASH_PERMUTATIONS * 4:
+        return None
+    return np.frombuffer(signature, dtype=np.uint32)
+
+
+def _config_matches(db: Session) -> bool:
+    """Подписи и полосы в БД посчитаны при текущих MINHASH_PERMUTATIONS / LSH_BANDS"""
+    signature = db.query(Company.minhash).filter(Company.minhash.isnot(None)).limit(1).scalar()
+    if signature is None:
+        return True
+    max_band = db.query(func.max(CompanyLshBand.band)).scalar()
+    return _decode(signature) is not None and (max_band is None or max_band == LSH_BANDS - 1)
+
+
+def refresh_minhash(db: Session, company_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Пересчитать MinHash-подписи и LSH-полосы компаний по main_skills (без commit)
+
+    Если параметры MinHash/LSH изменились с прошлого расчёта, пересчитываются все компании.
+
+    Args:
+        db: SQLAlchemy сессия
+        company_ids: ID компаний (по умолчанию все)
+
+    Returns:
+        Количество пересчитанных компаний
+    """
+    if company_ids is not None and not _config_matches(db):
+        company_ids = None
+
+    query = db.query(Company.id, Company.main_skills)
+    if company_ids is not None:
+        company_ids = list(set(company_ids))
+        query = query.filter(Company.id.in_(company_ids))
+    rows = query.all()
+
+    if company_ids is None:
+        db.execute(delete(CompanyLshBand))
+    else:
+        db.execute(delete(CompanyLshBand).where(CompanyLshBand.company_id.in_(company_ids)))
+    if not rows:
+        db.flush()
+        return 0
+
+    signatures = minhash_signatures([skills for _, skills in rows])
+    buckets = band_buckets(signatures)
+    non_empty = (signatures != EMPTY_SLOT).any(axis=1)
+
+    db.execute(
+        update(Company),
+        [
+            {"id": company_id, "minhash": signature.tobytes() if has_skills else None}
+            for (company_id, _), signature, has_skills in zip(rows, signatures, non_empty)
+        ],
+    )
+    bands = [
+        {"company_id": company_id, "band": band, "bucket": bucket}
+        for (company_id, _), company_buckets, has_skills in zip(rows, buckets.tolist(), non_empty)
+        if has_skills
+        for band, bucket in enumerate(company_buckets)
+    ]
+    if bands:
+        db.execute(insert(CompanyLshBand), bands)
+    db.flush()
+    return len(rows)
+
+
+def ensure_minhash(db: Session) -> int:
+    """
+    Посчитать подписи и полосы всех компаний, если их нет (новая БД или
+    миграция их сбросила) или они посчитаны при других параметрах (без commit)
+
+    Returns:
+        Количество пересчитанных компаний (0 - подписи актуальны)
+    """
+    computed = db.query(Company.id).filter(Company.minhash.isnot(None)).limit(1).scalar() is not None
+    if computed and _config_matches(db):
+        return 0
+    return refresh_minhash(db)
+
+
+async def find_similar(
+        db: AsyncSession,
+        company_id: int,
+        k: int = 10,
+        min_band_hits: int = 1,
+) -> tuple[list[tuple[Company, float]], int]:
+    """
+    Похожие по стеку компании
+
+    Args:
+        db: асинхронная SQLAlchemy сессия
+        company_id: ID компании
+        k: сколько вернуть
+        min_band_hits: минимум совпавших полос у кандидата (1..LSH_BANDS)
+
+    Returns:
+        Кортеж (список (компания, оценка Жаккара) по убыванию оценки, число кандидатов)
+
+    Raises:
+        ValueError: если компания не найдена
+    """
+    row = (await db.execute(select(Company.id, Company.minhash).where(Company.id == company_id))).first()
+    if row is None:
+        raise ValueError(f"Компания с ID {company_id} не найдена")
+    signature = _decode(row.minhash)
+    if signature is None:
+        return [], 0
+
+    buckets = band_buckets(signature[None, :])[0].tolist()
+    hits = func.count().label("hits")
+    candidates = (await db.execute(
+        select(CompanyLshBand.company_id, hits)
+        .where(or_(*(
+            and_(CompanyLshBand.band == band, CompanyLshBand.bucket == bucket)
+            for band, bucket in enumerate(buckets)
+        )))
+        .where(CompanyLshBand.company_id != company_id)
+        .group_by(CompanyLshBand.company_id)
+        .having(hits >= min_band_hits)
+        .order_by(hits.desc(), CompanyLshBand.company_id)
+        .limit(LSH_MAX_CANDIDATES)
+    )).all()
+    if not candidates:
+        return [], 0
+
+    candidate_rows = (await db.execute(
+        select(Company.id, Company.minhash).where(Company.id.in_([candidate for candidate, _ in candidates]))
+    )).all()
+    decoded = [(candidate_id, _decode(minhash)) for candidate_id, minhash in candidate_rows]
+    decoded = [(candidate_id, vector) for candidate_id, vector in decoded if vector is not None]
+    if not decoded:
+        return [], len(candidates)
+    ids = [candidate_id for candidate_id, _ in decoded]
+    matrix = np.stack([vector for _, vector in decoded])
+    similarity = estimate_similarity(signature, matrix)
+
+    order = np.lexsort((np.array(ids), -similarity))[:k]
+    top = [(ids[i], float(similarity[i])) for i in order]
+
+    companies = {
+        company.id: company
+        for company in (await db.execute(select(Company).where(Company.id.in_([i for i, _ in top])))).scalars()
+    }
+    return [(companies[i], score) for i, score in top if i in companies], len(candidates)
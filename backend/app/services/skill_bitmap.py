@@ -0,0 +1,212 @@
+"""
+Skill Bitmap Service - Инвертированный индекс навыков в памяти процесса
+
+Навык -> сжатая битовая карта (Roaring bitmap) ID компаний с этим навыком.
+AND/OR/NOT - операции над битовыми картами, ранжирование по Жаккару -
+подсчёт пересечений через np.bincount по спискам ID. Индекс строится при
+старте API из companies.main_skills и перед каждым запросом догоняет записи
+(в том числе импорт из другого процесса) по журналу row_changes: изменённые
+после запомненного номера компании перечитываются, удалённые - убираются.
+"""
+
+import asyncio
+import sys
+from typing import Iterable, Optional
+
+import numpy as np
+from pyroaring import BitMap
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import ChangeSequence, Company, RowChange
+from app.services.curriculum import normalize_skill
+
+
+def _normalized(skills) -> frozenset[str]:
+    if isinstance(skills, str):
+        skills = [skills]
+    return frozenset(name for name in (normalize_skill(skill) for skill in skills or []) if name)
+
+
+class SkillBitmapIndex:
+    """Навык -> BitMap ID компаний"""
+
+    def __init__(self):
+        self._postings: dict[str, BitMap] = {}
+        # Навыки компании: кортеж ссылок на ключи _postings (дешевле frozenset)
+        self._company_skills: dict[int, tuple[str, ...]] = {}
+        self._companies = BitMap()
+        # Число навыков компании по её ID (знаменатель коэффициента Жаккара)
+        self._sizes = np.zeros(0, dtype=np.int64)
+        # Номер change_sequence, до которого индекс догнал изменения
+        self._seq: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    def load(self, rows: Iterable[tuple[int, object]]) -> None:
+        """Построить индекс заново по парам (ID компании, навыки)"""
+        postings: dict[str, list[int]] = {}
+        company_skills: dict[int, tuple[str, ...]] = {}
+        for company_id, skills in rows:
+            names = tuple(sys.intern(skill) for skill in _normalized(skills))
+            company_skills[company_id] = names
+            for skill in names:
+                postings.setdefault(skill, []).append(company_id)
+
+        self._postings = {skill: BitMap(ids) for skill, ids in postings.items()}
+        self._company_skills = company_skills
+        self._companies = BitMap(company_skills.keys())
+        self._sizes = np.zeros(max(company_skills, default=0) + 1, dtype=np.int64)
+        for company_id, names in company_skills.items():
+            self._sizes[company_id] = len(names)
+
+    def set_company(self, company_id: int, skills) -> None:
+        """Заменить навыки компании в индексе"""
+        new = _normalized(skills)
+        old = frozenset(self._company_skills.get(company_id, ()))
+        for skill in old - new:
+            posting = self._postings[skill]
+            posting.discard(company_id)
+            if not posting:
+                del self._postings[skill]
+        for skill in new - old:
+            self._postings.setdefault(sys.intern(skill), BitMap()).add(company_id)
+        self._company_skills[company_id] = tuple(sys.intern(skill) for skill in new)
+        self._companies.add(company_id)
+
+        if company_id >= len(self._sizes):
+            grown = np.zeros(max(company_id + 1, 2 * len(self._sizes)), dtype=np.int64)
+            grown[:len(self._sizes)] = self._sizes
+            self._sizes = grown
+        self._sizes[company_id] = len(new)
+
+    def remove_company(self, company_id: int) -> None:
+        self.set_company(company_id, [])
+        self._company_skills.pop(company_id, None)
+        self._companies.discard(company_id)
+
+    async def refresh(self, db: AsyncSession) -> int:
+        """
+        Догнать изменения companies с прошлого обновления (при первом вызове
+        или после пересоздания БД - загрузить всё)
+
+        Номер читается до строк: запись, закоммиченная между чтениями, попадёт
+        и в следующее обновление - перечитать компанию повторно безопасно.
+
+        Args:
+            db: асинхронная SQLAlchemy сессия
+
+        Returns:
+            Количество перечитанных и удалённых компаний
+        """
+        async with self._lock:
+            current = await db.scalar(select(ChangeSequence.seq).where(ChangeSequence.id == 1)) or 0
+            if self._seq is not None and current == self._seq:
+                return 0
+
+            query = select(Company.id, Company.main_skills)
+            if self._seq is None or current < self._seq:
+                rows = (await db.execute(query)).all()
+                self.load(rows)
+                self._seq = current
+                return len(rows)
+
+            changes = (await db.execute(
+                select(RowChange.row_id, RowChange.deleted)
+                .where(RowChange.entity == "companies", RowChange.seq > self._seq)
+            )).all()
+            deleted = [row_id for row_id, is_deleted in changes if is_deleted]
+            changed = [row_id for row_id, is_deleted in changes if not is_deleted]
+            for company_id in deleted:
+                self.remove_company(company_id)
+            rows = (await db.execute(query.where(Company.id.in_(changed)))).all() if changed else []
+            for company_id, skills in rows:
+                self.set_company(company_id, skills)
+            self._seq = current
+            return len(deleted) + len(rows)
+
+    def _union(self, skills: Iterable[str]) -> BitMap:
+        postings = [self._postings[skill] for skill in skills if skill in self._postings]
+        return BitMap.union(*postings) if postings else BitMap()
+
+    def match(
+            self,
+            all_of: Iterable[str] = (),
+            any_of: Iterable[str] = (),
+            none_of: Iterable[str] = (),
+    ) -> BitMap:
+        """
+        Компании, у которых есть все навыки all_of, хотя бы один из any_of
+        и нет ни одного из none_of (пустой список - условие не накладывается)
+
+        Returns:
+            BitMap ID компаний
+        """
+        all_of, any_of, none_of = _normalized(all_of), _normalized(any_of), _normalized(none_of)
+
+        if all_of:
+            postings = sorted((self._postings.get(skill, BitMap()) for skill in all_of), key=len)
+            result = BitMap.intersection(*postings)
+        else:
+            result = BitMap(self._companies)
+        if any_of:
+            result &= self._union(any_of)
+        if none_of:
+            result -= self._union(none_of)
+        return result
+
+    def top_similar(self, skills: Iterable[str], candidates: BitMap, k: int) -> list[tuple[int, float]]:
+        """
+        Top-k кандидатов по коэффициенту Жаккара |A ∩ B| / |A ∪ B| с набором skills
+
+        Args:
+            skills: искомый стек
+            candidates: ID компаний, среди которых ранжировать
+            k: сколько вернуть
+
+        Returns:
+            Список (ID компании, коэффициент), по убыванию коэффициента, при равенстве - по ID
+        """
+        query = _normalized(skills)
+        if not candidates or k <= 0:
+            return []
+
+        ids = np.frombuffer(candidates.to_array(), dtype=np.uint32).astype(np.int64)
+        hits = [np.frombuffer((self._postings[skill] & candidates).to_array(), dtype=np.uint32)
+                for skill in query if skill in self._postings]
+        intersections = (
+            np.bincount(np.concatenate(hits).astype(np.int64), minlength=int(ids.max()) + 1)[ids]
+            if hits else np.zeros(len(ids), dtype=np.int64)
+        )
+        unions = len(query) + self._sizes[ids] - intersections
+        with np.errstate(divide="ignore", invalid="ignore"):
+            similarity = np.where(unions > 0, intersections / unions, 0.0)
+
+        order = np.lexsort((ids, -similarity))[:k]
+        return [(int(ids[i]), float(similarity[i])) for i in order]
+
+    def memory_report(self) -> dict:
+        """
+        Оценка памяти индекса
+
+        Returns:
+            Словарь: companies, skills, bitmap_bytes (сериализованные битовые карты),
+            company_sets_bytes (наборы навыков компаний), bytes_per_100k_companies
+        """
+        bitmap_bytes = sum(len(posting.serialize()) for posting in self._postings.values())
+        company_sets_bytes = self._sizes.nbytes + sys.getsizeof(self._company_skills) + sum(
+            sys.getsizeof(skills) for skills in self._company_skills.values()
+        )
+        companies = len(self._company_skills)
+        bitmap_bytes += len(self._companies.serialize())
+        total = bitmap_bytes + company_sets_bytes
+        return {
+            "companies": companies,
+            "skills": len(self._postings),
+            "bitmap_bytes": bitmap_bytes,
+            "company_sets_bytes": company_sets_bytes,
+            "bytes_per_100k_companies": round(total / companies * 100_000) if companies else 0,
+        }
+
+
+# Индекс процесса API
+skill_index = SkillBitmapIndex()
@@ -0,0 +1,150 @@
+"""
+Skill Links Service - Реляционный индекс навыков
+
+JSON-массивы Company.main_skills и Vacancy.skills дублируются в таблицы
+skills / company_skills / vacancy_skills, чтобы запросы вида "компании,
+которым нужны Python и Kafka" выполнялись индексными соединениями в БД.
+Связи затронутых компаний пересобираются вместе с main_skills (sync_companies).
+"""
+
+from typing import Iterable
+
+from sqlalchemy import and_, delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.models import Company, CompanySkill, Skill, Vacancy, VacancySkill
+from app.services.curriculum import normalize_skill
+
+SKILL_MODES = ("and", "or")
+
+# Ограничение на число ID в одном IN (...) при пересборке всех связей
+BACKFILL_CHUNK = 500
+
+
+def _normalized(skills) -> list[str]:
+    if isinstance(skills, str):
+        skills = [skills]
+    names = (normalize_skill(skill) for skill in skills or [])
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def get_skill_ids(db: Session, names: Iterable[str]) -> dict[str, int]:
+    """
+    ID навыков по нормализованным названиям, недостающие создаются (без commit)
+
+    Returns:
+        Словарь название -> ID
+    """
+    names = set(names)
+    if not names:
+        return {}
+
+    ids = dict(db.query(Skill.name, Skill.id).filter(Skill.name.in_(names)).all())
+    missing = names - ids.keys()
+    if missing:
+        db.execute(insert(Skill), [{"name": name} for name in sorted(missing)])
+        ids.update(db.query(Skill.name, Skill.id).filter(Skill.name.in_(missing)).all())
+    return ids
+
+
+def sync_skill_links(db: Session, company_ids: Iterable[int]) -> None:
+    """
+    Пересобрать связи навыков компаний и их вакансий по JSON-полям (без commit)
+
+    Args:
+        db: SQLAlchemy сессия
+        company_ids: ID компаний
+    """
+    company_ids = list(set(company_ids))
+    if not company_ids:
+        return
+
+    company_skills = {
+        company_id: _normalized(skills)
+        for company_id, skills in db.query(Company.id, Company.main_skills).filter(Company.id.in_(company_ids))
+    }
+    vacancy_skills = {
+        vacancy_id: _normalized(skills)
+        for vacancy_id, skills in db.query(Vacancy.id, Vacancy.skills).filter(Vacancy.company_id.in_(company_ids))
+    }
+
+    skill_ids = get_skill_ids(
+        db,
+        {name for names in company_skills.values() for name in names}
+        | {name for names in vacancy_skills.values() for name in names},
+    )
+
+    db.execute(delete(CompanySkill).where(CompanySkill.company_id.in_(company_ids)))
+    if vacancy_skills:
+        db.execute(delete(VacancySkill).where(VacancySkill.vacancy_id.in_(list(vacancy_skills))))
+
+    company_links = [
+        {"company_id": company_id, "skill_id": skill_ids[name]}
+        for company_id, names in company_skills.items() for name in names
+    ]
+    vacancy_links = [
+        {"vacancy_id": vacancy_id, "skill_id": skill_ids[name]}
+        for vacancy_id, names in vacancy_skills.items() for name in names
+    ]
+    if company_links:
+        db.execute(insert(CompanySkill), company_links)
+    if vacancy_links:
+        db.execute(insert(VacancySkill), vacancy_links)
+    db.flush()
+
+
+def delete_vacancy_links(db: Session, vacancy_ids: Iterable[int]) -> None:
+    """Удалить связи навыков удаляемых вакансий (без commit)"""
+    db.execute(delete(VacancySkill).where(VacancySkill.vacancy_id.in_(list(vacancy_ids))))
+
+
+def rebuild_skill_links(db: Session) -> None:
+    """Пересобрать связи всех компаний и вакансий по JSON-полям (без commit)"""
+    db.execute(delete(CompanySkill))
+    db.execute(delete(VacancySkill))
+    company_ids = [company_id for (company_id,) in db.query(Company.id).order_by(Company.id)]
+    for start in range(0, len(company_ids), BACKFILL_CHUNK):
+        sync_skill_links(db, company_ids[start:start + BACKFILL_CHUNK])
+
+
+def _with_skills(id_column, link_id_column, link_skill_column, skills: Iterable[str], mode: str):
+    if mode not in SKILL_MODES:
+        raise ValueError(f"Недопустимый режим skills_mode: {mode}. Разрешены: {', '.join(SKILL_MODES)}")
+    names = _normalized(list(skills))
+    if not names:
+        raise ValueError("Не указаны навыки")
+
+    def with_skill(*skill_names: str):
+        return (
+            select(link_id_column)
+            .join(Skill, Skill.id == link_skill_column)
+            .where(Skill.name.in_(skill_names))
+        )
+
+    if mode == "or":
+        return id_column.in_(with_skill(*names))
+    return and_(*(id_column.in_(with_skill(name)) for name in names))
+
+
+def companies_with_skills(skills: Iterable[str], mode: str = "and"):
+    """
+    Условие на Company.id: у компании есть все (and) или хотя бы один (or) из навыков
+
+    Args:
+        skills: названия навыков (нормализуются)
+        mode: and или or
+
+    Returns:
+        SQL-выражение для .where(...)
+
+    Raises:
+        ValueError: если режим неизвестен или список навыков пуст
+    """
+    return _with_skills(Company.id, CompanySkill.company_id, CompanySkill.skill_id, skills, mode)
+
+
+def vacancies_with_skills(skills: Iterable[str], mode: str = "and"):
+    """
+    Условие на Vacancy.id по навыкам вакансии (индекс vacancy_skills), см. companies_with_skills
+    """
+    return _with_skills(Vacancy.id, VacancySkill.vacancy_id, VacancySkill.skill_id, skills, mode)
@@ -0,0 +1,221 @@
+"""
+Skill Weights Service - IDF-веса навыков и взвешенная сумма навыков компаний
+
+Документная частота навыка (в скольких вакансиях он встречается) хранится
+в skill_weights и обновляется инкрементально по добавленным/удалённым
+вакансиям. Взвешенная сумма навыков компаний считается одним умножением
+разреженной матрицы компании x навыки на вектор IDF.
+
+При инкрементальном обновлении суммы пересчитываются только у компаний,
+чьи вакансии изменились: у остальных они остаются посчитанными по IDF
+на момент их последнего пересчёта. Сдвиг IDF от изменения числа вакансий
+мал, а сумма всех компаний пересчитывается в rebuild_skill_weights
+(полный пересчёт скоринга).
+"""
+
+from collections import Counter
+from typing import Iterable, Optional
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.models import Company, Vacancy, ScoringStats, SkillWeight
+
+
+def compute_idf(document_frequency, documents: int) -> np.ndarray:
+    """Сглаженный IDF: log((1 + N) / (1 + df)) + 1"""
+    df = np.asarray(document_frequency, dtype=np.float64)
+    return np.log((1.0 + documents) / (1.0 + df)) + 1.0
+
+
+def _as_skill_list(skills) -> list[str]:
+    if not skills:
+        return []
+    if isinstance(skills, str):
+        return [skills]
+    return list(skills)
+
+
+def _get_stats_row(db: Session) -> ScoringStats:
+    stats = db.get(ScoringStats, 1)
+    if stats is None:
+        stats = ScoringStats(id=1)
+        db.add(stats)
+    return stats
+
+
+def _apply_frequencies(db: Session, deltas: Counter, documents_delta: int) -> None:
+    """Применить изменения df и пересчитать IDF всех навыков словаря"""
+    stats = _get_stats_row(db)
+    stats.skill_documents = max((stats.skill_documents or 0) + documents_delta, 0)
+
+    existing = {row.skill: row for row in db.query(SkillWeight)}
+    for skill, delta in deltas.items():
+        row = existing.get(skill)
+        if row is None:
+            row = SkillWeight(skill=skill, document_frequency=0, idf=1.0)
+            db.add(row)
+            existing[skill] = row
+        row.document_frequency = max(row.document_frequency + delta, 0)
+    db.flush()
+
+    skills = list(existing)
+    idf = compute_idf([existing[skill].document_frequency for skill in skills], stats.skill_documents)
+    for skill, weight in zip(skills, idf.tolist()):
+        existing[skill].idf = weight
+    db.flush()
+
+
+def rebuild_skill_weights(db: Session) -> int:
+    """
+    Пересчитать документные частоты с нуля: один проход по Vacancy.skills
+
+    Args:
+        db: SQLAlchemy сессия
+
+    Returns:
+        Количество навыков в словаре
+    """
+    document_frequency: Counter = Counter()
+    documents = 0
+    for (skills,) in db.query(Vacancy.skills):
+        document_frequency.update(set(_as_skill_list(skills)))
+        documents += 1
+
+    db.query(SkillWeight).delete()
+    stats = _get_stats_row(db)
+    stats.skill_documents = 0
+    db.flush()
+
+    _apply_frequencies(db, document_frequency, documents)
+    refresh_company_skill_weights(db)
+    db.commit()
+    return len(document_frequency)
+
+
+def is_initialized(db: Session) -> bool:
+    stats = db.get(ScoringStats, 1)
+    return bool(stats and stats.skill_documents)
+
+
+def update_skill_weights(
+    db: Session,
+    added: Iterable = (),
+    removed: Iterable = (),
+    company_ids: Iterable[int] = (),
+) -> None:
+    """
+    Инкрементально обновить df по добавленным и удалённым вакансиям (без
+    прохода по всем вакансиям) и взвешенные суммы навыков затронутых
+    компаний (без commit)
+
+    Args:
+        db: SQLAlchemy сессия
+        added: списки навыков добавленных вакансий
+        removed: списки навыков удалённых вакансий
+        company_ids: ID компаний, чьи вакансии изменились
+    """
+    if not is_initialized(db):
+        # Новые вакансии уже в сессии и попадут в пересборку
+        rebuild_skill_weights(db)
+        return
+
+    deltas: Counter = Counter()
+    documents_delta = 0
+    for skills in added:
+        deltas.update(set(_as_skill_list(skills)))
+        documents_delta += 1
+    for skills in removed:
+        deltas.subtract(set(_as_skill_list(skills)))
+        documents_delta -= 1
+
+    if documents_delta or deltas:
+        _apply_frequencies(db, deltas, documents_delta)
+    refresh_company_skill_weights(db, company_ids)
+
+
+def load_skill_weights(db: Session) -> tuple[dict[str, int], np.ndarray, float]:
+    """
+    Загрузить словарь навыков и их IDF
+
+    Returns:
+        Кортеж (навык -> индекс столбца, вектор IDF, IDF для неизвестного навыка)
+    """
+    rows = db.query(SkillWeight.skill, SkillWeight.idf).all()
+    stats = db.get(ScoringStats, 1)
+    documents = stats.skill_documents if stats else 0
+
+    vocabulary = {skill: i for i, (skill, _) in enumerate(rows)}
+    idf = np.array([weight for _, weight in rows], dtype=np.float64)
+    unknown_idf = float(compute_idf([0], documents or 0)[0])
+    return vocabulary, idf, unknown_idf
+
+
+def weighted_skill_sums(
+    skill_lists: list,
+    vocabulary: dict[str, int],
+    idf: np.ndarray,
+    unknown_idf: float = 1.0,
+) -> np.ndarray:
+    """
+    Взвешенная сумма навыков для каждой компании: (компании x навыки) @ IDF
+
+    Args:
+        skill_lists: навыки каждой компании
+        vocabulary: навык -> индекс столбца
+        idf: вектор IDF по столбцам
+        unknown_idf: вес навыка, которого нет в словаре
+
+    Returns:
+        Массив сумм, по одной на компанию
+    """
+    vocabulary = dict(vocabulary)
+    weights = list(idf.tolist())
+
+    indptr = [0]
+    indices: list[int] = []
+    for skills in skill_lists:
+        for skill in set(_as_skill_list(skills)):
+            column = vocabulary.get(skill)
+            if column is None:
+                column = vocabulary[skill] = len(weights)
+                weights.append(unknown_idf)
+            indices.append(column)
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float64), indices, indptr),
+        shape=(len(skill_lists), len(weights)),
+    )
+    return matrix @ np.asarray(weights, dtype=np.float64)
+
+
+def refresh_company_skill_weights(db: Session, company_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Пересчитать Company.skills_weight одним батчем (без commit)
+
+    Args:
+        db: SQLAlchemy сессия
+        company_ids: ID компаний (по умолчанию все)
+
+    Returns:
+        Количество обновлённых компаний
+    """
+    query = db.query(Company.id, Company.main_skills)
+    if company_ids is not None:
+        query = query.filter(Company.id.in_(list(company_ids)))
+    rows = query.all()
+    if not rows:
+        return 0
+
+    vocabulary, idf, unknown_idf = load_skill_weights(db)
+    sums = weighted_skill_sums([skills for _, skills in rows], vocabulary, idf, unknown_idf)
+
+    db.execute(
+        update(Company),
+        [{"id": company_id, "skills_weight": weight} for (company_id, _), weight in zip(rows, sums.tolist())],
+    )
+    db.flush()
+    return len(rows)
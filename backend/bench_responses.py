@@ -0,0 +1,120 @@
+"""
+Бенчмарк конвейера ответов API: запросов в секунду и байт на передачу
+для /api/companies?limit=100 и деталей компании с сотнями вакансий
+
+Сравниваются:
+- стандартный путь (Pydantic-модели + JSON-кодировщик FastAPI), без сжатия;
+- быстрый путь (FAST_JSON_RESPONSES=1: колонки -> orjson) без сжатия, с gzip и brotli.
+
+Кэш ответов очищается перед каждым запросом: измеряется сборка ответа, а не кэш.
+Каждый вариант запускается в отдельном процессе (флаг читается при импорте)
+на временной синтетической БД.
+
+Запуск: python bench_responses.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+COMPANIES = 5000
+BIG_COMPANY_VACANCIES = 500
+REQUESTS = 300
+
+ENDPOINTS = ["/api/companies?limit=100", "/api/companies/1"]
+VARIANTS = [
+    ("стандартный, без сжатия", "0", "identity"),
+    ("быстрый, без сжатия", "1", "identity"),
+    ("быстрый + gzip", "1", "gzip"),
+    ("быстрый + brotli", "1", "br"),
+]
+
+
+def seed() -> None:
+    from app.core.database import SessionLocal, engine
+    from app.core.migrations import run_migrations
+    from app.models.models import Company, Vacancy
+    from sqlalchemy import insert
+
+    run_migrations(engine)
+    skills = ["Python", "SQL", "PostgreSQL", "Docker", "Kafka", "Kubernetes", "Go", "Java", "1С", "Linux"]
+    db = SessionLocal()
+    try:
+        db.execute(insert(Company), [
+            {
+                "name": f"Компания {i}",
+                "url": f"https://example.com/company/{i}",
+                "industry": "IT / Промышленность / Другое",
+                "score": (i * 37) % 100,
+                "vacancy_count": BIG_COMPANY_VACANCIES if i == 1 else i % 7,
+                "main_skills": skills[: 3 + i % 7],
+                "status": "new",
+            }
+            for i in range(1, COMPANIES + 1)
+        ])
+        db.execute(insert(Vacancy), [
+            {
+                "company_id": 1,
+                "position": f"Разработчик {i}",
+                "skills": skills[: 2 + i % 8],
+                "url": f"https://hh.ru/vacancy/{100000 + i}",
+            }
+            for i in range(BIG_COMPANY_VACANCIES)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def run(encoding: str) -> None:
+    from fastapi.testclient import TestClient
+
+    from app.services.response_cache import response_cache
+    from main import app
+
+    with TestClient(app) as client:
+        for path in ENDPOINTS:
+            headers = {"Accept-Encoding": encoding}
+            for _ in range(20):
+                response_cache.clear()
+                client.get(path, headers=headers)
+
+            started = time.perf_counter()
+            for _ in range(REQUESTS):
+                response_cache.clear()
+                response = client.get(path, headers=headers)
+            elapsed = time.perf_counter() - started
+
+            assert response.status_code == 200, response.text
+            print(f"{path}\t{REQUESTS / elapsed:.0f}\t{response.headers['content-length']}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        {"--seed": seed, "--run": lambda: run(sys.argv[2])}[sys.argv[1]]()
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(os.environ, DATABASE_PATH=os.path.join(tmp_dir, "bench.db"))
+        subprocess.run([sys.executable, __file__, "--seed"], env=env, check=True)
+
+        results = {}
+        for title, fast, encoding in VARIANTS:
+            output = subprocess.run(
+                [sys.executable, __file__, "--run", encoding],
+                env=dict(env, FAST_JSON_RESPONSES=fast), check=True, capture_output=True, text=True,
+            ).stdout
+            for line in output.splitlines():
+                if line.startswith("/api/"):
+                    path, rps, size = line.split("\t")
+                    results[(path, title)] = (float(rps), int(size))
+
+    for path in ENDPOINTS:
+        print(f"\n{path}")
+        base_rps, base_size = results[(path, VARIANTS[0][0])]
+        for title, _, _ in VARIANTS:
+            rps, size = results[(path, title)]
+            print(f"  {title:<26} {rps:>7.0f} запр/с ({rps / base_rps:.2f}x)   "
+                  f"{size:>8} байт ({size / base_size:.0%})")
@@ -0,0 +1,94 @@
+"""
+Бенчмарк инвертированного индекса навыков (app/services/skill_bitmap.py)
+Синтетические 100 тыс. компаний с навыками из реального распределения
+(main_skills компаний в БД) или, если БД пуста, по закону Ципфа
+
+Запуск: python bench_skill_bitmap.py
+"""
+
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.core.database import SessionLocal
+from app.models.models import Company
+from app.services.skill_bitmap import SkillBitmapIndex
+
+COMPANIES = 100_000
+QUERIES = 1000
+SEED = 42
+
+
+def load_skill_sets() -> list[list[str]]:
+    db = SessionLocal()
+    try:
+        return [skills for (skills,) in db.query(Company.main_skills) if skills]
+    except Exception:
+        return []
+    finally:
+        db.close()
+
+
+def synthetic_skill_sets(rng: np.random.Generator) -> list[list[str]]:
+    real = load_skill_sets()
+    if real:
+        picks = rng.integers(0, len(real), COMPANIES)
+        return [real[i] for i in picks]
+    vocabulary = [f"skill-{i}" for i in range(2000)]
+    sizes = rng.integers(3, 15, COMPANIES)
+    return [
+        [vocabulary[min(int(rank), len(vocabulary)) - 1] for rank in rng.zipf(1.3, size)]
+        for size in sizes
+    ]
+
+
+def measure(title: str, func, queries: list) -> None:
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        func(*query)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    print(f"{title:<28} медиана {statistics.median(latencies) * 1000:.3f} мс, "
+          f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.3f} мс")
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(SEED)
+    skill_sets = synthetic_skill_sets(rng)
+
+    print("=" * 80)
+    print(f"БЕНЧМАРК ИНДЕКСА НАВЫКОВ: {COMPANIES} компаний, {QUERIES} запросов")
+    print("=" * 80)
+
+    started = time.perf_counter()
+    index = SkillBitmapIndex()
+    index.load(enumerate(skill_sets, start=1))
+    build_seconds = time.perf_counter() - started
+
+    # Память - отдельным построением: tracemalloc замедляет аллокации
+    # и не видит память CRoaring (битовые карты считает memory_report)
+    tracemalloc.start()
+    measured = SkillBitmapIndex()
+    measured.load(enumerate(skill_sets, start=1))
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del measured
+
+    report = index.memory_report()
+    print(f"Построение:                  {build_seconds:.2f} с")
+    print(f"Навыков:                     {report['skills']}")
+    print(f"Битовые карты:               {report['bitmap_bytes'] / 1024 / 1024:.1f} MiB")
+    print(f"Наборы навыков компаний:     {report['company_sets_bytes'] / 1024 / 1024:.1f} MiB")
+    print(f"Оценка на 100 тыс. компаний: {report['bytes_per_100k_companies'] / 1024 / 1024:.1f} MiB")
+    print(f"tracemalloc (Python-часть):  {allocated / 1024 / 1024:.1f} MiB")
+    print("-" * 80)
+
+    stacks = [skill_sets[i][:3] for i in rng.integers(0, len(skill_sets), QUERIES)]
+    measure("AND (2 навыка)", lambda s: index.match(s[:2]), [(s,) for s in stacks])
+    measure("OR (3 навыка)", lambda s: index.match(any_of=s), [(s,) for s in stacks])
+    measure("AND + NOT", lambda s: index.match(s[:1], none_of=s[1:2]), [(s,) for s in stacks])
+    measure("OR + Жаккар top-20", lambda s: index.top_similar(s, index.match(any_of=s), 20), [(s,) for s in stacks])
+    measure("обновление компании", index.set_company, [(i, stacks[i]) for i in range(QUERIES)])
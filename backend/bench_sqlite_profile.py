@@ -0,0 +1,100 @@
+"""
+Бенчмарк профиля SQLite: чтения во время импорта
+Сравнивает настройки по умолчанию (rollback journal) и SQLITE_PRAGMAS (WAL и др.)
+
+Запуск: python bench_sqlite_profile.py
+"""
+
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import text
+
+from app.core.database import Base, SQLITE_PRAGMAS, create_sqlite_engine
+from app.models import models  # noqa: F401 - регистрация таблиц в Base.metadata
+
+DURATION_SECONDS = 5
+READER_THREADS = 4
+# Импорт держит одну транзакцию на много flush-ей с обработкой данных между ними
+WRITE_CHUNKS_PER_TRANSACTION = 10
+WRITE_CHUNK = 1000
+WRITE_PAUSE_SECONDS = 0.02
+PAYLOAD = "описание вакансии " * 60
+
+READ_QUERY = text("SELECT id, name, score FROM companies WHERE id = :id")
+INSERT_QUERY = text(
+    "INSERT INTO companies (name, url, industry, score, vacancy_count, status) "
+    "VALUES (:name, :url, 'IT', :score, 1, 'new')"
+)
+
+
+def run_profile(title: str, pragmas: dict) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_sqlite_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", pragmas)
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(INSERT_QUERY, [{"name": f"seed-{i}", "url": "", "score": i % 100} for i in range(1000)])
+
+        stop = threading.Event()
+        latencies: list[float] = []
+        errors = [0]
+        writes = [0]
+        lock = threading.Lock()
+
+        def writer():
+            while not stop.is_set():
+                with engine.begin() as conn:
+                    for _ in range(WRITE_CHUNKS_PER_TRANSACTION):
+                        conn.execute(INSERT_QUERY, [
+                            {"name": f"company-{writes[0] + j}", "url": PAYLOAD, "score": j % 100}
+                            for j in range(WRITE_CHUNK)
+                        ])
+                        writes[0] += WRITE_CHUNK
+                        time.sleep(WRITE_PAUSE_SECONDS)
+
+        def reader():
+            i = 0
+            while not stop.is_set():
+                i += 1
+                started = time.perf_counter()
+                try:
+                    with engine.connect() as conn:
+                        conn.execute(READ_QUERY, {"id": i % 1000 + 1}).fetchall()
+                except Exception:
+                    with lock:
+                        errors[0] += 1
+                    continue
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+
+        threads = [threading.Thread(target=writer)] + [
+            threading.Thread(target=reader) for _ in range(READER_THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(DURATION_SECONDS)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0
+    median = statistics.median(latencies) * 1000 if latencies else 0.0
+    print(f"\n[{title}] {pragmas or 'настройки SQLite по умолчанию'}")
+    print("-" * 80)
+    print(f"Записано строк:       {writes[0]}")
+    print(f"Успешных чтений:      {len(latencies)} ({len(latencies) / DURATION_SECONDS:.0f}/с)")
+    print(f"Ошибок 'locked':      {errors[0]}")
+    print(f"Латентность чтения:   медиана {median:.2f} мс, p95 {p95:.2f} мс")
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print(f"БЕНЧМАРК SQLITE: {READER_THREADS} читателя + импорт в длинных транзакциях, {DURATION_SECONDS} с")
+    print("=" * 80)
+    run_profile("default", {})
+    run_profile("tuned", SQLITE_PRAGMAS)
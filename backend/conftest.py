@@ -0,0 +1,18 @@
+"""
+Общие фикстуры pytest
+Тесты API работают с временной БД из api_testing: модуль импортируется здесь,
+до сбора тестов, поэтому ни один тест не откроет рабочую БД
+"""
+
+import pytest
+
+from api_testing import seed_database
+
+# Скрипты ручной проверки запущенного сервера (requests к 127.0.0.1:8000), а не тесты pytest
+collect_ignore = ["test_companies_api.py", "test_emails_api.py", "test_letters_api.py"]
+
+
+@pytest.fixture(scope="session")
+def seeded_database():
+    """Одна засеянная БД на сессию: модули и тесты можно запускать по отдельности (-k)"""
+    seed_database()
@@ -5,11 +5,23 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PROJECT_ROOT)
 from collections import defaultdict
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal, engine, Base
+from app.core.compression import text_codec
+from app.core.database import SessionLocal, engine
+from app.core.migrations import run_migrations
 from app.models.models import Company, Vacancy
-from app.services.scoring import calculate_score
+from app.services.scoring_stats import (
+    apply_vacancy_changes,
+    get_stats,
+    refresh_scores,
+    register_new_companies,
+    rescore_all,
+)
+from app.services.growth import record_snapshots
+from app.services.dedup import deduplicate_vacancies
+from app.services.descriptions import train_description_dictionary
+from app.services.similarity import ensure_minhash
 
-Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 
 
 def load_json_data(filename):
@@ -35,19 +47,12 @@ def load_json_data(filename):
     return []
 
 
-def extract_skills_from_vac_list(vac_list):
-    all_skills = []
-    for v in vac_list:
-        skills = v.get("main_skills", [])
-        if isinstance(skills, list):
-            all_skills.extend(skills)
-        elif isinstance(skills, str):
-            all_skills.append(skills)
-    return list(set(all_skills))
-
-
-def import_data():
+def import_data(full_rescore: bool = False):
     db: Session = SessionLocal()
+    # Новые описания сжимаются текущим словарём
+    text_codec.refresh(db)
+    # Подписи, сброшенные миграцией: дальше импорт пересчитывает только затронутые компании
+    ensure_minhash(db)
 
     sj_data = load_json_data("superjob_vacancies.json")
     hh_data = load_json_data("vacancies.json")
@@ -60,6 +65,10 @@ def import_data():
 
     print(f"Всего вакансий для обработки: {len(all_vacancies)}")
 
+    # Одна и та же вакансия приходит с разных площадок под разными URL
+    all_vacancies, duplicates_count = deduplicate_vacancies(all_vacancies)
+    print(f"Схлопнуто дубликатов: {duplicates_count}, уникальных вакансий: {len(all_vacancies)}")
+
     companies_map: dict[str, list[dict]] = defaultdict(list)
 
     for item in all_vacancies:
@@ -77,29 +86,13 @@ def import_data():
 
     print(f"Найдено уникальных компаний: {len(companies_map)}")
 
-    max_vacancy_count = 0
-    max_skills_possible = 0
-
-    for comp_name, vac_list in companies_map.items():
-        vacancy_count = len(vac_list)
-        unique_skills = extract_skills_from_vac_list(vac_list)
-
-        if vacancy_count > max_vacancy_count:
-            max_vacancy_count = vacancy_count
-
-        skills_count = len(unique_skills)
-        if skills_count > max_skills_possible:
-            max_skills_possible = skills_count
-
-    if max_vacancy_count == 0:
-        max_vacancy_count = 1
-    if max_skills_possible == 0:
-        max_skills_possible = 1
-
-    print(f"max_vacancy_count = {max_vacancy_count}")
-    print(f"max_skills_possible = {max_skills_possible}")
+    # Сохранённая статистика до импорта: дальше она обновляется инкрементально
+    get_stats(db)
 
     count_new_companies = 0
+    new_companies: list[Company] = []
+    touched_company_ids: set[int] = set()
+    added_skill_lists: list = []
 
     for comp_name, vac_list in companies_map.items():
         existing_company = (
@@ -111,40 +104,31 @@ def import_data():
         if existing_company:
             company = existing_company
         else:
-            unique_skills = extract_skills_from_vac_list(vac_list)
             first_vac = vac_list[0]
 
             url = first_vac.get("company_url") or ""
 
-            vacancy_count = len(vac_list)
-            skills_count = len(unique_skills)
-
-            # Здесь как раз второй вариант: передаём keyword-only аргументы
-            score = calculate_score(
-                vacancy_count,
-                skills_count,
-                max_vacancy_count=max_vacancy_count,
-                max_skills_possible=max_skills_possible,
-                company_size_score=0.5,
-                growth_score=0.5,
-            )
-
+            # vacancy_count и main_skills заполнит apply_vacancy_changes по вставленным вакансиям
             company = Company(
                 name=comp_name,
                 url=url,
                 industry="IT / Промышленность / Другое",
-                vacancy_count=vacancy_count,
-                main_skills=unique_skills,
-                score=score,
+                vacancy_count=0,
+                main_skills=[],
                 status="new",
             )
             db.add(company)
             db.flush()
+            new_companies.append(company)
             count_new_companies += 1
 
         for v in vac_list:
             vac_url = v.get("vacancy_url")
-            if vac_url and db.query(Vacancy).filter(Vacancy.url == vac_url).first():
+            existing_vacancy = vac_url and db.query(Vacancy).filter(Vacancy.url == vac_url).first()
+            if existing_vacancy:
+                # Вакансии, импортированные до появления описаний, получают описание
+                if existing_vacancy.description is None and v.get("description"):
+                    existing_vacancy.description = v["description"]
                 continue
 
             vacancy = Vacancy(
@@ -152,13 +136,36 @@ def import_data():
                 position=v.get("position", "Не указана"),
                 skills=v.get("main_skills", []),
                 url=vac_url or "",
+                description=v.get("description"),
             )
             db.add(vacancy)
+            touched_company_ids.add(company.id)
+            added_skill_lists.append(vacancy.skills)
+
+    db.flush()
+
+    # Инкрементальное обновление статистики: только затронутые импортом компании
+    register_new_companies(db, new_companies)
+    apply_vacancy_changes(db, touched_company_ids, added=added_skill_lists)
+    growth_changed_ids = record_snapshots(db)
+    rescored = refresh_scores(db, touched_company_ids | growth_changed_ids)
+    if full_rescore:
+        # IDF и суммы навыков всех компаний, а не только затронутых импортом
+        rescored = rescore_all(db)
+
+    # Первый импорт с описаниями: словарь сжатия обучается на них
+    if train_description_dictionary(db) is not None:
+        db.commit()
+
+    stats = get_stats(db)
+    print(f"max_vacancy_count = {stats.max_vacancy_count}")
+    print(f"max_skills_possible = {stats.max_skills_possible}")
+    print(f"max_skill_weight = {stats.max_skill_weight:.2f}")
+    print(f"Пересчитан скор компаний: {rescored}")
 
-    db.commit()
     db.close()
     print(f"Импорт завершен! Добавлено новых компаний: {count_new_companies}")
 
 
 if __name__ == "__main__":
-    import_data()
+    import_data(full_rescore="--full-rescore" in sys.argv)
@@ -3,14 +3,45 @@ FastAPI MVP Application - Entry Point
 Управление компаниями, письмами и email-рассылками
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routers import companies, letters, emails
+from app.core.compression import text_codec
+from app.core.database import AsyncSessionLocal, SessionLocal, engine
+from app.core.http_compression import CompressionMiddleware
+from app.core.migrations import run_migrations
+from app.routers import changes, companies, dashboard, letters, emails, scoring, skills, search, vacancies
+from app.services.descriptions import train_description_dictionary
+from app.services.search import index_pending_vacancies
+from app.services.similarity import ensure_minhash
+from app.services.skill_bitmap import skill_index
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Перед стартом довести схему БД до актуальной версии, досчитать производные
+    данные (сброшенные миграциями и записанные в обход приложения), загрузить
+    словари сжатия и построить индекс навыков
+    """
+    run_migrations(engine)
+    with SessionLocal() as db:
+        ensure_minhash(db)
+        train_description_dictionary(db)
+        # Вакансии, записанные в обход приложения
+        index_pending_vacancies(db)
+        db.commit()
+    async with AsyncSessionLocal() as db:
+        await text_codec.refresh_async(db)
+        await skill_index.refresh(db)
+    yield
 
 
 # Создание приложения
 app = FastAPI(
+    lifespan=lifespan,
     title="AI Memory & EdAgent API",
     description="MVP для управления компаниями и рассылкой писем",
     version="1.0.0",
@@ -27,10 +58,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# brotli/gzip для ответов от COMPRESSION_MIN_SIZE байт
+app.add_middleware(CompressionMiddleware)
+
 # Подключение роутеров с префиксом /api
 app.include_router(companies.router, prefix="/api", tags=["companies"])
 app.include_router(letters.router, prefix="/api", tags=["letters"])
 app.include_router(emails.router, prefix="/api", tags=["emails"])
+app.include_router(scoring.router, prefix="/api", tags=["scoring"])
+app.include_router(skills.router, prefix="/api", tags=["skills"])
+app.include_router(search.router, prefix="/api", tags=["search"])
+app.include_router(vacancies.router, prefix="/api", tags=["vacancies"])
+app.include_router(dashboard.router, prefix="/api", tags=["dashboard"])
+app.include_router(changes.router, prefix="/api", tags=["changes"])
 
 
 # Health check эндпоинт
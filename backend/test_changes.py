@@ -0,0 +1,97 @@
+"""
+Проверка ленты изменений (/api/changes) на временной БД (api_testing)
+
+Запуск: python -m pytest test_changes.py
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from api_testing import capture_statements
+from app.core.database import SessionLocal, async_engine, engine
+from app.models.models import Letter
+from main import app
+
+pytestmark = pytest.mark.usefixtures("seeded_database")
+
+
+def test_change_feed():
+    """/api/changes: полная синхронизация с 0, затем только изменённые и удалённые строки"""
+    def sync(client: TestClient, since: int, limit: int = 500) -> tuple[dict, dict, int]:
+        companies, letters = {}, {}
+        while True:
+            response, statements, _ = capture_statements(client, "GET", f"/api/changes?since={since}&limit={limit}")
+            changes = response.json()
+            assert len(statements) <= 3, statements  # номер с изменениями, компании, письма - при любом limit
+            companies.update((c["id"], c) for c in changes["companies"])
+            letters.update((letter["id"], letter) for letter in changes["letters"])
+            for company_id in changes["deleted_companies"]:
+                companies[company_id] = None
+            for letter_id in changes["deleted_letters"]:
+                letters[letter_id] = None
+            assert changes["seq"] >= since
+            since = changes["seq"]
+            if not changes["has_more"]:
+                return companies, letters, since
+
+    with TestClient(app) as client:
+        companies, letters, seq = sync(client, 0, limit=7)
+        # Компании, удалённые другими тестами, приходят в deleted_companies
+        companies = {company_id: c for company_id, c in companies.items() if c is not None}
+        assert len(companies) == client.get("/api/dashboard").json()["company_counts"]["all"]
+        assert len(letters) == client.get("/api/letters").json()["total"]
+        assert sync(client, seq) == ({}, {}, seq)
+
+        company_id = next(c["id"] for c in companies.values() if c["status"] == "new")
+        client.post(f"/api/companies/{company_id}/approve")
+        client.post(f"/api/companies/{company_id}/approve")
+        db = SessionLocal()
+        try:
+            letter = Letter(company_id=company_id, template="default", subject="Новое", body="Текст", status="draft")
+            db.add(letter)
+            db.commit()
+            gone = db.get(Letter, next(iter(letters)))
+            gone_id = gone.id
+            db.delete(gone)
+            # Изменение невидимой в API колонки и запись того же значения - не изменения
+            db.execute(text("UPDATE companies SET score_size = score_size + 1, score = score"))
+            db.commit()
+            letter_id = letter.id
+        finally:
+            db.close()
+
+        companies, letters, new_seq = sync(client, seq)
+        assert list(companies) == [company_id] and companies[company_id]["status"] == "approved"
+        assert letters == {letter_id: letters[letter_id], gone_id: None}
+        assert letters[letter_id]["company_name"] == companies[company_id]["name"]
+        assert new_seq == seq + 3
+
+        assert client.get(f"/api/changes?since={new_seq + 100}").json()["reset"] is True
+
+
+def test_change_feed_reads_one_snapshot():
+    """Запись, закоммиченная сразу после чтения номера и журнала, не попадает в ответ и приходит в следующем"""
+    with TestClient(app) as client:
+        seq = client.get("/api/changes?since=0&limit=1000").json()["seq"]
+        company_id = client.get("/api/companies?limit=1").json()["data"][0]["id"]
+        written = []
+
+        def _write_after_seq(conn, cursor, statement, parameters, context, executemany):
+            if not written and "FROM change_sequence" in statement:
+                with engine.begin() as writer:
+                    writer.execute(text("UPDATE companies SET name = name || ' (снимок)' WHERE id = :id"),
+                                   {"id": company_id})
+                written.append(True)
+
+        event.listen(async_engine.sync_engine, "after_cursor_execute", _write_after_seq)
+        try:
+            changes = client.get(f"/api/changes?since={seq}").json()
+        finally:
+            event.remove(async_engine.sync_engine, "after_cursor_execute", _write_after_seq)
+
+        assert written
+        assert changes["companies"] == [] and changes["seq"] == seq
+        changes = client.get(f"/api/changes?since={seq}").json()
+        assert [c["id"] for c in changes["companies"]] == [company_id]
+        assert changes["companies"][0]["name"].endswith("(снимок)")
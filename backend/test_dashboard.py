@@ -0,0 +1,49 @@
+"""
+Проверка дашборда одним запросом на временной БД (api_testing)
+
+Запуск: python -m pytest test_dashboard.py
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api_testing import assert_statement_count, capture_statements
+from main import app
+
+pytestmark = pytest.mark.usefixtures("seeded_database")
+
+
+def test_dashboard_in_one_request():
+    """Дашборд: поколение, счётчики и top-N с письмами - три запроса при любом N; совпадает с отдельными эндпоинтами"""
+    with TestClient(app) as client:
+        for limit in (1, 20, 60):
+            dashboard = assert_statement_count(client, f"/api/dashboard?limit={limit}", 3).json()
+        top = client.get("/api/companies/top-20").json()
+        assert [c["id"] for c in dashboard["companies"][:20]] == [c["id"] for c in top]
+
+        companies = client.get("/api/companies?total=exact").json()
+        assert dashboard["company_counts"]["all"] == companies["total"]
+        approved = client.get("/api/companies?status=approved").json()["total"]
+        assert dashboard["company_counts"]["approved"] == approved
+        assert dashboard["letter_counts"]["all"] == client.get("/api/letters").json()["total"]
+
+        for company in dashboard["companies"][:10]:
+            letter = client.get(f"/api/letters/{company['id']}")
+            if letter.status_code == 404:
+                assert company["letter"] is None
+                continue
+            assert company["letter"]["id"] == letter.json()["id"]
+            assert company["letter"]["status"] == letter.json()["status"]
+            status = client.get(f"/api/emails/status/{company['id']}").json()
+            assert company["letter"]["delivery_status"] == status["delivery_status"]
+
+        # Повтор - из кэша (только поколение); запись меняет поколение и ответ
+        client.get("/api/dashboard")
+        _, statements, _ = capture_statements(client, "GET", "/api/dashboard")
+        assert len(statements) == 1
+        company_id = dashboard["companies"][0]["id"]
+        client.post(f"/api/companies/{company_id}/reject")
+        after = client.get("/api/dashboard?limit=60").json()
+        assert after["company_counts"]["rejected"] == dashboard["company_counts"]["rejected"] + 1
+
+        assert client.get("/api/dashboard?status=unknown").status_code == 400
@@ -0,0 +1,96 @@
+"""
+Проверка схлопывания почти-дубликатов вакансий (SimHash)
+
+Запуск: python -m pytest test_dedup.py
+"""
+
+import time
+
+from app.services.dedup import deduplicate_vacancies, hamming_distance, is_same_vacancy, vacancy_fingerprint
+
+DESCRIPTION = (
+    "Разработка и сопровождение сервисов на Python. Проектирование схем PostgreSQL, "
+    "настройка очередей Kafka, ревью кода, участие в планировании спринтов и дежурствах. "
+    "Требования: опыт коммерческой разработки от трёх лет, уверенное знание SQL, "
+    "понимание принципов работы сетей и Linux, опыт работы с Docker и Kubernetes. "
+    "Условия: официальное оформление, гибкий график, удалённая работа или офис в Екатеринбурге, "
+    "компенсация обучения и конференций, добровольное медицинское страхование."
+)
+
+
+def vacancy(company: str, position: str, description: str = "", url: str = "", skills=None) -> dict:
+    return {
+        "company_name": company,
+        "position": position,
+        "description": description,
+        "vacancy_url": url,
+        "main_skills": skills or [],
+    }
+
+
+def test_near_duplicates_are_collapsed():
+    items = [
+        vacancy("ООО «Контур»", "Python-разработчик", DESCRIPTION, "hh/1", ["Python"]),
+        # Та же вакансия с SuperJob: другая форма названия, регистр и разметка текста
+        vacancy("Контур", "Python-разработчик", DESCRIPTION.upper().replace(". ", ".\n• "), "sj/1", ["Kafka"]),
+        # Без описания: совпадает должность
+        vacancy("Контур", "Аналитик данных", "", "hh/2", ["SQL"]),
+        vacancy("ООО Контур", "Аналитик  данных", "", "sj/2", ["Python"]),
+    ]
+    unique, duplicates = deduplicate_vacancies(items)
+    assert duplicates == 2
+    assert [item["vacancy_url"] for item in unique] == ["hh/1", "hh/2"]
+    assert unique[0]["main_skills"] == ["Python", "Kafka"]
+    assert unique[1]["main_skills"] == ["SQL", "Python"]
+
+
+def test_same_company_different_roles_are_kept():
+    # Без описания отпечаток определяет компания: расстояние 0, но это разные вакансии
+    analyst = vacancy("Контур", "Аналитик")
+    tester = vacancy("ООО Контур", "Тестировщик")
+    assert hamming_distance(vacancy_fingerprint(analyst), vacancy_fingerprint(tester)) == 0
+
+    items = [
+        analyst,
+        tester,
+        vacancy("Контур", "DevOps-инженер", url="hh/3"),
+        vacancy("Контур", "SRE-специалист", url="hh/4"),
+        vacancy("Контур", "Бизнес-аналитик", url="hh/5"),
+        vacancy("Контур", "Ведущий бизнес-аналитик", url="hh/6"),
+    ]
+    unique, duplicates = deduplicate_vacancies(items)
+    assert duplicates == 0
+    assert len(unique) == len(items)
+
+
+def test_candidate_rejection_does_not_hide_real_duplicate():
+    # Первый кандидат по отпечатку - другая должность; дубликат всё равно находится
+    items = [
+        vacancy("Контур", "Аналитик", url="hh/1"),
+        vacancy("Контур", "Тестировщик", url="hh/2"),
+        vacancy("ООО Контур", "Тестировщик", url="sj/2"),
+    ]
+    unique, duplicates = deduplicate_vacancies(items)
+    assert duplicates == 1
+    assert [item["vacancy_url"] for item in unique] == ["hh/1", "hh/2"]
+
+
+def test_shared_boilerplate_with_different_position_is_kept():
+    # Общий текст компании с разными должностями: отпечатки близки, но это разные вакансии
+    developer = vacancy("Контур", "Python-разработчик", DESCRIPTION, "hh/1")
+    tester = vacancy("ООО Контур", "Тестировщик", DESCRIPTION, "hh/2")
+    assert not is_same_vacancy(developer, tester)
+
+    unique, duplicates = deduplicate_vacancies([developer, tester])
+    assert duplicates == 0
+    assert [item["vacancy_url"] for item in unique] == ["hh/1", "hh/2"]
+
+
+def test_many_vacancies_without_description_are_linear():
+    # Все отпечатки совпадают: без точного ключа каждая вакансия сверялась бы со всеми предыдущими
+    items = [vacancy("Контур", f"Должность {i % 8000}", url=f"hh/{i}") for i in range(12000)]
+    started = time.perf_counter()
+    unique, duplicates = deduplicate_vacancies(items)
+    assert time.perf_counter() - started < 1.0
+    assert len(unique) == 8000
+    assert duplicates == 4000
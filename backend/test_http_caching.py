@@ -0,0 +1,64 @@
+"""
+Проверка кэша ответов и условных GET (ETag / 304) на временной БД (api_testing)
+
+Запуск: python -m pytest test_http_caching.py
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api_testing import capture_statements
+from app.core.database import SessionLocal
+from app.models.models import Company
+from main import app
+
+pytestmark = pytest.mark.usefixtures("seeded_database")
+
+
+def test_response_cache_invalidated_by_writes():
+    """Повторный список - из кэша; одобрение компании сбрасывает кэш"""
+    with TestClient(app) as client:
+        client.get("/api/companies?status=approved")
+        before = client.get("/api/companies/cache/stats").json()
+        approved = client.get("/api/companies?status=approved").json()
+        stats = client.get("/api/companies/cache/stats").json()
+        assert stats["hits"] == before["hits"] + 1
+
+        company_id = client.get("/api/companies?status=new&limit=1").json()["data"][0]["id"]
+        assert client.post(f"/api/companies/{company_id}/approve").status_code == 200
+        after = client.get("/api/companies?status=approved").json()
+        assert after["total"] == approved["total"] + 1
+        assert client.get("/api/companies/cache/stats").json()["generation"] > stats["generation"]
+
+
+def test_conditional_get_returns_not_modified():
+    """Совпавший If-None-Match - 304 без основного запроса; изменение данных меняет ETag"""
+    with TestClient(app) as client:
+        for path in ("/api/companies/2", "/api/companies?status=new", "/api/companies/top-20",
+                     "/api/letters/2", "/api/letters?limit=5"):
+            etag = client.get(path).headers["etag"]
+            response, statements, _ = capture_statements(client, "GET", path, headers={"If-None-Match": etag})
+            assert response.status_code == 304, path
+            assert response.content == b"", path
+            assert len(statements) == 1, f"{path}: {statements}"
+
+        etag = client.get("/api/companies/2").headers["etag"]
+        assert client.post("/api/companies/2/reject").status_code == 200
+        assert client.get("/api/companies/2", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_conditional_get_of_missing_letter_is_not_found():
+    """Без письма у компании - 404, даже если If-None-Match совпал бы с любым ETag"""
+    db = SessionLocal()
+    try:
+        company = Company(name="Без писем", url="", industry="IT", main_skills=[])
+        db.add(company)
+        db.commit()
+        with TestClient(app) as client:
+            for headers in ({}, {"If-None-Match": "*"}):
+                response = client.get(f"/api/letters/{company.id}", headers=headers)
+                assert response.status_code == 404, headers
+    finally:
+        db.delete(company)
+        db.commit()
+        db.close()
@@ -0,0 +1,68 @@
+"""
+Проверка сжатия ответов (br / gzip) и Vary на временной БД (api_testing)
+
+Запуск: python -m pytest test_http_compression.py
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+from app.core import http_compression
+from app.core.http_compression import CompressionMiddleware
+from main import app
+
+pytestmark = pytest.mark.usefixtures("seeded_database")
+
+
+def test_compressed_responses_keep_conditional_get():
+    """Vary: Accept-Encoding у всех ответов; сжатый ответ - слабый ETag; 304 при любой кодировке"""
+    path = "/api/companies?limit=40"
+    with TestClient(app) as client:
+        plain = client.get(path, headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert "accept-encoding" in plain.headers["vary"].lower()
+        etag = plain.headers["etag"]
+        assert not etag.startswith("W/")
+
+        for encoding in ("br", "gzip"):
+            compressed = client.get(path, headers={"Accept-Encoding": encoding})
+            assert compressed.headers["content-encoding"] == encoding
+            assert "accept-encoding" in compressed.headers["vary"].lower()
+            assert compressed.headers["etag"] == f"W/{etag}"
+            assert compressed.json() == plain.json()
+
+        for sent, accept in ((f"W/{etag}", "identity"), (f"W/{etag}", "gzip"), (etag, "br")):
+            response = client.get(path, headers={"Accept-Encoding": accept, "If-None-Match": sent})
+            assert response.status_code == 304, (sent, accept)
+            assert response.headers["etag"] == sent
+            assert "accept-encoding" in response.headers["vary"].lower()
+
+        small = client.get("/api/emails/status/1", headers={"Accept-Encoding": "br"})
+        assert "content-encoding" not in small.headers
+        assert "accept-encoding" in small.headers["vary"].lower()
+
+
+def test_large_bodies_are_compressed_off_the_event_loop(monkeypatch):
+    """Тело от thread_minimum_size байт сжимается в пуле потоков, мелкое - на месте"""
+    threaded = []
+
+    async def to_thread(func, *args):
+        threaded.append(len(args[0]))
+        return func(*args)
+
+    monkeypatch.setattr(http_compression.asyncio, "to_thread", to_thread)
+    small_app = FastAPI()
+    small_app.add_middleware(CompressionMiddleware, minimum_size=100, thread_minimum_size=4096)
+
+    @small_app.get("/text/{size}")
+    def text_of_size(size: int):
+        return PlainTextResponse("x" * size)
+
+    with TestClient(small_app) as client:
+        for size in (1000, 10000):
+            response = client.get(f"/text/{size}", headers={"Accept-Encoding": "br"})
+            assert response.headers["content-encoding"] == "br"
+            assert response.text == "x" * size
+    assert threaded == [10000]
@@ -0,0 +1,100 @@
+"""
+Проверка миграций схемы на отдельной временной БД
+
+Запуск: python -m pytest test_migrations.py
+"""
+
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core import migrations
+from app.core.compression import text_codec
+from app.core.database import create_sqlite_engine
+from app.core.migrations import run_migrations
+from app.models.models import Base, CompanyLshBand, CompanySkill, VacancySkill
+from app.services.similarity import LSH_BANDS, ensure_minhash
+from app.services.skill_links import rebuild_skill_links
+
+
+@pytest.fixture
+def engine():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_sqlite_engine(f"sqlite:///{os.path.join(tmp_dir, 'migrations.db')}")
+        try:
+            yield engine
+        finally:
+            engine.dispose()
+
+
+def migrate_to(engine, version: int, monkeypatch) -> None:
+    """Применить миграции до версии version включительно (БД "старой" версии)"""
+    with monkeypatch.context() as patch:
+        patch.setattr(migrations, "MIGRATIONS", [m for m in migrations.MIGRATIONS if m[0] <= version])
+        run_migrations(engine)
+
+
+def test_upgrade_from_old_schema_keeps_data(engine, monkeypatch):
+    migrate_to(engine, 3, monkeypatch)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO companies (id, name, main_skills) VALUES "
+            "(1, 'Альфа', '[\" Python \", \"SQL\", \"python\"]'), (2, 'Бета', '\"Go\"'), (3, 'Гамма', NULL)"
+        ))
+        conn.execute(text(
+            "INSERT INTO vacancies (id, company_id, position, skills) VALUES "
+            "(1, 1, 'Разработчик', '[\"Python\", \"Kafka\"]'), (2, 2, 'Тестировщик', '[]')"
+        ))
+
+    # Описания до сжатия - открытый текст
+    migrate_to(engine, 7, monkeypatch)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE vacancies SET description = 'Python, Kafka и PostgreSQL' WHERE id = 1"))
+
+    run_migrations(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        links = {(link.company_id, link.skill_id) for link in db.query(CompanySkill)}
+        vacancy_links = {(link.vacancy_id, link.skill_id) for link in db.query(VacancySkill)}
+        assert len(links) == 3 and len(vacancy_links) == 2
+
+        # Связи миграции совпадают с пересборкой сервисом
+        rebuild_skill_links(db)
+        assert {(link.company_id, link.skill_id) for link in db.query(CompanySkill)} == links
+        assert {(link.vacancy_id, link.skill_id) for link in db.query(VacancySkill)} == vacancy_links
+
+        blob = db.execute(text("SELECT description_zst FROM vacancies WHERE id = 1")).scalar()
+        assert text_codec.decompress(blob) == "Python, Kafka и PostgreSQL"
+
+        # Подписи MinHash досчитывает сервис, а не миграция
+        assert db.query(CompanyLshBand).count() == 0
+        assert ensure_minhash(db) == 3
+        assert db.query(CompanyLshBand).count() == 2 * LSH_BANDS
+        assert ensure_minhash(db) == 0
+    finally:
+        db.close()
+
+
+def test_migrations_are_idempotent(engine):
+    run_migrations(engine)
+    assert run_migrations(engine) == []
+    with engine.connect() as conn:
+        indexes = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+    for name in ("ix_companies_status_score", "ix_companies_industry_score",
+                 "ix_letters_company_created", "ix_letters_status_created"):
+        assert name in indexes
+
+
+def test_migrated_schema_matches_models(engine):
+    """Миграции не читают модели: схема после них должна совпадать с моделями"""
+    run_migrations(engine)
+    with engine.connect() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            assert columns == {column.name for column in table.columns}, table.name
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            assert {index.name for index in table.indexes} <= indexes, table.name
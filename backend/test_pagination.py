@@ -0,0 +1,89 @@
+"""
+Проверка постраничной выдачи по курсору на временной БД (api_testing)
+
+Запуск: python -m pytest test_pagination.py
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from api_testing import assert_statement_count
+from app.core.database import SessionLocal
+from app.models.models import Company, Vacancy
+from app.services.response_cache import bump_generation_sync
+from app.services.skill_links import sync_skill_links
+from main import app
+
+pytestmark = pytest.mark.usefixtures("seeded_database")
+
+
+def test_curriculum_sort_pages_rows_without_match():
+    """Компании без посчитанного соответствия (NULL) не теряются при переходе по курсору"""
+    db = SessionLocal()
+    try:
+        db.execute(text(
+            "INSERT INTO companies (name, url, industry, score, vacancy_count, main_skills, status) "
+            "VALUES ('Без соответствия 1', '', 'IT', 1, 0, '[]', 'new'), "
+            "('Без соответствия 2', '', 'IT', 1, 0, '[]', 'new')"
+        ))
+        db.execute(text("UPDATE companies SET score_curriculum = NULL WHERE id = 5"))
+        bump_generation_sync(db)
+        db.commit()
+        assert db.execute(text("SELECT COUNT(*) FROM companies WHERE score_curriculum IS NULL")).scalar() == 0
+    finally:
+        db.close()
+
+    with TestClient(app) as client:
+        for sort_by in ("curriculum_asc", "curriculum_desc"):
+            first = client.get(f"/api/companies?limit=3&sort_by={sort_by}").json()
+            seen = [item["id"] for item in first["data"]]
+            cursor = first["next_cursor"]
+            while cursor:
+                page = client.get(f"/api/companies?limit=3&sort_by={sort_by}&cursor={cursor}").json()
+                seen += [item["id"] for item in page["data"]]
+                cursor = page["next_cursor"]
+            assert len(seen) == len(set(seen)) == first["total"], sort_by
+
+
+def test_company_vacancies_are_paginated():
+    """Детали компании - первая страница вакансий; остальные - по курсору, с фильтром навыков"""
+    db = SessionLocal()
+    try:
+        company = Company(name="Крупный работодатель", url="", industry="IT", main_skills=[])
+        db.add(company)
+        db.flush()
+        db.add_all(
+            Vacancy(company_id=company.id, position=f"Вакансия {i}", url=f"big-{i}",
+                    skills=["Kafka", "Python"] if i % 3 == 0 else ["Python"])
+            for i in range(45)
+        )
+        db.commit()
+        sync_skill_links(db, [company.id])
+        db.commit()
+        vacancy_ids = [vacancy.id for vacancy in db.query(Vacancy).filter_by(company_id=company.id).order_by(Vacancy.id)]
+    finally:
+        db.close()
+
+    with TestClient(app) as client:
+        # Детали: версия, компания, страница вакансий - сколько бы вакансий ни было
+        detail = assert_statement_count(client, f"/api/companies/{company.id}", 3).json()
+        assert [v["id"] for v in detail["vacancies"]] == vacancy_ids[:20]
+        assert detail["vacancies_next_cursor"]
+
+        seen = [v["id"] for v in detail["vacancies"]]
+        cursor = detail["vacancies_next_cursor"]
+        while cursor:
+            page = assert_statement_count(client, f"/api/companies/{company.id}/vacancies?limit=7&cursor={cursor}", 2).json()
+            assert len(page["data"]) <= 7
+            seen += [v["id"] for v in page["data"]]
+            cursor = page["next_cursor"]
+        assert seen == vacancy_ids
+
+        kafka = client.get(f"/api/companies/{company.id}/vacancies?skills=kafka,python&limit=100").json()
+        assert [v["id"] for v in kafka["data"]] == vacancy_ids[::3]
+        assert kafka["next_cursor"] is None
+
+        assert client.get("/api/companies/100000/vacancies").status_code == 404
+        assert client.get(f"/api/companies/{company.id}/vacancies?cursor=broken").status_code == 400
+        assert client.get(f"/api/companies/{company.id}/vacancies?skills=python&skills_mode=xor").status_code == 400
@@ -0,0 +1,149 @@
+"""
+Проверка планов запросов API (EXPLAIN QUERY PLAN)
+Каждый SELECT, который выполняют эндпоинты, должен идти по индексу:
+без полного сканирования таблиц и без сортировки во временном B-дереве
+
+Запуск: python -m pytest test_query_plans.py (или python test_query_plans.py)
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api_testing import capture_selects, seed_database
+from app.core.database import engine
+from app.models.models import Base
+from main import app
+
+pytestmark = pytest.mark.usefixtures("seeded_database")
+
+
+ENDPOINTS = [
+    "/api/companies/top-20",
+    "/api/companies",
+    "/api/companies?status=new",
+    "/api/companies?industry=IT",
+    "/api/companies?status=approved&industry=IT",
+    "/api/companies?min_score=50",
+    "/api/companies?sort_by=score_asc",
+    "/api/companies?sort_by=name_asc",
+    "/api/companies?sort_by=curriculum_desc",
+    "/api/companies?skills=python",
+    "/api/companies?skills=python,sql",
+    "/api/companies?skills=python,sql&skills_mode=or",
+    "/api/companies?fields=name,score,status",
+    "/api/companies?fields=name&sort_by=curriculum_desc",
+    "/api/companies/top-20?fields=name,score",
+    "/api/companies/1",
+    "/api/companies/1/similar",
+    "/api/companies/1/vacancies",
+    "/api/companies/1/vacancies?skills=python,sql&skills_mode=or",
+    "/api/vacancies/1",
+    "/api/letters",
+    "/api/letters?status=draft",
+    "/api/letters?company_id=1",
+    "/api/letters?fields=subject,status,company_name",
+    "/api/letters/1",
+    "/api/emails/status/1",
+    "/api/dashboard",
+    "/api/dashboard?status=approved",
+    "/api/dashboard?industry=IT&limit=5",
+    "/api/changes",
+    "/api/changes?since=30&limit=5",
+    "/api/search?q=python",
+    "/api/search?q=компания 1&types=companies",
+]
+
+
+# Фильтр по навыкам, поиск похожих и полнотекстовый поиск ведут запрос от индексов
+# company_skills, company_lsh_bands и FTS5: найденные строки сортируются отдельно,
+# и это ожидаемый план
+SORT_AFTER_INDEX_SEARCH = ("skills=", "/similar", "/search")
+
+
+def plan_problems(statement: str, parameters: tuple, allow_sort: bool = False) -> list[str]:
+    """Строки плана с полным сканированием таблицы или сортировкой без индекса"""
+    tables = set(Base.metadata.tables)
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+
+    problems = []
+    for row in plan:
+        detail = row[-1]
+        words = detail.split()
+        full_scan = words[:1] == ["SCAN"] and len(words) > 1 and words[1] in tables and "USING" not in words
+        if full_scan or ("TEMP B-TREE" in detail and not allow_sort):
+            problems.append(detail)
+    return problems
+
+
+def test_endpoint_queries_use_indexes():
+    failures = []
+    with TestClient(app) as client:
+        for path in ENDPOINTS:
+            statements = capture_selects(client, path)
+            assert statements, f"{path}: не выполнено ни одного SELECT"
+            for statement, parameters in statements:
+                problems = plan_problems(statement, parameters, any(p in path for p in SORT_AFTER_INDEX_SEARCH))
+                if problems:
+                    failures.append(f"{path}\n  {' '.join(statement.split())}\n  {problems}")
+
+    assert not failures, "Запросы без индекса:\n" + "\n".join(failures)
+
+
+CURSOR_ENDPOINTS = [
+    "/api/companies?limit=7",
+    "/api/companies?limit=7&status=new",
+    "/api/companies?limit=7&industry=IT&sort_by=score_asc",
+    "/api/companies?limit=7&sort_by=name_desc",
+    "/api/companies?limit=7&sort_by=curriculum_desc",
+    "/api/companies?limit=7&skills=python,sql",
+    "/api/letters?limit=7",
+    "/api/letters?limit=7&status=draft",
+    "/api/companies?limit=7&fields=name&sort_by=name_desc",
+    "/api/letters?limit=7&fields=status,company_name",
+]
+
+
+def test_cursor_pages_use_indexes():
+    """Страницы по курсору: те же строки, что и по номеру страницы, и поиск по индексу"""
+    failures = []
+    with TestClient(app) as client:
+        for path in CURSOR_ENDPOINTS:
+            first = client.get(path).json()
+            by_page = [item["id"] for item in first["data"]]
+            page = 2
+            while True:
+                data = client.get(f"{path}&page={page}").json()["data"]
+                if not data:
+                    break
+                by_page += [item["id"] for item in data]
+                page += 1
+
+            by_cursor = [item["id"] for item in first["data"]]
+            cursor = first["next_cursor"]
+            while cursor:
+                statements = capture_selects(client, f"{path}&cursor={cursor}")
+                for statement, parameters in statements:
+                    problems = plan_problems(statement, parameters, any(p in path for p in SORT_AFTER_INDEX_SEARCH))
+                    if problems:
+                        failures.append(f"{path} (cursor)\n  {' '.join(statement.split())}\n  {problems}")
+                response = client.get(f"{path}&cursor={cursor}").json()
+                by_cursor += [item["id"] for item in response["data"]]
+                cursor = response["next_cursor"]
+
+            assert by_cursor == by_page, path
+            assert len(by_cursor) == first["total"], path
+
+        assert client.get("/api/companies?cursor=broken").status_code == 400
+
+    assert not failures, "Запросы без индекса:\n" + "\n".join(failures)
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("ПРОВЕРКА ПЛАНОВ ЗАПРОСОВ")
+    print("=" * 80)
+    seed_database()
+    test_endpoint_queries_use_indexes()
+    test_cursor_pages_use_indexes()
+    print(f"Все {len(ENDPOINTS)} эндпоинтов используют индексы")
@@ -0,0 +1,305 @@
+"""
+Проверка скоринга компаний на отдельной временной БД
+
+Запуск: python -m pytest test_scoring.py
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import create_sqlite_engine
+from app.core.migrations import run_migrations
+from app.models.models import Company, ScoringWeights, SkillWeight, Vacancy, VacancySnapshot
+from app.services import scoring_stats
+from app.services.curriculum import curriculum_match_scores
+from app.services.growth import GROWTH_HALF_LIFE, growth_component, record_snapshots
+from app.services.scoring import (
+    DEFAULT_COMPANY_SIZE_SCORE,
+    calculate_score,
+    get_active_weights,
+    preview_top_companies,
+    reweight_companies,
+    weights_as_dict,
+)
+from app.services.scoring_stats import (
+    add_vacancies,
+    apply_vacancy_changes,
+    get_stats,
+    refresh_scores,
+    remove_vacancies,
+    rescore_all,
+)
+from app.services.skill_weights import compute_idf
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_sqlite_engine(f"sqlite:///{os.path.join(tmp_dir, 'scoring.db')}")
+        run_migrations(engine)
+        session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+        try:
+            yield session
+        finally:
+            session.close()
+            engine.dispose()
+
+
+def seed_companies(db, skills_by_company: dict[str, list[list[str]]]) -> dict[str, int]:
+    """Компании с вакансиями и полный пересчёт скоринга; возвращает имя -> ID"""
+    ids = {}
+    for name, vacancies in skills_by_company.items():
+        company = Company(
+            name=name,
+            url="",
+            industry="IT",
+            vacancy_count=len(vacancies),
+            main_skills=list(dict.fromkeys(skill for skills in vacancies for skill in skills)),
+            status="new",
+        )
+        db.add(company)
+        db.flush()
+        for i, skills in enumerate(vacancies):
+            db.add(Vacancy(company_id=company.id, position="Разработчик", skills=skills, url=f"{name}/{i}"))
+        ids[name] = company.id
+    db.commit()
+    rescore_all(db)
+    return ids
+
+
+def test_skill_weights_refresh_only_touched_companies(db):
+    ids = seed_companies(db, {
+        "Альфа": [["python", "sql"], ["python"]],
+        "Бета": [["java", "sql"]],
+        "Гамма": [["go"]],
+    })
+    beta_weight = db.get(Company, ids["Бета"]).skills_weight
+
+    add_vacancies(db, ids["Альфа"], [{"position": "Аналитик", "main_skills": ["sql", "excel"], "vacancy_url": "new/1"}])
+    db.expire_all()
+
+    frequencies = dict(db.query(SkillWeight.skill, SkillWeight.document_frequency))
+    assert frequencies["sql"] == 3
+    assert frequencies["excel"] == 1
+
+    # Суммы затронутой компании - по новому IDF (N = 5 вакансий)
+    expected = compute_idf([frequencies["python"], frequencies["sql"], frequencies["excel"]], 5).sum()
+    assert db.get(Company, ids["Альфа"]).skills_weight == pytest.approx(expected)
+    # Остальные не пересчитываются до полного пересчёта
+    assert db.get(Company, ids["Бета"]).skills_weight == beta_weight
+
+    rescore_all(db)
+    db.expire_all()
+    expected = compute_idf([frequencies["java"], frequencies["sql"]], 5).sum()
+    assert db.get(Company, ids["Бета"]).skills_weight == pytest.approx(expected)
+    assert expected != pytest.approx(beta_weight)
+
+
+def insert_vacancies(db, company_id: int, skill_lists: list[list[str]]) -> int:
+    """Вставка вакансий как в импорте: инкрементальная статистика и пересчёт скора"""
+    vacancies = [
+        Vacancy(company_id=company_id, position="Разработчик", skills=skills, url=f"import/{company_id}/{i}")
+        for i, skills in enumerate(skill_lists)
+    ]
+    db.add_all(vacancies)
+    db.flush()
+    apply_vacancy_changes(db, [company_id], added=skill_lists)
+    return refresh_scores(db, [company_id])
+
+
+def test_insert_rescores_only_touched_companies(db):
+    ids = seed_companies(db, {
+        "Альфа": [["python", "sql", "docker"], ["python", "linux"], ["git"]],
+        "Бета": [["java"]],
+        "Гамма": [["go"]],
+    })
+    scores = dict(db.query(Company.id, Company.score))
+
+    # Нормировки не сдвигаются - пересчитывается только Бета
+    assert insert_vacancies(db, ids["Бета"], [["java", "sql"]]) == 1
+    db.expire_all()
+    beta = db.get(Company, ids["Бета"])
+    assert beta.vacancy_count == 2
+    assert beta.main_skills == ["java", "sql"]
+    assert beta.score > scores[ids["Бета"]]
+    assert db.get(Company, ids["Гамма"]).score == scores[ids["Гамма"]]
+    assert get_stats(db).total_vacancies == 6
+
+    # Гамма обгоняет Альфу по числу вакансий - максимум сдвинулся, пересчёт всех
+    assert insert_vacancies(db, ids["Гамма"], [["go"]] * 3) == 3
+    assert get_stats(db).max_vacancy_count == 4
+
+
+def test_add_and_remove_vacancies(db):
+    ids = seed_companies(db, {"Альфа": [["python", "sql"]], "Бета": [["java"]]})
+
+    added = add_vacancies(db, ids["Бета"], [{"position": "Аналитик", "main_skills": ["sql"], "vacancy_url": "new/1"}])
+    db.expire_all()
+    assert db.get(Company, ids["Бета"]).vacancy_count == 2
+    assert db.get(SkillWeight, "sql").document_frequency == 2
+
+    assert remove_vacancies(db, [vacancy.id for vacancy in added]) == 1
+    db.expire_all()
+    assert db.get(Company, ids["Бета"]).vacancy_count == 1
+    assert db.get(Company, ids["Бета"]).main_skills == ["java"]
+    assert db.get(SkillWeight, "sql").document_frequency == 1
+    assert get_stats(db).total_vacancies == 2
+
+    with pytest.raises(ValueError):
+        add_vacancies(db, 999, [])
+
+
+def test_scalar_score_matches_rescore_under_active_weights(db):
+    ids = seed_companies(db, {
+        "Альфа": [["python", "sql", "docker"], ["python", "linux"], ["git"]],
+        "Бета": [["java", "sql"]],
+        "Гамма": [["go"], ["figma"]],
+    })
+    reweight_companies(db, {"vacancy": 0.1, "skills": 0.2, "size": 0.1, "growth": 0.2, "curriculum": 0.4})
+    db.query(Company).filter(Company.id == ids["Гамма"]).update({Company.growth_trend: 0.3})
+    db.commit()
+    rescore_all(db)
+    db.expire_all()
+
+    stats = get_stats(db)
+    weights = weights_as_dict(get_active_weights(db))
+    for company in db.query(Company):
+        expected = calculate_score(
+            company.vacancy_count,
+            company.skills_weight,
+            max_vacancy_count=stats.max_vacancy_count,
+            max_skill_weight=stats.max_skill_weight,
+            company_size_score=DEFAULT_COMPANY_SIZE_SCORE,
+            growth_score=float(growth_component(company.growth_trend)),
+            curriculum_score=company.score_curriculum,
+            weights=weights,
+        )
+        assert company.score == pytest.approx(expected, abs=0.01)
+
+
+def test_invalid_weights_are_rejected(db):
+    seed_companies(db, {"Альфа": [["python"]]})
+    invalid = [
+        {"vacancy": 0.5, "skills": 0.5, "size": 0.5, "growth": 0.0, "curriculum": 0.0},
+        {"vacancy": 1.0, "skills": 0.0, "size": 0.0, "growth": 0.0},
+        {"vacancy": 1.5, "skills": -0.5, "size": 0.0, "growth": 0.0, "curriculum": 0.0},
+    ]
+    for weights in invalid:
+        with pytest.raises(ValueError):
+            reweight_companies(db, weights)
+        with pytest.raises(ValueError):
+            preview_top_companies(db, weights)
+    assert db.query(ScoringWeights).count() == 0
+
+
+def test_weights_versions(db):
+    ids = seed_companies(db, {
+        "Альфа": [["python"], ["python"], ["python"]],
+        "Бета": [["python", "sql", "docker", "linux", "git"]],
+    })
+    assert get_active_weights(db) is None
+
+    vacancies_only = {"vacancy": 1.0, "skills": 0.0, "size": 0.0, "growth": 0.0, "curriculum": 0.0}
+    skills_only = {"vacancy": 0.0, "skills": 1.0, "size": 0.0, "growth": 0.0, "curriculum": 0.0}
+
+    # Предпросмотр не пишет в БД
+    preview = preview_top_companies(db, skills_only, limit=1)
+    assert [company.id for company, _ in preview] == [ids["Бета"]]
+    assert db.query(ScoringWeights).count() == 0
+
+    first, updated = reweight_companies(db, vacancies_only, comment="вакансии")
+    assert updated == 2
+    assert db.get(Company, ids["Альфа"]).score == 100.0
+
+    second, _ = reweight_companies(db, skills_only, comment="навыки")
+    db.expire_all()
+    assert get_active_weights(db).id == second.id
+    assert weights_as_dict(get_active_weights(db)) == skills_only
+    assert not db.get(ScoringWeights, first.id).is_active
+    assert db.get(Company, ids["Бета"]).score == 100.0
+    assert db.get(Company, ids["Альфа"]).score < 100.0
+
+
+def test_curriculum_match_scores():
+    program = {"python": 1.0, "sql": 1.0, "figma": 0.5}
+    scores = curriculum_match_scores(
+        [["Python", "SQL", "Figma"], ["python", "sql"], ["PYTHON", "Kafka", "Go", "Rust"], ["1C"], [], None, "SQL"],
+        program,
+    )
+    norm = np.sqrt(1 + 1 + 0.25)
+    expected = [2.5 / (np.sqrt(3) * norm), 2 / (np.sqrt(2) * norm), 1 / (2 * norm), 0.0, 0.0, 0.0, 1 / norm]
+    assert scores == pytest.approx(expected)
+    assert scores.max() <= 1.0
+    # Навыки вне программы снижают соответствие
+    assert scores[1] > scores[2]
+
+
+def test_curriculum_scores_are_stored_and_follow_the_program(db, monkeypatch):
+    ids = seed_companies(db, {"Альфа": [["Python", "SQL"]], "Бета": [["Go"]]})
+    db.expire_all()
+    assert db.get(Company, ids["Альфа"]).score_curriculum > 0
+    assert db.get(Company, ids["Бета"]).score_curriculum == 0.0
+
+    # Новая версия программы - пересчёт соответствия всех компаний
+    monkeypatch.setattr(scoring_stats, "load_program_skills", lambda: {"go": 1.0})
+    assert refresh_scores(db, []) == 2
+    db.expire_all()
+    assert db.get(Company, ids["Альфа"]).score_curriculum == 0.0
+    assert db.get(Company, ids["Бета"]).score_curriculum == pytest.approx(1.0)
+    assert refresh_scores(db, []) == 0
+
+
+def set_vacancy_count(db, company_id: int, count: int) -> None:
+    db.query(Company).filter(Company.id == company_id).update({Company.vacancy_count: count})
+
+
+def test_growth_snapshots_only_on_change(db):
+    ids = seed_companies(db, {"Альфа": [["python"]] * 10, "Бета": [["java"]] * 4})
+    start = datetime(2026, 1, 1)
+
+    # Первый снимок - точка отсчёта, тренд не меняется
+    assert record_snapshots(db, start) == set()
+    assert db.query(VacancySnapshot).count() == 2
+    assert record_snapshots(db, start + timedelta(days=1)) == set()
+    assert db.query(VacancySnapshot).count() == 2
+
+    set_vacancy_count(db, ids["Альфа"], 12)
+    assert record_snapshots(db, start + timedelta(days=2)) == {ids["Альфа"]}
+    db.expire_all()
+    assert db.query(VacancySnapshot).count() == 3
+    assert db.get(Company, ids["Альфа"]).growth_trend == pytest.approx(0.2)
+    assert db.get(Company, ids["Альфа"]).last_snapshot_count == 12
+    assert db.get(Company, ids["Бета"]).growth_trend == 0.0
+
+    set_vacancy_count(db, ids["Бета"], 2)
+    record_snapshots(db, start + timedelta(days=2))
+    db.expire_all()
+    assert db.get(Company, ids["Бета"]).growth_trend == pytest.approx(-0.5)
+    assert growth_component(db.get(Company, ids["Бета"]).growth_trend) < 0.5
+
+
+def test_growth_trend_decays_by_time_not_imports(db):
+    ids = seed_companies(db, {"Альфа": [["python"]] * 10, "Бета": [["java"]] * 10})
+    start = datetime(2026, 1, 1)
+    record_snapshots(db, start)
+    set_vacancy_count(db, ids["Альфа"], 12)
+    set_vacancy_count(db, ids["Бета"], 12)
+    record_snapshots(db, start)
+
+    # Частые импорты без изменений затухают так же, как один импорт за тот же срок
+    for day in range(1, 31):
+        record_snapshots(db, start + timedelta(days=day))
+    db.expire_all()
+    assert db.get(Company, ids["Альфа"]).growth_trend == pytest.approx(0.1)
+
+    # Новое наблюдение добавляется к затухшему тренду
+    set_vacancy_count(db, ids["Бета"], 15)
+    record_snapshots(db, start + 2 * GROWTH_HALF_LIFE)
+    db.expire_all()
+    assert db.get(Company, ids["Альфа"]).growth_trend == pytest.approx(0.05)
+    assert db.get(Company, ids["Бета"]).growth_trend == pytest.approx(0.05 + 0.25)
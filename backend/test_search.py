@@ -0,0 +1,112 @@
+"""
+Проверка полнотекстового поиска (FTS5) и сжатых описаний вакансий на временной БД (api_testing)
+
+Запуск: python -m pytest test_search.py
+"""
+
+import os
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.models.models import Company
+from app.services.scoring_stats import add_vacancies, remove_vacancies
+from app.services.search import index_pending_vacancies
+from main import app
+
+pytestmark = pytest.mark.usefixtures("seeded_database")
+
+
+def test_search_index_follows_writes():
+    """Триггеры FTS5 отражают вставку, изменение и удаление строк"""
+    def found(client: TestClient, q: str) -> list[int]:
+        response = client.get(f"/api/search?q={q}&types=companies")
+        assert response.status_code == 200, response.text
+        return [hit["id"] for hit in response.json()["companies"]]
+
+    db = SessionLocal()
+    with TestClient(app) as client:
+        try:
+            company = Company(name="Кварцевые Технологии", url="", main_skills=[])
+            db.add(company)
+            db.commit()
+            assert found(client, "кварц") == [company.id]
+
+            company.name = "Гранитные Технологии"
+            db.commit()
+            assert found(client, "кварц") == []
+            assert found(client, "гранит") == [company.id]
+
+            db.delete(company)
+            db.commit()
+            assert found(client, "гранит") == []
+        finally:
+            db.close()
+
+        assert client.get("/api/search?q=...").status_code == 400
+        assert client.get("/api/search?q=python&types=unknown").status_code == 400
+
+
+def test_vacancy_descriptions_are_compressed():
+    """Описание хранится сжатым, читается в деталях вакансии и находится поиском"""
+    description = "Обязанности: сопровождение хранилища данных. Требования: опыт с ClickHouse. " * 20
+    db = SessionLocal()
+    with TestClient(app) as client:
+        try:
+            [vacancy] = add_vacancies(db, 1, [
+                {"position": "Инженер данных", "main_skills": [], "vacancy_url": "v-zst", "description": description}
+            ])
+            db.commit()
+            stored = db.execute(
+                text("SELECT description_zst FROM vacancies WHERE id = :id"), {"id": vacancy.id}
+            ).scalar()
+            assert len(stored) < len(description.encode("utf-8")) / 4
+
+            assert client.get(f"/api/vacancies/{vacancy.id}").json()["description"] == description
+            hits = client.get("/api/search?q=clickhouse&types=vacancies").json()["vacancies"]
+            assert [hit["id"] for hit in hits] == [vacancy.id]
+            assert "<b>ClickHouse</b>" in hits[0]["snippet"]
+
+            remove_vacancies(db, [vacancy.id])
+            db.commit()
+            assert client.get("/api/search?q=clickhouse&types=vacancies").json()["vacancies"] == []
+        finally:
+            db.close()
+
+
+def test_vacancies_writable_without_application_functions():
+    """Запись в vacancies без zstd_text (sqlite3 напрямую) проходит, индекс догоняет приложение"""
+    def found(client: TestClient, q: str) -> list[int]:
+        return [hit["id"] for hit in client.get(f"/api/search?q={q}&types=vacancies").json()["vacancies"]]
+
+    conn = sqlite3.connect(os.environ["DATABASE_PATH"])
+    try:
+        vacancy_id = conn.execute(
+            "INSERT INTO vacancies (company_id, position, skills, url) VALUES (1, 'Сварщик', '[]', 'v-raw')"
+        ).lastrowid
+        conn.commit()
+        with TestClient(app) as client:
+            assert found(client, "сварщик") == [vacancy_id]
+
+        conn.execute("UPDATE vacancies SET position = 'Монтажник' WHERE id = ?", (vacancy_id,))
+        conn.execute("UPDATE vacancies SET position = 'Стропальщик' WHERE id = ?", (vacancy_id,))
+        conn.commit()
+        db = SessionLocal()
+        try:
+            assert index_pending_vacancies(db) == 1
+            db.commit()
+        finally:
+            db.close()
+        with TestClient(app) as client:
+            assert found(client, "сварщик") == []
+            assert found(client, "стропальщик") == [vacancy_id]
+
+        conn.execute("DELETE FROM vacancies WHERE id = ?", (vacancy_id,))
+        conn.commit()
+        with TestClient(app) as client:
+            assert found(client, "стропальщик") == []
+    finally:
+        conn.close()
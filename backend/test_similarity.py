@@ -0,0 +1,57 @@
+"""
+Проверка поиска похожих компаний (MinHash + LSH) без БД
+
+Запуск: python -m pytest test_similarity.py
+"""
+
+import numpy as np
+
+from app.services.similarity import (
+    LSH_BANDS,
+    LSH_ROWS,
+    MINHASH_PERMUTATIONS,
+    band_buckets,
+    estimate_similarity,
+    minhash_signatures,
+)
+
+COMMON_SKILLS = ["python", "sql", "git", "linux", "docker", "postgresql"]
+
+
+def lsh_candidates(buckets: np.ndarray, row: int) -> set[int]:
+    """Строки, у которых совпала хотя бы одна полоса со строкой row"""
+    return set(np.flatnonzero((buckets == buckets[row]).any(axis=1)).tolist()) - {row}
+
+
+def test_lsh_threshold():
+    assert LSH_BANDS * LSH_ROWS == MINHASH_PERMUTATIONS
+    assert (1 / LSH_BANDS) ** (1 / LSH_ROWS) > 0.6
+
+
+def test_candidate_count_stays_bounded():
+    # Стеки компаний пересекаются по популярным навыкам: Жаккар случайной пары ~0.2
+    rng = np.random.default_rng(7)
+    skill_lists = [
+        list(rng.choice(COMMON_SKILLS, 4, replace=False)) + [f"навык {i}" for i in rng.choice(2000, 6, replace=False)]
+        for _ in range(400)
+    ]
+    duplicate = skill_lists[0] + ["kafka"]
+    skill_lists.append(duplicate)
+
+    signatures = minhash_signatures(skill_lists)
+    buckets = band_buckets(signatures)
+
+    candidates = lsh_candidates(buckets, 0)
+    assert len(skill_lists) - 1 in candidates
+    assert len(candidates) <= 5, len(candidates)
+    assert estimate_similarity(signatures[0], signatures[-1:])[0] > 0.75
+
+    counts = [len(lsh_candidates(buckets, row)) for row in range(0, 400, 20)]
+    assert max(counts) <= 5, counts
+
+
+def test_empty_skills_have_empty_signature():
+    signatures = minhash_signatures([[], None, ["Python"], ["python "]])
+    assert (signatures[0] == signatures[1]).all()
+    assert (signatures[2] == signatures[3]).all()
+    assert not (signatures[0] == signatures[2]).any()
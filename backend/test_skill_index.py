@@ -0,0 +1,45 @@
+"""
+Проверка индекса навыков в памяти (битовые множества) на временной БД (api_testing)
+
+Запуск: python -m pytest test_skill_index.py
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import SessionLocal
+from app.models.models import Company
+from main import app
+
+pytestmark = pytest.mark.usefixtures("seeded_database")
+
+
+def test_skill_index_follows_writes():
+    """Индекс навыков в памяти догоняет вставку, изменение и удаление компаний"""
+    def matched(client: TestClient, skills: str) -> list[int]:
+        response = client.get(f"/api/skills/match?all={skills}")
+        assert response.status_code == 200, response.text
+        return sorted(item["company"]["id"] for item in response.json()["data"])
+
+    db = SessionLocal()
+    with TestClient(app) as client:
+        try:
+            assert matched(client, "rust") == []
+            first = Company(name="Ржавчина 1", url="", industry="IT", main_skills=["Rust", "Python"])
+            second = Company(name="Ржавчина 2", url="", industry="IT", main_skills=["Rust"])
+            db.add_all([first, second])
+            db.commit()
+            assert matched(client, "rust") == sorted([first.id, second.id])
+
+            second.main_skills = ["Go"]
+            db.delete(first)
+            db.commit()
+            assert matched(client, "rust") == []
+            assert matched(client, "go") == [second.id]
+            assert client.get("/api/skills/match?all=rust").json()["total"] == 0
+
+            db.delete(second)
+            db.commit()
+            assert matched(client, "go") == []
+        finally:
+            db.close()
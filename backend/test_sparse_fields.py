@@ -0,0 +1,38 @@
+"""
+Проверка выборочных полей ответа (fields=) на временной БД (api_testing)
+
+Запуск: python -m pytest test_sparse_fields.py
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api_testing import capture_selects
+from main import app
+
+pytestmark = pytest.mark.usefixtures("seeded_database")
+
+
+def test_sparse_fieldsets():
+    """fields= сужает и SELECT, и JSON; без fields ответ не меняется"""
+    with TestClient(app) as client:
+        full = client.get("/api/companies?limit=5").json()
+        statements = capture_selects(client, "/api/companies?limit=5&fields=name,score")
+        sparse = client.get("/api/companies?limit=5&fields=score, name").json()
+        assert [set(item) for item in sparse["data"]] == [{"id", "name", "score"}] * 5
+        assert [item["name"] for item in sparse["data"]] == [item["name"] for item in full["data"]]
+        assert sparse["total"] == full["total"]
+        assert not any("main_skills" in statement for statement, _ in statements)
+
+        top = client.get("/api/companies/top-20?fields=name").json()
+        assert [item["id"] for item in top] == [item["id"] for item in client.get("/api/companies/top-20").json()]
+        assert set(top[0]) == {"id", "name"}
+
+        letters = client.get("/api/letters?limit=5&fields=subject,company_name")
+        statements = capture_selects(client, "/api/letters?limit=5&fields=subject,company_name")
+        assert set(letters.json()["data"][0]) == {"id", "subject", "company_name"}
+        assert letters.json()["data"][0]["company_name"].startswith("Компания")
+        assert not any("body" in statement for statement, _ in statements)
+
+        assert client.get("/api/companies?fields=name,password").status_code == 400
+        assert client.get("/api/letters?fields=template").status_code == 400
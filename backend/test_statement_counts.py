@@ -0,0 +1,48 @@
+"""
+Проверка числа SQL-запросов эндпоинтов (без N+1) на временной БД (api_testing)
+
+Запуск: python -m pytest test_statement_counts.py
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api_testing import assert_statement_count
+from main import app
+
+pytestmark = pytest.mark.usefixtures("seeded_database")
+
+
+# Число SQL-запросов эндпоинта (с промахом кэша ответов) - не зависит от размера страницы
+STATEMENT_COUNTS = {
+    "/api/companies?limit={limit}": 3,  # поколение, total по счётчику, страница
+    "/api/companies?limit={limit}&fields=name": 3,
+    "/api/letters?limit={limit}": 3,  # поколение, total, страница писем с компаниями (JOIN)
+    "/api/letters?limit={limit}&status=draft": 3,
+    "/api/letters?limit={limit}&fields=subject,company_name": 3,
+}
+
+
+def test_statement_counts():
+    """Списки, письма и email - фиксированное число запросов, без N+1"""
+    with TestClient(app) as client:
+        for path, expected in STATEMENT_COUNTS.items():
+            for limit in (1, 5, 40):
+                data = assert_statement_count(client, path.format(limit=limit), expected).json()["data"]
+                assert len(data) == limit, path
+
+        assert_statement_count(client, "/api/letters/3", 2)  # версия письма, письмо с компанией
+        assert_statement_count(client, "/api/emails/status/3", 1)
+
+        letter_id = client.get("/api/letters/3").json()["id"]
+        # SELECT письма с компанией, UPDATE письма, поколение; один COMMIT
+        assert_statement_count(client, f"/api/letters/{letter_id}/approve", 3, method="POST", commits=1)
+        # SELECT компании с письмом, UPDATE письма, UPDATE компании, поколение; один COMMIT
+        response = assert_statement_count(client, "/api/emails/send/3", 4, method="POST", commits=1,
+                                          json={"email": "hr@example.com"})
+        assert response.json()["delivery_status"] == "delivered"
+        assert client.get("/api/emails/status/3").json()["delivery_status"] == "delivered"
+        assert client.get("/api/companies/3").json()["status"] == "sent"
+
+        assert client.get("/api/emails/status/100000").status_code == 404
+        assert client.post("/api/emails/send/100000", json={"email": "hr@example.com"}).status_code == 404
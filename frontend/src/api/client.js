@@ -42,6 +42,36 @@ export const api = {
         }
     },
 
+    // GET /api/dashboard (счётчики, top-N и состояние писем одним запросом)
+    getDashboard: async (params = {}) => {
+        if (USE_MOCK) {
+            await delay(500);
+            let data = [...companies].sort((a, b) => b.score - a.score);
+            if (params.status) data = data.filter(c => c.status === params.status);
+            if (params.industry) data = data.filter(c => c.industry === params.industry);
+            return { status: 'success', data: data.slice(0, 20), companyCounts: {}, letterCounts: {} };
+        }
+
+        const query = new URLSearchParams(
+            Object.fromEntries(Object.entries(params).filter(([, value]) => value))
+        ).toString();
+        try {
+            const res = await fetch(`${BASE_URL}/dashboard?${query}`);
+            const error = await handleResponse(res);
+            if (error) return error;
+
+            const json = await res.json();
+            return {
+                status: 'success',
+                data: json.companies,
+                companyCounts: json.company_counts,
+                letterCounts: json.letter_counts
+            };
+        } catch (error) {
+            return { status: 'error', message: 'Ошибка сети' };
+        }
+    },
+
     // GET /api/companies/{id}
     getCompanyById: async (id) => {
         if (USE_MOCK) {
@@ -63,6 +93,26 @@ export const api = {
         }
     },
 
+    // GET /api/companies/{id}/vacancies (следующие страницы вакансий)
+    getCompanyVacancies: async (id, cursor, limit = 20) => {
+        if (USE_MOCK) {
+            await delay(300);
+            return { status: 'success', data: [], next_cursor: null };
+        }
+
+        const query = new URLSearchParams({ cursor, limit }).toString();
+        try {
+            const res = await fetch(`${BASE_URL}/companies/${id}/vacancies?${query}`);
+            const error = await handleResponse(res);
+            if (error) return error;
+
+            const json = await res.json();
+            return { status: 'success', data: json.data, next_cursor: json.next_cursor };
+        } catch (error) {
+            return { status: 'error', message: 'Ошибка сети' };
+        }
+    },
+
     // GET /api/companies (Фильтрация и поиск)
     getCompanies: async (params = {}) => {
         if (USE_MOCK) {
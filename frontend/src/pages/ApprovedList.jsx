@@ -12,7 +12,8 @@ export const ApprovedList = () => {
 
   const loadData = async () => {
     try {
-      const res = await api.getTopCompanies();
+      // Состояние письма каждой компании приходит в том же ответе
+      const res = await api.getDashboard();
       if (res.status === "success") {
         const approved = res.data.filter(
           (c) => c.status === "approved" || c.status === "sent"
@@ -18,6 +18,7 @@ export const CompanyDetail = () => {
   const [company, setCompany] = useState(null);
   const [loading, setLoading] = useState(true);
   const [showLetterModal, setShowLetterModal] = useState(false);
+  const [loadingVacancies, setLoadingVacancies] = useState(false);
 
   useEffect(() => {
     loadCompany();
@@ -32,6 +33,20 @@ export const CompanyDetail = () => {
     setLoading(false);
   };
 
+  // Детали содержат первую страницу вакансий, остальные - по курсору
+  const loadMoreVacancies = async () => {
+    setLoadingVacancies(true);
+    const res = await api.getCompanyVacancies(id, company.vacancies_next_cursor);
+    if (res.status === "success") {
+      setCompany({
+        ...company,
+        vacancies: [...company.vacancies, ...res.data],
+        vacancies_next_cursor: res.next_cursor,
+      });
+    }
+    setLoadingVacancies(false);
+  };
+
   const handleApproveCompany = async () => {
     setLoading(true);
     await api.approveCompany(id);
@@ -167,7 +182,7 @@ export const CompanyDetail = () => {
 
       {/* Список вакансий */}
       <h2 className="text-xl font-bold mb-4">
-        Найдено вакансий: {company.vacancies?.length || 0}
+        Найдено вакансий: {company.vacancy_count ?? company.vacancies?.length ?? 0}
       </h2>
       <div className="space-y-3">
         {company.vacancies && company.vacancies.length > 0 ? (
@@ -199,6 +214,15 @@ export const CompanyDetail = () => {
             Список вакансий пуст или не загружен
           </div>
         )}
+        {company.vacancies_next_cursor && (
+          <button
+            onClick={loadMoreVacancies}
+            disabled={loadingVacancies}
+            className="w-full border border-gray-200 text-blue-600 hover:bg-blue-50 py-2 rounded-lg font-medium transition disabled:opacity-50"
+          >
+            {loadingVacancies ? "Загрузка..." : "Показать ещё"}
+          </button>
+        )}
       </div>
 
       {showLetterModal && (
@@ -35,6 +35,7 @@ const StatusBadge = ({ status }) => {
 
 export const Dashboard = () => {
   const [companies, setCompanies] = useState([]);
+  const [counts, setCounts] = useState({});
   const [loading, setLoading] = useState(true);
   const [selectedCompany, setSelectedCompany] = useState(null);
 
@@ -52,8 +53,11 @@ export const Dashboard = () => {
     let res;
 
     if (!filters.status && !filters.industry) {
-      res = await api.getTopCompanies();
+      // Топ-20, счётчики и состояние писем - одним запросом
+      res = await api.getDashboard();
+      if (res.status === "success") setCounts(res.companyCounts);
     } else {
+      // Результаты поиска - список /companies с фильтрами, а не top-N дашборда
       res = await api.getCompanies(filters);
     }
 
@@ -73,6 +77,12 @@ export const Dashboard = () => {
               ? "Результаты поиска"
               : "Топ-20 наиболее подходящих"}
           </p>
+          {counts.all !== undefined && (
+            <p className="text-xs text-gray-400 mt-1">
+              Всего: {counts.all} · Новые: {counts.new} · Одобрено:{" "}
+              {counts.approved} · Отправлено: {counts.sent}
+            </p>
+          )}
         </div>
 
         {/* Панель фильтров */}